@@ -0,0 +1,303 @@
+import bisect
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+from pymongo.errors import OperationFailure, PyMongoError
+
+from cache import escrita_local, invalidar_colecao, ouvir_escritas
+from consultas import ORDENACAO_FEED, PROJECAO_CARTAO_VAGA, TAMANHO_RESUMO_DESCRICAO
+
+CAPACIDADE_SNAPSHOT = 200
+INTERVALO_POLLING = 5
+# Os contadores podem escorregar numa reconexão (e o polling não vê candidaturas religadas
+# a outra vaga): de tempos em tempos o snapshot é recarregado inteiro.
+INTERVALO_RECARGA = 60
+ESPERA_STREAM_MS = 1000
+# Eventos em rajada (importação, candidatura em lote) invalidam o cache uma vez por janela,
+# não uma vez por documento.
+JANELA_INVALIDACAO = 0.5
+COLECOES_OBSERVADAS = ["vagas", "aplicacoes"]
+
+# Erros de servidor sem suporte a change streams (mongod standalone, versões antigas).
+CODIGOS_SEM_CHANGE_STREAM = {40573, 40324}
+
+
+def _chave_feed(vaga):
+    return vaga.get("data_criacao") or datetime.min, vaga["_id"]
+
+
+def _cartao(vaga):
+    # Mesmos campos da PROJECAO_CARTAO_VAGA, para o snapshot valer como página do feed.
+    cartao = {campo: vaga.get(campo) for campo in PROJECAO_CARTAO_VAGA if campo in vaga}
+    cartao["_id"] = vaga["_id"]
+    cartao["descricao"] = (vaga.get("descricao") or "")[:TAMANHO_RESUMO_DESCRICAO + 1]
+    return cartao
+
+
+class MonitorAoVivo:
+    # Snapshot em memória das vagas mais recentes e das candidaturas por vaga, mantido por uma
+    # thread em segundo plano (change stream, ou polling quando o servidor não oferece).
+    # Compartilhado entre as sessões: quem lê recebe cópias rasas das listas.
+
+    def __init__(self, db, capacidade=CAPACIDADE_SNAPSHOT):
+        self.db = db
+        self.capacidade = capacidade
+        self.modo = "iniciando"
+        self.versao = 0
+        self._recentes = []
+        self._por_id = {}
+        self._contagens = {}
+        self._completo = False
+        self._carregado = False
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="ao-vivo", daemon=True)
+
+    def iniciar(self):
+        try:
+            self._recarregar()
+        except PyMongoError:
+            pass
+        ouvir_escritas(self._ao_escrever)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    # --- leitura (páginas) ---
+
+    def pagina(self, cursor=None, limite=20):
+        # Mesmo contrato de consultas.carregar_pagina_vagas; None se o snapshot não cobre a página.
+        with self._lock:
+            if not self._carregado:
+                return None
+            ordenadas = self._recentes[::-1]
+            inicio = 0
+            if cursor is not None:
+                chave = (cursor[0] or datetime.min, cursor[1])
+                inicio = next((i for i, v in enumerate(ordenadas) if _chave_feed(v) < chave), len(ordenadas))
+            if not self._completo and inicio + limite + 1 > len(ordenadas):
+                return None
+            vagas = ordenadas[inicio:inicio + limite]
+            tem_mais = inicio + limite < len(ordenadas)
+
+        proximo_cursor = (vagas[-1].get("data_criacao"), vagas[-1]["_id"]) if vagas and tem_mais else None
+        return vagas, proximo_cursor
+
+    def novas_desde(self, vaga):
+        # Vagas do snapshot mais recentes que a vaga dada (a primeira já exibida no feed);
+        # sem vaga, o snapshot inteiro.
+        with self._lock:
+            if vaga is None:
+                return self._recentes[::-1]
+            chave = _chave_feed(vaga)
+            posicao = bisect.bisect_right(self._recentes, chave, key=_chave_feed)
+            return self._recentes[posicao:][::-1]
+
+    def contagens(self, ids_vagas):
+        with self._lock:
+            faltando = [i for i in ids_vagas if i not in self._contagens]
+        if faltando:
+            pipeline = [
+                {"$match": {"vaga_id": {"$in": faltando}}},
+                {"$group": {"_id": "$vaga_id", "total": {"$sum": 1}}},
+            ]
+            totais = {grupo["_id"]: grupo["total"] for grupo in self.db.aplicacoes.aggregate(pipeline)}
+            with self._lock:
+                for id_vaga in faltando:
+                    self._contagens.setdefault(id_vaga, totais.get(id_vaga, 0))
+        with self._lock:
+            return {i: self._contagens.get(i, 0) for i in ids_vagas}
+
+    # --- atualização do snapshot ---
+
+    def _recarregar(self):
+        vagas = list(
+            self.db.vagas.find({}, PROJECAO_CARTAO_VAGA).sort(ORDENACAO_FEED).limit(self.capacidade)
+        )
+        with self._lock:
+            self._recentes = sorted(vagas, key=_chave_feed)
+            self._por_id = {vaga["_id"]: vaga for vaga in vagas}
+            self._contagens = {}
+            self._completo = len(vagas) < self.capacidade
+            self._carregado = True
+            self.versao += 1
+
+    def _aplicar_vaga(self, vaga):
+        cartao = _cartao(vaga)
+        with self._lock:
+            antiga = self._por_id.pop(cartao["_id"], None)
+            if antiga is not None:
+                self._recentes.remove(antiga)
+            # Só entra se for mais recente que a mais antiga do snapshot (ou se ele cobre tudo).
+            if self._completo or not self._recentes or _chave_feed(cartao) > _chave_feed(self._recentes[0]):
+                bisect.insort(self._recentes, cartao, key=_chave_feed)
+                self._por_id[cartao["_id"]] = cartao
+                if len(self._recentes) > self.capacidade:
+                    del self._por_id[self._recentes.pop(0)["_id"]]
+                    self._completo = False
+            self.versao += 1
+
+    def _remover_vaga(self, id_vaga):
+        with self._lock:
+            antiga = self._por_id.pop(id_vaga, None)
+            if antiga is not None:
+                self._recentes.remove(antiga)
+                self.versao += 1
+
+    def _somar_aplicacao(self, id_vaga):
+        with self._lock:
+            if id_vaga in self._contagens:
+                self._contagens[id_vaga] += 1
+            self.versao += 1
+
+    def _ao_escrever(self, colecao, documento):
+        # Escritas deste processo aparecem na hora, sem esperar o stream/polling.
+        if colecao == "vagas" and documento is not None and "_id" in documento:
+            self._aplicar_vaga(documento)
+
+    def _processar(self, evento):
+        # Devolve a coleção a invalidar, ou None se o evento é de uma escrita deste processo.
+        colecao = evento["ns"]["coll"]
+        tipo = evento["operationType"]
+        if colecao == "vagas":
+            if tipo == "delete":
+                self._remover_vaga(evento["documentKey"]["_id"])
+            elif evento.get("fullDocument"):
+                self._aplicar_vaga(evento["fullDocument"])
+        elif colecao == "aplicacoes":
+            if tipo == "insert":
+                self._somar_aplicacao(evento["fullDocument"].get("vaga_id"))
+            else:
+                with self._lock:
+                    self._contagens = {}
+        if escrita_local(colecao, evento.get("documentKey", {}).get("_id")):
+            return None
+        return colecao
+
+    # --- thread de acompanhamento ---
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                self._acompanhar_stream()
+            except OperationFailure as e:
+                if e.code not in CODIGOS_SEM_CHANGE_STREAM:
+                    self._parar.wait(INTERVALO_POLLING)
+                    continue
+                try:
+                    self._acompanhar_polling()
+                except PyMongoError:
+                    self._parar.wait(INTERVALO_POLLING)
+            except PyMongoError:
+                self._parar.wait(INTERVALO_POLLING)
+
+    def _acompanhar_stream(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": COLECOES_OBSERVADAS}}}]
+        with self.db.watch(pipeline, full_document="updateLookup", max_await_time_ms=ESPERA_STREAM_MS) as stream:
+            # O stream já está aberto: o que mudar durante a recarga chega como evento.
+            self._recarregar()
+            self.modo = "change stream"
+            ultima_recarga = time.monotonic()
+            pendentes, desde = set(), None
+            try:
+                while not self._parar.is_set():
+                    evento = stream.try_next()
+                    if evento is not None and (colecao := self._processar(evento)):
+                        pendentes.add(colecao)
+                        desde = desde or time.monotonic()
+                    # Invalida quando a rajada termina (stream sem eventos) ou quando a janela fecha.
+                    if pendentes and (evento is None or time.monotonic() - desde >= JANELA_INVALIDACAO):
+                        self._invalidar(pendentes)
+                        pendentes, desde = set(), None
+                    if evento is None and time.monotonic() - ultima_recarga > INTERVALO_RECARGA:
+                        with self._lock:
+                            self._contagens = {}
+                        ultima_recarga = time.monotonic()
+            finally:
+                # Stream caiu no meio de uma rajada: o que já foi aplicado não fica sem invalidar.
+                self._invalidar(pendentes)
+
+    def _invalidar(self, colecoes):
+        for colecao in colecoes:
+            invalidar_colecao(colecao, compartilhada=False)
+
+    def _ultima_aplicacao(self):
+        ultima = self.db.aplicacoes.find_one({}, {"data_aplicacao": 1}, sort=[("data_aplicacao", -1)])
+        return (ultima or {}).get("data_aplicacao") or datetime.min
+
+    def _ultima_edicao(self, janela):
+        # Só as vagas da janela do snapshot interessam: as mais antigas não aparecem nele.
+        ultima = self.db.vagas.find_one(
+            {"data_criacao": {"$gte": janela}}, {"data_atualizacao": 1}, sort=[("data_atualizacao", -1)]
+        )
+        return (ultima or {}).get("data_atualizacao") or datetime.min
+
+    def _acompanhar_polling(self):
+        # Vagas novas chegam por data_criacao e editadas por data_atualizacao (dentro da janela do
+        # snapshot). Remoções, e inserções com data_criacao antiga (importação), não têm marca:
+        # aparecem como diferença na contagem da coleção e forçam a recarga.
+        self.modo = "polling"
+        while not self._parar.is_set():
+            self._recarregar()
+            with self._lock:
+                marca_vagas = _chave_feed(self._recentes[-1])[0] if self._recentes else datetime.min
+                janela = datetime.min if self._completo or not self._recentes else _chave_feed(self._recentes[0])[0]
+            marca_edicoes = self._ultima_edicao(janela)
+            marca_aplicacoes = self._ultima_aplicacao()
+            total_vagas = self.db.vagas.estimated_document_count()
+            total_aplicacoes = self.db.aplicacoes.estimated_document_count()
+            ultima_recarga = time.monotonic()
+
+            while not self._parar.wait(INTERVALO_POLLING):
+                novas = list(self.db.vagas.find({"data_criacao": {"$gt": marca_vagas}}, PROJECAO_CARTAO_VAGA))
+                editadas = list(self.db.vagas.find(
+                    {"data_criacao": {"$gte": janela}, "data_atualizacao": {"$gt": marca_edicoes}},
+                    {**PROJECAO_CARTAO_VAGA, "data_atualizacao": 1},
+                ))
+                externas = 0
+                for vaga in novas:
+                    self._aplicar_vaga(vaga)
+                    marca_vagas = max(marca_vagas, vaga["data_criacao"])
+                    externas += not escrita_local("vagas", vaga["_id"])
+                for vaga in editadas:
+                    self._aplicar_vaga(vaga)
+                    marca_edicoes = max(marca_edicoes, vaga["data_atualizacao"])
+                    externas += not escrita_local("vagas", vaga["_id"])
+                total_vagas += len(novas)
+                fora_da_marca = self.db.vagas.estimated_document_count() != total_vagas
+                if externas or fora_da_marca:
+                    self._invalidar(["vagas"])
+
+                aplicacoes = list(self.db.aplicacoes.find(
+                    {"data_aplicacao": {"$gt": marca_aplicacoes}}, {"vaga_id": 1, "data_aplicacao": 1}
+                ))
+                for aplicacao in aplicacoes:
+                    self._somar_aplicacao(aplicacao.get("vaga_id"))
+                    marca_aplicacoes = max(marca_aplicacoes, aplicacao["data_aplicacao"])
+                total_aplicacoes += len(aplicacoes)
+                contadas = self.db.aplicacoes.estimated_document_count()
+                removidas = contadas != total_aplicacoes
+                if removidas:
+                    # Candidaturas removidas: os contadores voltam a ser lidos do banco.
+                    with self._lock:
+                        self._contagens = {}
+                    total_aplicacoes = contadas
+                if aplicacoes or removidas:
+                    self._invalidar(["aplicacoes"])
+
+                if fora_da_marca or time.monotonic() - ultima_recarga > INTERVALO_RECARGA:
+                    break
+
+
+@st.cache_resource(show_spinner=False)
+def _monitor(_db, nome_banco):
+    return MonitorAoVivo(_db).iniciar()
+
+
+def obter_monitor(db):
+    # Um único monitor por processo, compartilhado por todas as sessões.
+    return _monitor(db, db.name)
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+CODIGO_CHAVE_DUPLICADA = 11000
+
+
+def _upsert_aplicacao(vaga, usuario_candidato, id_candidato, agora):
+    # Upsert com $setOnInsert na chave única (vaga_id, candidato_id): se a candidatura já existe
+    # nada é alterado, e o próprio resultado da escrita diz se ela é nova. O candidato_id (o _id
+    # do login) é estável e também liga a candidatura ao perfil; o nome exibido pode se repetir.
+    filtro = {"vaga_id": vaga["_id"], "candidato_id": id_candidato}
+    atualizacao = {"$setOnInsert": {
+        "candidato_username": usuario_candidato,
+        "vaga_titulo": vaga.get("titulo"),
+        "empresa_vaga": vaga.get("empresa"),
+        "data_aplicacao": agora,
+    }}
+    return filtro, atualizacao
+
+
+def salvar_aplicacao(db, vaga, usuario_candidato, id_candidato):
+    filtro, atualizacao = _upsert_aplicacao(vaga, usuario_candidato, id_candidato, datetime.now())
+    try:
+        resultado = db.aplicacoes.update_one(filtro, atualizacao, upsert=True)
+    except DuplicateKeyError:
+        # Dois cliques simultâneos: o índice único barra o segundo upsert.
+        return "duplicado"
+    return "sucesso" if resultado.upserted_id is not None else "duplicado"
+
+
+def aplicar_em_lote(db, vagas, usuario_candidato, id_candidato):
+    # Uma única ida ao banco para todas as vagas; devolve as vagas em que a candidatura é nova.
+    if not vagas:
+        return []
+    agora = datetime.now()
+    operacoes = [UpdateOne(*_upsert_aplicacao(vaga, usuario_candidato, id_candidato, agora), upsert=True) for vaga in vagas]
+    try:
+        resultado = db.aplicacoes.bulk_write(operacoes, ordered=False)
+        indices_novos = resultado.upserted_ids.keys()
+    except BulkWriteError as e:
+        erros = [erro for erro in e.details["writeErrors"] if erro["code"] != CODIGO_CHAVE_DUPLICADA]
+        if erros:
+            raise
+        indices_novos = [upsert["index"] for upsert in e.details["upserted"]]
+    return [vagas[i] for i in sorted(indices_novos)]
@@ -1,16 +1,28 @@
 import streamlit as st
 import pandas as pd
 import time
-import re
-from datetime import datetime
 
 try:
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun, medir_rerun
+    from aplicacoes import salvar_aplicacao as gravar_aplicacao, aplicar_em_lote
+    from auth import verificar_login as autenticar, cadastrar_usuario, emitir_token, revogar_token, sessao_atual, id_usuario
+    from cache import registrar_escrita
+    from estatisticas import registrar_usuario, registrar_aplicacao
+    from consultas import carregar_pagina_vagas, carregar_pontos_mapa, carregar_facetas, FACETAS_FEED, ORDENS_FEED, TAMANHO_RESUMO_DESCRICAO
+    from ao_vivo import obter_monitor, INTERVALO_POLLING
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun, medir_rerun
+    from aplicacoes import salvar_aplicacao as gravar_aplicacao, aplicar_em_lote
+    from auth import verificar_login as autenticar, cadastrar_usuario, emitir_token, revogar_token, sessao_atual, id_usuario
+    from cache import registrar_escrita
+    from estatisticas import registrar_usuario, registrar_aplicacao
+    from consultas import carregar_pagina_vagas, carregar_pontos_mapa, carregar_facetas, FACETAS_FEED, ORDENS_FEED, TAMANHO_RESUMO_DESCRICAO
+    from ao_vivo import obter_monitor, INTERVALO_POLLING
 
 st.set_page_config(
     page_title="Portal de Vagas",
@@ -23,57 +35,57 @@ def verificar_login(username, senha):
     db = get_database()
     if db is None:
         return None
-    return db.usuarios.find_one({"username": username, "senha": senha})
+    return autenticar(db, username, senha)
 
 def criar_usuario(nome, username, senha, role):
     db = get_database()
     if db is None:
         return False
-    if db.usuarios.find_one({"username": username}):
+    if cadastrar_usuario(db, nome, username, senha, role) is None:
         st.sidebar.error("⚠️ Este usuário já existe!")
         return False
-    novo_usuario = {
-        "nome": nome,
-        "username": username,
-        "senha": senha, 
-        "role": role,
-        "data_criacao": datetime.now()
-    }
-    db.usuarios.insert_one(novo_usuario)
+    registrar_escrita("usuarios")
+    registrar_usuario(db)
     return True
 
 def salvar_aplicacao(vaga, usuario_candidato):
     db = get_database()
     if db is None:
         return False
-    
-    ja_aplicou = db.aplicacoes.find_one({
-        "vaga_titulo": vaga["titulo"],
-        "empresa_vaga": vaga["empresa"],
-        "candidato_username": usuario_candidato
-    })
-    
-    if ja_aplicou:
-        return "duplicado"
-
-    nova_aplicacao = {
-        "vaga_titulo": vaga["titulo"],
-        "empresa_vaga": vaga["empresa"],
-        "candidato_username": usuario_candidato,
-        "data_aplicacao": datetime.now()
-    }
-    db.aplicacoes.insert_one(nova_aplicacao)
-    return "sucesso"
+
+    resultado = gravar_aplicacao(db, vaga, usuario_candidato, id_usuario(sessao))
+    if resultado == "sucesso":
+        registrar_escrita("aplicacoes")
+        registrar_aplicacao(db, vaga)
+    return resultado
+
+def aplicar_selecionadas(vagas, usuario_candidato):
+    db = get_database()
+    if db is None:
+        return None
+
+    novas = aplicar_em_lote(db, vagas, usuario_candidato, id_usuario(sessao))
+    if novas:
+        registrar_escrita("aplicacoes")
+        for vaga in novas:
+            registrar_aplicacao(db, vaga)
+    return novas
 
 if "logged_in" not in st.session_state:
     st.session_state["logged_in"] = False
     st.session_state["user_role"] = None
     st.session_state["user_name"] = None
+    st.session_state["token"] = None
+
+iniciar_rerun("Início")
+sessao = sessao_atual(st.session_state, get_database())
 
 def logout_user():
+    revogar_token(st.session_state.get("token"), get_database())
     st.session_state["logged_in"] = False
     st.session_state["user_role"] = None
     st.session_state["user_name"] = None
+    st.session_state["token"] = None
     st.rerun()
 
 with st.sidebar:
@@ -92,6 +104,7 @@ with st.sidebar:
                     st.session_state["logged_in"] = True
                     st.session_state["user_role"] = usuario_encontrado["role"]
                     st.session_state["user_name"] = usuario_encontrado["nome"]
+                    st.session_state["token"] = emitir_token(usuario_encontrado)
                     st.success(f"Olá, {st.session_state['user_name']}!")
                     time.sleep(1)
                     st.rerun()
@@ -100,7 +113,7 @@ with st.sidebar:
             
             db = get_database()
             if db is not None:
-                if db.usuarios.count_documents({}) == 0:
+                if db.usuarios.estimated_document_count() == 0:
                     st.divider()
                     if st.button("🆘 Criar Admin Padrão"):
                         criar_usuario("Administrador Sistema", "admin", "123", "admin")
@@ -140,148 +153,213 @@ st.title("💼 Vagas em Aberto")
 st.markdown("Confira as oportunidades mais recentes do mercado.")
 st.divider()
 
-db = get_database()
-vagas_lista = []
-if db is not None:
+db = get_database(somente_leitura=True)
+monitor = obter_monitor(db) if db is not None else None
+
+ROTULOS_FACETAS = {"tipo": "🏷️ Tipo", "senioridade": "📈 Senioridade", "cidade": "📍 Cidade", "empresa": "🏢 Empresa"}
+ROTULOS_ORDEM = {"recentes": "Mais recentes", "salario": "Maior salário"}
+
+def filtros_feed():
+    # Os filtros vivem na URL (?tipo=Remoto&cidade=curitiba): a visão filtrada pode ser
+    # compartilhada, e a mesma combinação reaproveita o cache de consultas.
+    params = st.query_params
+    salario = params.get("salario_min", "")
+    return {
+        "facetas": tuple((nome, params[nome]) for nome in FACETAS_FEED if params.get(nome)),
+        "salario_minimo": int(salario) if salario.isdigit() and int(salario) > 0 else None,
+        "ordem": params.get("ordem") if params.get("ordem") in ORDENS_FEED else "recentes",
+    }
+
+def feed_filtrado(filtros):
+    return bool(filtros["facetas"] or filtros["salario_minimo"]) or filtros["ordem"] != "recentes"
+
+def carregar_mais_vagas():
+    if db is None:
+        return
+    cursor = st.session_state["feed_cursor"]
+    filtros = st.session_state["feed_filtros"]
     try:
-        vagas_lista = list(db.vagas.find({}, {"_id": 0}).sort("data_criacao", -1))
+        # As páginas cobertas pelo snapshot ao vivo (feed sem filtro) não vão ao banco.
+        if feed_filtrado(filtros):
+            vagas, proximo = carregar_pagina_vagas(db, cursor, **filtros)
+        else:
+            vagas, proximo = monitor.pagina(cursor) or carregar_pagina_vagas(db, cursor)
     except Exception:
-        pass
+        return
+    st.session_state["feed_vagas"].extend(vagas)
+    st.session_state["feed_cursor"] = proximo
+    st.session_state["feed_fim"] = proximo is None
+
+def reiniciar_feed():
+    st.session_state["feed_filtros"] = filtros_feed()
+    st.session_state["feed_vagas"] = []
+    st.session_state["feed_cursor"] = None
+    st.session_state["feed_fim"] = False
+    carregar_mais_vagas()
+
+# Primeira execução ou filtros novos na URL: o feed recomeça do topo.
+if st.session_state.get("feed_filtros") != filtros_feed():
+    reiniciar_feed()
+
+def aplicar_filtros():
+    # Widgets -> URL; na execução seguinte o feed recomeça com a nova combinação.
+    valores = {nome: st.session_state[f"filtro_{nome}"] for nome in FACETAS_FEED}
+    valores["salario_min"] = st.session_state["filtro_salario_min"]
+    valores["ordem"] = st.session_state["filtro_ordem"] if st.session_state["filtro_ordem"] != "recentes" else None
+    for param, valor in valores.items():
+        if valor:
+            st.query_params[param] = str(valor)
+        else:
+            st.query_params.pop(param, None)
+
+def limpar_filtros():
+    st.query_params.clear()
+
+def rotulo_opcao(nome, valor, contagens):
+    if valor is None:
+        return "Todos"
+    return f"{valor.title() if nome == 'cidade' else valor} ({contagens.get(valor, 0)})"
+
+with st.sidebar:
+    st.divider()
+    st.markdown("### 🔎 Filtrar vagas")
+    filtros = st.session_state["feed_filtros"]
+    opcoes = {}
+    if db is not None:
+        try:
+            opcoes = carregar_facetas(db, **filtros)
+        except Exception:
+            pass
+
+    # Os widgets sempre mostram o que está na URL (inclusive ao abrir um link compartilhado).
+    selecionadas = dict(filtros["facetas"])
+    for nome, rotulo in ROTULOS_FACETAS.items():
+        contagens = dict(opcoes.get(nome, []))
+        valores = list(contagens)
+        if selecionadas.get(nome) and selecionadas[nome] not in contagens:
+            valores.append(selecionadas[nome])
+        st.session_state[f"filtro_{nome}"] = selecionadas.get(nome)
+        st.selectbox(
+            rotulo, [None, *valores], key=f"filtro_{nome}", on_change=aplicar_filtros,
+            format_func=lambda valor, nome=nome, contagens=contagens: rotulo_opcao(nome, valor, contagens),
+        )
+    st.session_state["filtro_salario_min"] = filtros["salario_minimo"] or 0
+    st.number_input("💰 Salário mínimo (R$/mês)", min_value=0, step=500, key="filtro_salario_min", on_change=aplicar_filtros)
+    st.session_state["filtro_ordem"] = filtros["ordem"]
+    st.selectbox("Ordenar por", list(ROTULOS_ORDEM), format_func=ROTULOS_ORDEM.get, key="filtro_ordem", on_change=aplicar_filtros)
+    if feed_filtrado(filtros):
+        st.button("✖️ Limpar filtros", on_click=limpar_filtros)
+
+vagas_lista = st.session_state["feed_vagas"]
+
+@st.fragment(run_every=INTERVALO_POLLING)
+@medir_rerun("Início › aviso de novas vagas")
+def aviso_novas_vagas():
+    # Só este trecho roda a cada intervalo: o feed inteiro é refeito apenas quando o usuário
+    # pede para ver as novas, e só elas entram no topo da lista.
+    if monitor is None or feed_filtrado(st.session_state["feed_filtros"]):
+        return
+    novas = monitor.novas_desde(vagas_lista[0] if vagas_lista else None)
+    if novas and st.button(f"🆕 {len(novas)} vaga(s) nova(s) — mostrar", type="primary"):
+        st.session_state["feed_vagas"] = novas + vagas_lista
+        st.rerun(scope="app")
+
+# Cada cartão, a barra de candidatura em lote e o mapa são fragmentos: um clique em
+# "Aplicar Agora" refaz só o próprio cartão, sem reconsultar o feed nem redesenhar o mapa.
+@st.fragment
+@medir_rerun("Início › cartão")
+def cartao_vaga(vaga):
+    id_vaga = str(vaga["_id"])
+    with st.container(border=True):
+        c1, c2 = st.columns([3, 1])
+        with c1:
+            st.subheader(vaga.get("titulo", "Sem Título"))
+            st.caption(f"🏢 {vaga.get('empresa', 'Empresa')} | 📍 {vaga.get('local', 'Remoto')}")
+            desc = vaga.get('descricao', '')
+            st.write(desc[:TAMANHO_RESUMO_DESCRICAO] + "..." if len(desc) > TAMANHO_RESUMO_DESCRICAO else desc)
+            st.markdown(f"**Requisitos:** {vaga.get('requisitos', 'Não informado')}")
+        with c2:
+            st.write(f"💰 {vaga.get('salario', 'A combinar')}")
+            st.write(f"🏷️ {vaga.get('tipo', '-')}")
+            
+            if st.session_state["logged_in"] and st.session_state["user_role"] == "candidato":
+                st.checkbox("Selecionar", key=f"sel_{id_vaga}")
+                key_btn = f"btn_aplicar_{id_vaga}"
+                if st.button("Aplicar Agora", key=key_btn):
+                     resultado = salvar_aplicacao(vaga, st.session_state["user_name"])
+                     if resultado == "sucesso":
+                         st.toast(f"Sucesso! Você aplicou para {vaga.get('empresa')}!", icon="✅")
+                     elif resultado == "duplicado":
+                         st.toast("Você já aplicou para esta vaga antes.", icon="⚠️")
+                     else:
+                         st.error("Erro ao aplicar.")
+            else:
+                st.button("Login p/ Aplicar", key=f"btn_l_{id_vaga}", disabled=True)
+
+@st.fragment
+@medir_rerun("Início › candidatura em lote")
+def aplicar_em_lote_feed():
+    # A seleção é lida no clique: marcar um cartão só refaz aquele cartão.
+    if st.button("📨 Aplicar às vagas selecionadas", type="primary"):
+        selecionadas = [v for v in st.session_state["feed_vagas"] if st.session_state.get(f"sel_{v['_id']}")]
+        if not selecionadas:
+            st.warning('Marque "Selecionar" nas vagas em que deseja se candidatar.')
+            return
+        novas = aplicar_selecionadas(selecionadas, st.session_state["user_name"])
+        if novas is None:
+            st.error("Erro ao aplicar.")
+        else:
+            repetidas = len(selecionadas) - len(novas)
+            st.toast(f"Você aplicou para {len(novas)} vaga(s)!", icon="✅")
+            if repetidas:
+                st.toast(f"{repetidas} vaga(s) já tinham sua candidatura.", icon="⚠️")
+
+@st.fragment
+@medir_rerun("Início › mapa")
+def mapa_vagas():
+    pontos_mapa = []
+    if db is not None:
+        try:
+            pontos_mapa = carregar_pontos_mapa(db)
+        except Exception:
+            pass
+
+    if len(pontos_mapa) > 0:
+        df_mapa = pd.DataFrame(pontos_mapa)
+        df_mapa["tamanho"] = 20000 + 15000 * df_mapa["total"] ** 0.5
+        st.map(df_mapa, latitude="lat", longitude="lon", size="tamanho", zoom=3)
+    else:
+        st.caption("Nenhuma vaga com localização presencial mapeada.")
+        st.map(pd.DataFrame({'lat': [-15.7975], 'lon': [-47.8919]}), zoom=3)
 
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    if len(vagas_lista) == 0:
+    filtros = st.session_state["feed_filtros"]
+    if filtros["salario_minimo"] or filtros["ordem"] == "salario":
+        st.caption('Com filtro de salário, vagas "a combinar" ficam de fora.')
+    aviso_novas_vagas()
+    if len(vagas_lista) == 0 and feed_filtrado(filtros):
+        st.info("Nenhuma vaga com esses filtros.")
+    elif len(vagas_lista) == 0:
         st.info("Nenhuma vaga cadastrada no momento.")
     else:
-        for i, vaga in enumerate(vagas_lista):
-            with st.container(border=True):
-                c1, c2 = st.columns([3, 1])
-                with c1:
-                    st.subheader(vaga.get("titulo", "Sem Título"))
-                    st.caption(f"🏢 {vaga.get('empresa', 'Empresa')} | 📍 {vaga.get('local', 'Remoto')}")
-                    desc = vaga.get('descricao', '')
-                    st.write(desc[:150] + "..." if len(desc) > 150 else desc)
-                    st.markdown(f"**Requisitos:** {vaga.get('requisitos', 'Não informado')}")
-                with c2:
-                    st.write(f"💰 {vaga.get('salario', 'A combinar')}")
-                    st.write(f"🏷️ {vaga.get('tipo', '-')}")
-                    
-                    if st.session_state["logged_in"] and st.session_state["user_role"] == "candidato":
-                        key_btn = f"btn_aplicar_{i}"
-                        if st.button("Aplicar Agora", key=key_btn):
-                             resultado = salvar_aplicacao(vaga, st.session_state["user_name"])
-                             if resultado == "sucesso":
-                                 st.toast(f"Sucesso! Você aplicou para {vaga.get('empresa')}!", icon="✅")
-                             elif resultado == "duplicado":
-                                 st.toast("Você já aplicou para esta vaga antes.", icon="⚠️")
-                             else:
-                                 st.error("Erro ao aplicar.")
-                    else:
-                        st.button("Login p/ Aplicar", key=f"btn_l_{i}", disabled=True)
+        for vaga in vagas_lista:
+            cartao_vaga(vaga)
+
+    if st.session_state["logged_in"] and st.session_state["user_role"] == "candidato":
+        aplicar_em_lote_feed()
+
+    c_mais, c_atualizar = st.columns(2)
+    with c_mais:
+        if not st.session_state["feed_fim"]:
+            st.button("⬇️ Carregar mais vagas", on_click=carregar_mais_vagas, use_container_width=True)
+    with c_atualizar:
+        st.button("🔄 Ver vagas mais recentes", on_click=reiniciar_feed, use_container_width=True)
 
 with col2:
     st.info("💡 **Dica:** Utilize nosso Assistente de Busca para encontrar a vaga ideal.")
     st.markdown("### 🗺️ Mapa de Oportunidades")
-    
-    COORDENADAS_CIDADES = {
-        "sao paulo": [-23.5505, -46.6333], "sp": [-23.5505, -46.6333],
-        "rio de janeiro": [-22.9068, -43.1729], "rj": [-22.9068, -43.1729],
-        "belo horizonte": [-19.9167, -43.9345], "mg": [-19.9167, -43.9345],
-        "vitoria": [-20.3155, -40.3128], "es": [-20.3155, -40.3128],
-        "campinas": [-22.9099, -47.0626],
-        "santos": [-23.9618, -46.3322],
-        "sao jose dos campos": [-23.2237, -45.9009],
-        "ribeirao preto": [-21.1704, -47.8103],
-        "sorocaba": [-23.5015, -47.4521],
-        "uberlandia": [-18.9128, -48.2755],
-        "juiz de fora": [-21.7661, -43.3503],
-        "niteroi": [-22.8859, -43.1152],
-        "curitiba": [-25.4284, -49.2733], "pr": [-25.4284, -49.2733],
-        "florianopolis": [-27.5954, -48.5480], "sc": [-27.5954, -48.5480],
-        "porto alegre": [-30.0346, -51.2177], "rs": [-30.0346, -51.2177],
-        "joinville": [-26.3044, -48.8461],
-        "blumenau": [-26.9194, -49.0661],
-        "londrina": [-23.3045, -51.1696],
-        "maringa": [-23.4210, -51.9331],
-        "caxias do sul": [-29.1691, -51.1793],
-        "brasilia": [-15.7975, -47.8919], "df": [-15.7975, -47.8919],
-        "goiania": [-16.6869, -49.2648], "go": [-16.6869, -49.2648],
-        "cuiaba": [-15.6010, -56.0979], "mt": [-15.6010, -56.0979],
-        "campo grande": [-20.4697, -54.6201], "ms": [-20.4697, -54.6201],
-        "salvador": [-12.9777, -38.5016], "ba": [-12.9777, -38.5016],
-        "recife": [-8.0476, -34.8770], "pe": [-8.0476, -34.8770],
-        "fortaleza": [-3.7172, -38.5434], "ce": [-3.7172, -38.5434],
-        "sao luis": [-2.5307, -44.3068], "ma": [-2.5307, -44.3068],
-        "maceio": [-9.6498, -35.7089], "al": [-9.6498, -35.7089],
-        "teresina": [-5.0920, -42.8038], "pi": [-5.0920, -42.8038],
-        "natal": [-5.7945, -35.2110], "rn": [-5.7945, -35.2110],
-        "joao pessoa": [-7.1195, -34.8450], "pb": [-7.1195, -34.8450],
-        "aracaju": [-10.9472, -37.0731], "se": [-10.9472, -37.0731],
-        "manaus": [-3.0425, -60.0020], "am": [-3.0425, -60.0020],
-        "belem": [-1.2721, -48.3014], "pa": [-1.2721, -48.3014],
-        "porto velho": [-8.7612, -63.9039], "ro": [-8.7612, -63.9039],
-        "boa vista": [2.8235, -60.6758], "rr": [2.8235, -60.6758],
-        "macapa": [0.0355, -51.0705], "ap": [0.0355, -51.0705],
-        "rio branco": [-9.9754, -67.8249], "ac": [-9.9754, -67.8249],
-        "palmas": [-10.2491, -48.3243], "to": [-10.2491, -48.3243],
-        "nova iorque": [40.7128, -74.0060], "new york": [40.7128, -74.0060], "ny": [40.7128, -74.0060],
-        "san francisco": [37.7749, -122.4194], "vale do silicio": [37.3875, -122.0575], "silicon valley": [37.3875, -122.0575],
-        "austin": [30.2672, -97.7431], "texas": [31.9686, -99.9018],
-        "seattle": [47.6062, -122.3321],
-        "boston": [42.3601, -71.0589],
-        "miami": [25.7617, -80.1918], "florida": [27.6648, -81.5158],
-        "toronto": [43.6510, -79.3470],
-        "vancouver": [49.2827, -123.1207],
-        "montreal": [45.5017, -73.5673],
-        "quebec": [46.8139, -71.2080],
-        "lisboa": [38.7223, -9.1393], "lisbon": [38.7223, -9.1393],
-        "porto": [41.1579, -8.6291],
-        "londres": [51.5074, -0.1278], "london": [51.5074, -0.1278],
-        "berlim": [52.5200, 13.4050], "berlin": [52.5200, 13.4050],
-        "munique": [48.1351, 11.5820], "munich": [48.1351, 11.5820],
-        "amsterdam": [52.3676, 4.9041], "amsterda": [52.3676, 4.9041],
-        "madrid": [40.4168, -3.7038],
-        "barcelona": [41.3851, 2.1734],
-        "dublin": [53.3498, -6.2603],
-        "paris": [48.8566, 2.3522],
-        "tallinn": [59.4370, 24.7536],
-        "buenos aires": [-34.6037, -58.3816],
-        "santiago": [-33.4489, -70.6693],
-        "montevideu": [-34.9011, -56.1645],
-        "cidade do mexico": [19.4326, -99.1332],
-        "mexico city": [19.4326, -99.1332],
-        "bogota": [4.7110, -74.0721],
-        "sydney": [-33.8688, 151.2093],
-        "melbourne": [-37.8136, 144.9631],
-        "cingapura": [1.3521, 103.8198], 
-        "singapore": [1.3521, 103.8198],
-        "toquio": [35.6762, 139.6503], 
-        "tokyo": [35.6762, 139.6503],
-        "tel aviv": [32.0853, 34.7818]
-    }
+    mapa_vagas()
 
-    
-    pontos_mapa = []
-    
-    chaves_ordenadas = sorted(COORDENADAS_CIDADES.keys(), key=len, reverse=True)
-
-    for vaga in vagas_lista:
-        local_texto = vaga.get("local", "").lower()
-        local_texto = local_texto.replace("ã", "a").replace("á", "a").replace("â", "a").replace("é", "e").replace("í", "i").replace("ç", "c").replace("õ", "o").replace("ó", "o")
-        
-        encontrou_cidade = False
-        
-        for cidade in chaves_ordenadas:
-            if re.search(r'\b' + re.escape(cidade) + r'\b', local_texto):
-                coords = COORDENADAS_CIDADES[cidade]
-                pontos_mapa.append({"lat": coords[0], "lon": coords[1]})
-                encontrou_cidade = True
-                break
-        
-    if len(pontos_mapa) > 0:
-        df_mapa = pd.DataFrame(pontos_mapa)
-        st.map(df_mapa, zoom=3)
-    else:
-        st.caption("Nenhuma vaga com localização presencial mapeada.")
-        st.map(pd.DataFrame({'lat': [-15.7975], 'lon': [-47.8919]}), zoom=3)
\ No newline at end of file
+finalizar_rerun()
@@ -0,0 +1,252 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+# Custo padrão do scrypt (~16 MiB de memória por hash); ajustável em [auth] no secrets.toml.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERACOES = 600000
+TAMANHO_SAL = 16
+
+MAX_HASHES_SIMULTANEOS = 2
+VALIDADE_TOKEN = 8 * 60 * 60
+CAPACIDADE_CACHE_TOKENS = 1024
+# De quanto em quanto tempo um token em uso é conferido de novo na lista de revogados do banco
+# (logout feito em outra réplica); no processo que revogou, vale na hora.
+INTERVALO_REVOGACAO = 30
+
+
+def _configuracao():
+    try:
+        import streamlit as st
+
+        return dict(st.secrets.get("auth", {}))
+    except Exception:
+        return {}
+
+
+_config = _configuracao()
+
+# Sem segredo configurado, os tokens valem só enquanto este processo estiver de pé.
+_SEGREDO_TOKEN = str(_config.get("segredo_token") or secrets.token_hex(32)).encode("utf-8")
+
+# No máximo MAX_HASHES_SIMULTANEOS hashes caros ao mesmo tempo no processo (o scrypt usa
+# ~16 MiB cada). O cálculo roda na própria thread da sessão: hashlib libera o GIL, então as
+# demais sessões seguem atendidas enquanto ele acontece.
+_limite_hashes = threading.BoundedSemaphore(int(_config.get("max_hashes_simultaneos", MAX_HASHES_SIMULTANEOS)))
+
+
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode("ascii")
+
+
+def _de_b64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _derivar(senha, algoritmo, parametros, sal):
+    if algoritmo == "scrypt":
+        n, r, p = parametros
+        return hashlib.scrypt(senha.encode("utf-8"), salt=sal, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+    (iteracoes,) = parametros
+    return hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), sal, iteracoes, dklen=32)
+
+
+def _gerar_hash(senha):
+    algoritmo = _config.get("kdf", "scrypt")
+    if algoritmo == "scrypt":
+        parametros = (
+            int(_config.get("scrypt_n", SCRYPT_N)),
+            int(_config.get("scrypt_r", SCRYPT_R)),
+            int(_config.get("scrypt_p", SCRYPT_P)),
+        )
+    else:
+        algoritmo = "pbkdf2"
+        parametros = (int(_config.get("pbkdf2_iteracoes", PBKDF2_ITERACOES)),)
+
+    sal = os.urandom(TAMANHO_SAL)
+    derivada = _derivar(senha, algoritmo, parametros, sal)
+    # Formato: algoritmo$param1,param2,...$sal$hash — os parâmetros ficam junto do hash,
+    # então mudar o custo na configuração não invalida as senhas antigas.
+    return f"{algoritmo}${','.join(map(str, parametros))}${_b64(sal)}${_b64(derivada)}"
+
+
+def _conferir(senha, hash_armazenado):
+    try:
+        algoritmo, parametros, sal, esperado = hash_armazenado.split("$")
+        parametros = tuple(int(p) for p in parametros.split(","))
+        derivada = _derivar(senha, algoritmo, parametros, _de_b64(sal))
+        return hmac.compare_digest(derivada, _de_b64(esperado))
+    except (ValueError, TypeError):
+        return False
+
+
+def gerar_hash_senha(senha):
+    with _limite_hashes:
+        return _gerar_hash(senha)
+
+
+def conferir_senha(senha, hash_armazenado):
+    with _limite_hashes:
+        return _conferir(senha, hash_armazenado)
+
+
+def verificar_login(db, username, senha):
+    # Leitura pontual pelo índice único de username; a senha é conferida com o hash guardado.
+    usuario = db.usuarios.find_one({"username": username})
+    if usuario is None:
+        return None
+
+    if "senha_hash" in usuario:
+        return usuario if conferir_senha(senha, usuario["senha_hash"]) else None
+
+    # Conta antiga com senha em texto puro: confere e migra para hash no primeiro login.
+    if "senha" in usuario and hmac.compare_digest(str(usuario["senha"]).encode("utf-8"), senha.encode("utf-8")):
+        db.usuarios.update_one(
+            {"_id": usuario["_id"]},
+            {"$set": {"senha_hash": gerar_hash_senha(senha)}, "$unset": {"senha": ""}},
+        )
+        return usuario
+    return None
+
+
+def cadastrar_usuario(db, nome, username, senha, role):
+    # A duplicidade é detectada pelo índice único (usuarios_username), sem find_one antes:
+    # não há janela entre checar e inserir.
+    novo_usuario = {
+        "nome": nome,
+        "username": username,
+        "senha_hash": gerar_hash_senha(senha),
+        "role": role,
+        "data_criacao": datetime.now(),
+    }
+    try:
+        db.usuarios.insert_one(novo_usuario)
+    except DuplicateKeyError:
+        return None
+    return novo_usuario
+
+
+def emitir_token(usuario, validade=VALIDADE_TOKEN):
+    dados = {
+        "id": str(usuario["_id"]),
+        "username": usuario["username"],
+        "nome": usuario["nome"],
+        "role": usuario["role"],
+        "exp": int(time.time()) + validade,
+    }
+    corpo = _b64(json.dumps(dados, separators=(",", ":")).encode("utf-8"))
+    assinatura = _b64(hmac.new(_SEGREDO_TOKEN, corpo.encode("ascii"), hashlib.sha256).digest())
+    return f"{corpo}.{assinatura}"
+
+
+_tokens_validos = OrderedDict()
+_lock_tokens = threading.Lock()
+
+
+_revogados = OrderedDict()
+
+
+def _chave_revogacao(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _revogado_no_banco(db, token):
+    try:
+        return db.tokens_revogados.find_one({"_id": _chave_revogacao(token)}, {"_id": 1}) is not None
+    except PyMongoError:
+        # Banco fora do ar: vale a assinatura, como nos reruns entre duas conferências.
+        return False
+
+
+def validar_token(token, db=None):
+    # Tokens já conferidos ficam em um LRU pequeno: nos reruns só resta checar a expiração,
+    # sem recalcular o HMAC, e a lista de revogados do banco é consultada no máximo a cada
+    # INTERVALO_REVOGACAO por token.
+    if not token:
+        return None
+
+    with _lock_tokens:
+        if token in _revogados:
+            return None
+        entrada = _tokens_validos.get(token)
+        if entrada is not None:
+            _tokens_validos.move_to_end(token)
+
+    if entrada is None:
+        try:
+            corpo, assinatura = token.split(".")
+            esperada = hmac.new(_SEGREDO_TOKEN, corpo.encode("ascii"), hashlib.sha256).digest()
+            if not hmac.compare_digest(esperada, _de_b64(assinatura)):
+                return None
+            entrada = {"dados": json.loads(_de_b64(corpo)), "conferido_em": None}
+        except ValueError:
+            return None
+        with _lock_tokens:
+            _tokens_validos[token] = entrada
+            while len(_tokens_validos) > CAPACIDADE_CACHE_TOKENS:
+                _tokens_validos.popitem(last=False)
+
+    dados = entrada["dados"]
+    if dados["exp"] < time.time():
+        with _lock_tokens:
+            _tokens_validos.pop(token, None)
+        return None
+    agora = time.monotonic()
+    if db is not None and (entrada["conferido_em"] is None or agora - entrada["conferido_em"] > INTERVALO_REVOGACAO):
+        if _revogado_no_banco(db, token):
+            _marcar_revogado(token)
+            return None
+        entrada["conferido_em"] = agora
+    return dados
+
+
+def _marcar_revogado(token):
+    with _lock_tokens:
+        _tokens_validos.pop(token, None)
+        _revogados[token] = True
+        while len(_revogados) > CAPACIDADE_CACHE_TOKENS:
+            _revogados.popitem(last=False)
+
+
+def revogar_token(token, db=None):
+    # Logout: o token entra na lista de revogados do banco (tokens_revogados, que expira junto
+    # com ele pelo índice TTL) e deixa de valer em todas as réplicas, não só nesta.
+    dados = validar_token(token)
+    if dados is None:
+        return
+    _marcar_revogado(token)
+    if db is not None:
+        db.tokens_revogados.update_one(
+            {"_id": _chave_revogacao(token)},
+            {"$set": {"expira_em": datetime.fromtimestamp(dados["exp"])}},
+            upsert=True,
+        )
+
+
+def id_usuario(dados_sessao):
+    # _id do login (usuarios), a identidade estável do usuário; o nome exibido pode se repetir.
+    return ObjectId(dados_sessao["id"]) if dados_sessao else None
+
+
+def sessao_atual(session_state, db=None):
+    # Usuário logado segundo o token assinado da sessão; encerra a sessão se o token expirou
+    # ou foi revogado.
+    dados = validar_token(session_state.get("token"), db)
+    if dados is None and session_state.get("logged_in"):
+        session_state["logged_in"] = False
+        session_state["user_role"] = None
+        session_state["user_name"] = None
+        session_state["token"] = None
+    return dados
@@ -0,0 +1,189 @@
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter
+
+from cache import artefato_compartilhado, ouvir_escritas, versoes_apos_escrita, versoes_colecoes
+from texto import normalizar_texto
+
+LIMITE_SUGESTOES = 8
+# Opções entregues aos campos com filtro no navegador (selectbox/multiselect).
+LIMITE_OPCOES = 500
+MAX_PALAVRAS_TERMO = 4
+MAX_CARACTERES_TERMO = 40
+MAX_RESULTADOS_MEMORIZADOS = 4096
+
+# De onde sai cada tipo de sugestão: categoria -> {coleção: campos}.
+FONTES = {
+    "skills": {"vagas": ["requisitos", "skills"], "candidatos": ["skills"]},
+    "titulos": {"vagas": ["titulo"]},
+    "locais": {"vagas": ["local"]},
+}
+# Campos de lista ("Python, Django, SQL"); os demais valem como um termo só.
+CAMPOS_LISTA = {"requisitos", "skills"}
+
+_SEPARADORES = re.compile(r"[,;\n•|]+")
+_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_termo(termo):
+    return _ESPACOS.sub(" ", normalizar_texto(termo)).strip(" .-")
+
+
+def extrair_termos(campo, valor):
+    if not isinstance(valor, str):
+        return []
+    partes = _SEPARADORES.split(valor) if campo in CAMPOS_LISTA else [valor]
+    termos = []
+    for parte in partes:
+        grafia = _ESPACOS.sub(" ", parte).strip(" .-")
+        # Frases inteiras (requisitos escritos em prosa) não viram sugestão.
+        if grafia and len(grafia) <= MAX_CARACTERES_TERMO and len(grafia.split()) <= MAX_PALAVRAS_TERMO:
+            termos.append(grafia)
+    return termos
+
+
+class IndicePrefixos:
+    # Termos normalizados (minúsculas, sem acento) em uma lista ordenada: os que começam com um
+    # prefixo formam um intervalo contíguo, achado com duas buscas binárias. Cada termo guarda
+    # em quantos documentos aparece e as grafias usadas; a sugestão exibe a grafia mais comum.
+
+    def __init__(self):
+        self._chaves = []
+        self._frequencias = {}
+        self._grafias = {}
+        self._termos_doc = {}
+        self._resultados = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def __getstate__(self):
+        # Para publicar no cache compartilhado: sem o lock e sem os resultados memorizados.
+        return {chave: valor for chave, valor in self.__dict__.items() if chave not in ("_lock", "_resultados")}
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._resultados = {}
+        self._lock = threading.RLock()
+
+    def adicionar(self, doc_id, grafias):
+        por_chave = {}
+        for grafia in grafias:
+            chave = normalizar_termo(grafia)
+            if chave:
+                por_chave.setdefault(chave, grafia)
+        with self._lock:
+            self.remover(doc_id)
+            for chave, grafia in por_chave.items():
+                if chave not in self._frequencias:
+                    bisect.insort(self._chaves, chave)
+                    self._frequencias[chave] = 0
+                    self._grafias[chave] = Counter()
+                self._frequencias[chave] += 1
+                self._grafias[chave][grafia] += 1
+            self._termos_doc[doc_id] = list(por_chave.items())
+            self._resultados.clear()
+
+    def remover(self, doc_id):
+        with self._lock:
+            termos = self._termos_doc.pop(doc_id, None)
+            if termos is None:
+                return
+            for chave, grafia in termos:
+                self._frequencias[chave] -= 1
+                self._grafias[chave][grafia] -= 1
+                if self._grafias[chave][grafia] <= 0:
+                    del self._grafias[chave][grafia]
+                if self._frequencias[chave] <= 0:
+                    del self._frequencias[chave]
+                    del self._grafias[chave]
+                    del self._chaves[bisect.bisect_left(self._chaves, chave)]
+            self._resultados.clear()
+
+    def completar(self, prefixo, k=LIMITE_SUGESTOES):
+        chave = normalizar_termo(prefixo)
+        with self._lock:
+            # Prefixos curtos casam com muitos termos; o resultado fica guardado até a próxima escrita.
+            resultado = self._resultados.get((chave, k))
+            if resultado is not None:
+                return resultado
+            inicio = bisect.bisect_left(self._chaves, chave)
+            fim = bisect.bisect_left(self._chaves, chave + "\uffff", lo=inicio)
+            melhores = heapq.nlargest(k, self._chaves[inicio:fim], key=self._frequencias.__getitem__)
+            resultado = [self._grafias[c].most_common(1)[0][0] for c in melhores]
+            if len(self._resultados) >= MAX_RESULTADOS_MEMORIZADOS:
+                self._resultados.clear()
+            self._resultados[(chave, k)] = resultado
+            return resultado
+
+
+_indices = {}
+# Versões das coleções de origem que cada índice reflete (ver obter_indice).
+_versoes_indices = {}
+_lock_indices = threading.Lock()
+
+
+def _termos_documento(categoria, colecao, documento):
+    termos = []
+    for campo in FONTES[categoria].get(colecao, ()):
+        termos.extend(extrair_termos(campo, documento.get(campo)))
+    return termos
+
+
+def construir_indice(db, categoria):
+    indice = IndicePrefixos()
+    for colecao, campos in FONTES[categoria].items():
+        for documento in db[colecao].find({}, {campo: 1 for campo in campos}).batch_size(1000):
+            indice.adicionar((colecao, documento["_id"]), _termos_documento(categoria, colecao, documento))
+    return indice
+
+
+def obter_indice(db, categoria):
+    # Construído no primeiro uso (ou copiado de outra réplica pelo cache compartilhado) e depois
+    # atualizado pelas escritas deste processo; recarregado quando as versões das coleções de
+    # origem mostram escritas de fora (outra réplica, importar.py...).
+    colecoes = tuple(FONTES[categoria])
+    versoes = versoes_colecoes(colecoes)
+    indice = _indices.get(categoria)
+    if indice is None or _versoes_indices.get(categoria) != versoes:
+        with _lock_indices:
+            indice = _indices.get(categoria)
+            if indice is None or _versoes_indices.get(categoria) != versoes:
+                indice = artefato_compartilhado(
+                    f"prefixos:{db.name}:{categoria}", colecoes, lambda: construir_indice(db, categoria), versoes=versoes
+                )
+                _indices[categoria] = indice
+                _versoes_indices[categoria] = versoes
+    return indice
+
+
+def sugerir(db, categoria, prefixo="", k=LIMITE_SUGESTOES):
+    return obter_indice(db, categoria).completar(prefixo, k)
+
+
+def sugerir_termos(db, categoria, texto, k=LIMITE_SUGESTOES):
+    # Completa a última palavra digitada (ex.: "gerente de proj" -> "Gerente de Projetos").
+    palavras = texto.split()
+    if not palavras:
+        return []
+    for inicio in range(len(palavras)):
+        sugestoes = sugerir(db, categoria, " ".join(palavras[inicio:]), k)
+        if sugestoes:
+            return sugestoes
+    return []
+
+
+def _ao_escrever(colecao, documento):
+    # Sem o documento, a escrita não é aplicada e o índice é recarregado no próximo uso.
+    if documento is None or "_id" not in documento:
+        return
+    for categoria, indice in list(_indices.items()):
+        if colecao in FONTES[categoria]:
+            indice.adicionar((colecao, documento["_id"]), _termos_documento(categoria, colecao, documento))
+            _versoes_indices[categoria] = versoes_apos_escrita(_versoes_indices[categoria], tuple(FONTES[categoria]), colecao)
+
+
+ouvir_escritas(_ao_escrever)
@@ -0,0 +1,174 @@
+import argparse
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from aplicacoes import CODIGO_CHAVE_DUPLICADA
+from cache import invalidar_colecao
+from db import get_database
+from geo import resolver_local
+from salario import interpretar_salario
+
+TAMANHO_LOTE = 1000
+
+
+def _gravar_lote(colecao, lote):
+    # Um documento que colidiria com outro em um índice único fica como está; o resto do lote
+    # é gravado normalmente (ordered=False).
+    try:
+        return colecao.bulk_write(lote, ordered=False).modified_count, 0
+    except BulkWriteError as e:
+        erros = e.details["writeErrors"]
+        if any(erro["code"] != CODIGO_CHAVE_DUPLICADA for erro in erros):
+            raise
+        return e.details["nModified"], len(erros)
+
+
+def _gravar_em_lotes(colecao, operacoes):
+    total = duplicados = 0
+    lote = []
+    for operacao in operacoes:
+        lote.append(operacao)
+        if len(lote) >= TAMANHO_LOTE:
+            modificados, repetidos = _gravar_lote(colecao, lote)
+            total, duplicados = total + modificados, duplicados + repetidos
+            lote = []
+    if lote:
+        modificados, repetidos = _gravar_lote(colecao, lote)
+        total, duplicados = total + modificados, duplicados + repetidos
+    if duplicados:
+        print(f"⚠️ {duplicados} documento(s) de {colecao.name} ficaram sem atualizar: já existe outro com a mesma chave única.")
+    if total:
+        # Sobe a versão compartilhada para as réplicas do app descartarem o que têm em cache.
+        invalidar_colecao(colecao.name)
+    return total
+
+
+def backfill_geo(db, todos=False):
+    # Resolve o campo "geo" das vagas antigas, gravadas antes da geocodificação na escrita.
+    filtro = {} if todos else {"geo": {"$exists": False}}
+    cursor = db.vagas.find(filtro, {"local": 1}).batch_size(TAMANHO_LOTE)
+    # data_atualizacao: é por ela que o monitor ao vivo em polling enxerga a vaga editada.
+    agora = datetime.now()
+    operacoes = (
+        UpdateOne({"_id": vaga["_id"]}, {"$set": {"geo": resolver_local(vaga.get("local", "")), "data_atualizacao": agora}})
+        for vaga in cursor
+    )
+    return _gravar_em_lotes(db.vagas, operacoes)
+
+
+def backfill_salario(db, todos=False):
+    # Interpreta o texto livre de "salario" nas vagas gravadas antes dos campos numéricos.
+    filtro = {} if todos else {"salario_a_combinar": {"$exists": False}}
+    cursor = db.vagas.find(filtro, {"salario": 1}).batch_size(TAMANHO_LOTE)
+    agora = datetime.now()
+    operacoes = (
+        UpdateOne({"_id": vaga["_id"]}, {"$set": {**interpretar_salario(vaga.get("salario", "")), "data_atualizacao": agora}})
+        for vaga in cursor
+    )
+    return _gravar_em_lotes(db.vagas, operacoes)
+
+
+def backfill_aplicacoes(db, todos=False):
+    # Candidaturas antigas guardavam só título/empresa da vaga: liga cada uma ao _id da vaga
+    # (a mais recente, se houver mais de uma com o mesmo título na mesma empresa).
+    filtro = {} if todos else {"vaga_id": {"$exists": False}}
+    vagas = {}
+    for vaga in db.vagas.find({}, {"titulo": 1, "empresa": 1}).sort("data_criacao", 1):
+        vagas[(vaga.get("titulo"), vaga.get("empresa"))] = vaga["_id"]
+
+    cursor = db.aplicacoes.find(filtro, {"vaga_titulo": 1, "empresa_vaga": 1}).batch_size(TAMANHO_LOTE)
+    operacoes = (
+        UpdateOne({"_id": aplicacao["_id"]}, {"$set": {"vaga_id": vagas[chave]}})
+        for aplicacao in cursor
+        if (chave := (aplicacao.get("vaga_titulo"), aplicacao.get("empresa_vaga"))) in vagas
+    )
+    return _gravar_em_lotes(db.aplicacoes, operacoes)
+
+
+def _mapa_usuarios(db):
+    por_username, por_nome = {}, {}
+    for usuario in db.usuarios.find({"role": "candidato"}, {"username": 1, "nome": 1}):
+        por_username[usuario.get("username")] = usuario["_id"]
+        por_nome.setdefault(usuario.get("nome"), []).append(usuario["_id"])
+    return por_username, por_nome
+
+
+def _resolver_usuario(chaves, por_username, por_nome):
+    # O login (username) primeiro; o nome exibido só vale se pertencer a um único usuário.
+    for chave in chaves:
+        if chave in por_username:
+            return por_username[chave]
+    for chave in chaves:
+        ids = por_nome.get(chave, [])
+        if len(ids) == 1:
+            return ids[0]
+    return None
+
+
+def backfill_perfis(db, todos=False):
+    # Liga perfis e candidaturas antigos (gravados por nome/username_vinculo) ao _id do login.
+    # Perfis já ligados pelo app não mudam; se vários perfis antigos levam ao mesmo usuário,
+    # o mais recente fica com o vínculo e os demais seguem no banco, sem vínculo.
+    por_username, por_nome = _mapa_usuarios(db)
+    ja_ligados = {p["usuario_id"] for p in db.candidatos.find({"usuario_id": {"$exists": True}}, {"usuario_id": 1})}
+
+    escolhidos = {}
+    duplicados = 0
+    cursor = db.candidatos.find(
+        {"usuario_id": {"$exists": False}}, {"nome": 1, "username_vinculo": 1, "data_atualizacao": 1}
+    ).batch_size(TAMANHO_LOTE)
+    for perfil in cursor:
+        id_usuario = _resolver_usuario((perfil.get("username_vinculo"), perfil.get("nome")), por_username, por_nome)
+        if id_usuario is None:
+            continue
+        if id_usuario in ja_ligados:
+            duplicados += 1
+            continue
+        versao = (perfil.get("data_atualizacao") or datetime.min, perfil["_id"])
+        if id_usuario in escolhidos:
+            duplicados += 1
+            if versao < escolhidos[id_usuario]:
+                continue
+        escolhidos[id_usuario] = versao
+
+    if duplicados:
+        print(f"⚠️ {duplicados} perfil(is) repetido(s) ficaram sem vínculo (vale o mais recente de cada usuário).")
+    atualizados = _gravar_em_lotes(db.candidatos, (
+        UpdateOne({"_id": id_perfil}, {"$set": {"usuario_id": id_usuario}})
+        for id_usuario, (_, id_perfil) in escolhidos.items()
+    ))
+
+    # Candidaturas antigas guardavam o nome exibido em candidato_username, não o login: só
+    # valem nomes de um único usuário (o nome de um pode ser o login de outro).
+    filtro = {} if todos else {"candidato_id": {"$exists": False}}
+    cursor = db.aplicacoes.find(filtro, {"candidato_username": 1}).batch_size(TAMANHO_LOTE)
+    operacoes = (
+        UpdateOne({"_id": aplicacao["_id"]}, {"$set": {"candidato_id": id_usuario}})
+        for aplicacao in cursor
+        if (id_usuario := _resolver_usuario((aplicacao.get("candidato_username"),), {}, por_nome))
+    )
+    return atualizados + _gravar_em_lotes(db.aplicacoes, operacoes)
+
+
+TAREFAS = {
+    "geo": backfill_geo,
+    "salario": backfill_salario,
+    "aplicacoes": backfill_aplicacoes,
+    "perfis": backfill_perfis,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preenche campos derivados em documentos já existentes.")
+    parser.add_argument("tarefa", choices=sorted(TAREFAS))
+    parser.add_argument("--todos", action="store_true", help="Recalcula inclusive documentos já preenchidos.")
+    args = parser.parse_args()
+
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+    else:
+        atualizados = TAREFAS[args.tarefa](db, todos=args.todos)
+        print(f"✅ Backfill '{args.tarefa}' concluído: {atualizados} documento(s) atualizado(s).")
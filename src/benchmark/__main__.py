@@ -0,0 +1,130 @@
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pymongo
+
+from auth import gerar_hash_senha
+from criar_indices import aplicar, planejar
+
+from benchmark.cenarios import CENARIOS, contexto_escala, medir
+from benchmark.gerador import (
+    PROPORCOES, SENHA_PADRAO, gerar_aplicacoes, gerar_candidatos, gerar_usuarios, gerar_vagas,
+)
+
+URI_PADRAO = "mongodb://localhost:27017"
+BANCO_PADRAO = "portal_vagas_benchmark"
+TAMANHO_LOTE = 5000
+
+
+def _conectar(alvo, uri, banco):
+    if alvo == "memoria":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("O alvo 'memoria' precisa do pacote mongomock (pip install mongomock).")
+        return mongomock.MongoClient()[banco]
+    return pymongo.MongoClient(uri, serverSelectionTimeoutMS=5000)[banco]
+
+
+def _inserir(colecao, documentos, ao_inserir=None):
+    inicio = time.perf_counter()
+    total = 0
+    lote = []
+
+    def gravar():
+        ids = colecao.insert_many(lote, ordered=False).inserted_ids
+        if ao_inserir:
+            ao_inserir(lote, ids)
+
+    for documento in documentos:
+        lote.append(documento)
+        if len(lote) >= TAMANHO_LOTE:
+            gravar()
+            total += len(lote)
+            lote = []
+    if lote:
+        gravar()
+        total += len(lote)
+    segundos = time.perf_counter() - inicio
+    print(f"📥 {colecao.name}: {total} documento(s) em {segundos:.1f} s", file=sys.stderr)
+    return {"documentos": total, "segundos": round(segundos, 3), "docs_por_s": round(total / max(segundos, 1e-9))}
+
+
+def carregar(db, escala, semente):
+    for colecao in ("vagas", "candidatos", "usuarios", "aplicacoes", "stats", "matches"):
+        db.drop_collection(colecao)
+    # Os mesmos índices do app, do manifesto; a saída do criar_indices vai para o stderr.
+    with contextlib.redirect_stdout(sys.stderr):
+        aplicar(db, planejar(db))
+
+    vagas = []
+
+    def guardar_vagas(lote, ids):
+        vagas.extend((id_vaga, vaga["titulo"], vaga["empresa"]) for vaga, id_vaga in zip(lote, ids))
+
+    senha_hash = gerar_hash_senha(SENHA_PADRAO)
+    return {
+        "vagas": _inserir(db.vagas, gerar_vagas(escala, semente), guardar_vagas),
+        "candidatos": _inserir(db.candidatos, gerar_candidatos(escala, semente + 1)),
+        "usuarios": _inserir(db.usuarios, gerar_usuarios(escala, senha_hash)),
+        "aplicacoes": _inserir(db.aplicacoes, gerar_aplicacoes(vagas, escala, semente + 2)),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Gera dados sintéticos na escala pedida e mede os caminhos de consulta do app.",
+    )
+    parser.add_argument("--escala", type=int, default=1000, help="Quantidade de vagas (as demais coleções são proporcionais).")
+    parser.add_argument("--alvo", choices=["mongod", "memoria"], default="mongod")
+    parser.add_argument("--uri", default=URI_PADRAO)
+    parser.add_argument("--banco", default=BANCO_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cenarios", nargs="*", choices=sorted(CENARIOS), default=sorted(CENARIOS))
+    parser.add_argument("--reusar", action="store_true", help="Não recarrega os dados (mesma escala e semente de antes).")
+    parser.add_argument("--saida", help="Arquivo JSON de resultado (padrão: stdout).")
+    args = parser.parse_args()
+
+    db = _conectar(args.alvo, args.uri, args.banco)
+    carga = None if args.reusar else carregar(db, args.escala, args.semente)
+    contexto = contexto_escala(args.escala, int(args.escala * PROPORCOES["candidatos"]))
+
+    cenarios = {}
+    for nome in args.cenarios:
+        print(f"⏱️ {nome}...", file=sys.stderr)
+        cenarios[nome] = medir(CENARIOS[nome], db, contexto, args.repeticoes, args.semente)
+
+    resultado = {
+        "versao": 1,
+        "commit": _commit(),
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pymongo": pymongo.version,
+        "alvo": args.alvo,
+        "escala": args.escala,
+        "semente": args.semente,
+        "carga": carga,
+        "cenarios": cenarios,
+    }
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+        print(f"✅ Resultado gravado em {args.saida}", file=sys.stderr)
+    else:
+        print(texto)
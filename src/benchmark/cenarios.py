@@ -0,0 +1,143 @@
+import random
+import statistics
+import time
+
+from auth import verificar_login
+from autocompletar import sugerir
+from consultas import (
+    buscar_por_texto, carregar_pagina_vagas, carregar_painel_empregador, carregar_pontos_mapa,
+)
+from estatisticas import carregar_estatisticas, recalcular_estatisticas
+from geo import resolver_local
+
+from benchmark.gerador import CIDADES, SENHA_PADRAO, SKILLS, nomes_empresas, username_candidato
+
+TERMOS_BUSCA = ["python", "python sql", "vendas consultivas", "gerente de projetos", "react node.js", "inglês avançado"]
+PAGINAS_FEED = 5
+LOCAIS_GEOCODIFICACAO = 1000
+
+
+def _sem_cache(funcao):
+    # Mede o caminho real até o banco, não o acerto no cache de consultas.
+    return getattr(funcao, "__wrapped__", funcao)
+
+
+def feed_inicial(db, contexto, rng):
+    vagas, _ = _sem_cache(carregar_pagina_vagas)(db)
+    return len(vagas)
+
+
+def feed_paginado(db, contexto, rng):
+    total, cursor = 0, None
+    for _ in range(PAGINAS_FEED):
+        vagas, cursor = _sem_cache(carregar_pagina_vagas)(db, cursor)
+        total += len(vagas)
+        if cursor is None:
+            break
+    return total
+
+
+def feed_por_salario(db, contexto, rng):
+    # Maiores salários a partir de um piso sorteado, paginando pelo índice vagas_por_salario.
+    total, cursor, minimo = 0, None, rng.randrange(2000, 20000, 500)
+    for _ in range(PAGINAS_FEED):
+        vagas, cursor = _sem_cache(carregar_pagina_vagas)(db, cursor, salario_minimo=minimo, ordem="salario")
+        total += len(vagas)
+        if cursor is None:
+            break
+    return total
+
+
+def mapa(db, contexto, rng):
+    return len(_sem_cache(carregar_pontos_mapa)(db))
+
+
+def geocodificacao(db, contexto, rng):
+    locais = [f"{cidade} - {uf}" for cidade, uf in rng.choices(CIDADES, k=LOCAIS_GEOCODIFICACAO)]
+    return sum(1 for local in locais if resolver_local(local))
+
+
+def painel_empregador(db, contexto, rng):
+    return len(_sem_cache(carregar_painel_empregador)(db, rng.choice(contexto["empresas"])))
+
+
+def dashboard_recalculo(db, contexto, rng):
+    recalcular_estatisticas(db)
+    return 1
+
+
+def dashboard_leitura(db, contexto, rng):
+    carregar_estatisticas(db)
+    return 1
+
+
+def busca_texto_vagas(db, contexto, rng):
+    return len(buscar_por_texto(db.vagas, rng.choice(TERMOS_BUSCA)))
+
+
+def busca_texto_candidatos(db, contexto, rng):
+    return len(buscar_por_texto(db.candidatos, rng.choice(TERMOS_BUSCA)))
+
+
+def autocompletar(db, contexto, rng):
+    # Uma "digitação": os prefixos de uma skill, letra a letra. O índice é montado no aquecimento.
+    skill = rng.choice(SKILLS)
+    return sum(len(sugerir(db, "skills", skill[:n])) for n in range(1, min(len(skill), 6) + 1))
+
+
+def login(db, contexto, rng):
+    usuario = verificar_login(db, username_candidato(rng.randrange(contexto["candidatos"])), SENHA_PADRAO)
+    if usuario is None:
+        raise RuntimeError("login recusado")
+    return 1
+
+
+CENARIOS = {
+    "feed_inicial": feed_inicial,
+    "feed_paginado": feed_paginado,
+    "feed_por_salario": feed_por_salario,
+    "mapa": mapa,
+    "geocodificacao": geocodificacao,
+    "painel_empregador": painel_empregador,
+    "dashboard_recalculo": dashboard_recalculo,
+    "dashboard_leitura": dashboard_leitura,
+    "busca_texto_vagas": busca_texto_vagas,
+    "busca_texto_candidatos": busca_texto_candidatos,
+    "autocompletar": autocompletar,
+    "login": login,
+}
+
+
+def contexto_escala(escala, candidatos):
+    return {"empresas": nomes_empresas(escala), "candidatos": candidatos}
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(cenario, db, contexto, repeticoes, semente=0, aquecimento=1):
+    rng = random.Random(semente)
+    try:
+        for _ in range(aquecimento):
+            cenario(db, contexto, rng)
+        tempos, documentos = [], 0
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            documentos = cenario(db, contexto, rng)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    except Exception as e:
+        # O stand-in em memória não implementa todos os operadores ($text, $lookup com pipeline...).
+        return {"erro": f"{type(e).__name__}: {e}"}
+
+    ordenados = sorted(tempos)
+    return {
+        "repeticoes": repeticoes,
+        "p50_ms": round(_percentil(ordenados, 50), 3),
+        "p95_ms": round(_percentil(ordenados, 95), 3),
+        "p99_ms": round(_percentil(ordenados, 99), 3),
+        "media_ms": round(statistics.mean(tempos), 3),
+        "min_ms": round(ordenados[0], 3),
+        "max_ms": round(ordenados[-1], 3),
+        "documentos": documentos,
+    }
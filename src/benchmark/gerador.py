@@ -0,0 +1,159 @@
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from geo import resolver_local
+from salario import interpretar_salario
+
+CIDADES = [
+    ("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Curitiba", "PR"),
+    ("Porto Alegre", "RS"), ("Florianópolis", "SC"), ("Campinas", "SP"), ("Recife", "PE"),
+    ("Salvador", "BA"), ("Fortaleza", "CE"), ("Brasília", "DF"), ("Goiânia", "GO"),
+    ("Manaus", "AM"), ("Belém", "PA"), ("Vitória", "ES"), ("Joinville", "SC"),
+    ("Ribeirão Preto", "SP"), ("Uberlândia", "MG"), ("Londrina", "PR"), ("Natal", "RN"),
+    ("São José dos Campos", "SP"), ("Sorocaba", "SP"), ("Niterói", "RJ"), ("Maringá", "PR"),
+]
+
+CARGOS = [
+    "Desenvolvedor Back-end", "Desenvolvedor Front-end", "Desenvolvedor Full Stack", "Analista de Dados",
+    "Cientista de Dados", "Engenheiro de Dados", "Analista de Suporte", "Analista de Sistemas",
+    "Gerente de Projetos", "Product Owner", "Designer UX/UI", "Analista de Marketing Digital",
+    "Vendedor Interno", "Executivo de Contas", "Analista Financeiro", "Assistente Administrativo",
+    "Analista de RH", "Engenheiro DevOps", "Analista de Segurança da Informação", "Tech Lead",
+]
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "Django", "Flask", "SQL",
+    "MongoDB", "PostgreSQL", "Docker", "Kubernetes", "AWS", "Azure", "Git", "Power BI", "Excel avançado",
+    "Pandas", "Machine Learning", "Scrum", "Kanban", "Figma", "SEO", "Google Ads", "CRM",
+    "Negociação", "Vendas consultivas", "Comunicação", "Liderança", "Inglês avançado",
+    "Espanhol intermediário", "Atendimento ao cliente", "Gestão de pessoas", "Análise de indicadores",
+]
+
+FRASES_DESCRICAO = [
+    "Buscamos profissional para atuar em um time multidisciplinar",
+    "Você vai participar do desenvolvimento de novos produtos digitais",
+    "Atuação com clientes de grande porte em diversos segmentos",
+    "Oferecemos plano de carreira, vale-refeição e plano de saúde",
+    "Ambiente colaborativo, com foco em aprendizado contínuo",
+    "Responsável por acompanhar indicadores e propor melhorias nos processos",
+    "Participação em cerimônias ágeis e contato direto com a área de negócio",
+    "Desejável experiência prévia com projetos de alta disponibilidade",
+]
+
+EMPRESAS_BASE = ["Tech", "Dados", "Soluções", "Digital", "Sistemas", "Consultoria", "Varejo", "Logística", "Finanças", "Saúde"]
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sabrina", "Thiago", "Vanessa", "William"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Ferreira", "Costa", "Rodrigues",
+              "Almeida", "Nascimento", "Carvalho", "Gomes", "Martins", "Araújo", "Ribeiro"]
+FORMACOES = ["Ensino Médio", "Técnico", "Graduação", "Pós-Graduação / MBA", "Mestrado", "Doutorado"]
+TIPOS = ["Remoto", "Híbrido", "Presencial"]
+SENIORIDADES = ["Estágio", "Júnior", "Pleno", "Sênior", "Especialista"]
+
+# Quantidade de documentos de cada coleção para cada vaga da escala.
+PROPORCOES = {"candidatos": 1.0, "empregadores": 0.05, "aplicacoes": 3.0}
+
+SENHA_PADRAO = "senha123"
+DATA_BASE = datetime(2025, 1, 1)
+
+
+def _skills(rng, minimo=3, maximo=7):
+    return ", ".join(rng.sample(SKILLS, rng.randint(minimo, maximo)))
+
+
+def _local(rng):
+    cidade, uf = rng.choice(CIDADES)
+    tipo = rng.choices(TIPOS, weights=[3, 3, 4])[0]
+    local = "Remoto" if tipo == "Remoto" else f"{cidade} - {uf}"
+    return tipo, local
+
+
+def _data(rng, dias=365):
+    return DATA_BASE + timedelta(seconds=rng.randrange(dias * 24 * 3600))
+
+
+def nomes_empresas(escala):
+    total = max(1, int(escala * PROPORCOES["empregadores"]))
+    return [f"{EMPRESAS_BASE[i % len(EMPRESAS_BASE)]} {i // len(EMPRESAS_BASE) + 1}" for i in range(total)]
+
+
+def gerar_vagas(escala, semente=42):
+    rng = random.Random(semente)
+    empresas = nomes_empresas(escala)
+    for _ in range(escala):
+        tipo, local = _local(rng)
+        empresa = rng.choice(empresas)
+        minimo = rng.randrange(2000, 20000, 500)
+        senioridade = rng.choice(SENIORIDADES)
+        vaga = {
+            "titulo": f"{rng.choice(CARGOS)} {senioridade}",
+            "empresa": empresa,
+            "local": local,
+            "geo": resolver_local(local),
+            "tipo": tipo,
+            "salario": rng.choice(["A combinar", f"R$ {minimo:,} - R$ {minimo + rng.randrange(1000, 8000, 500):,}".replace(",", ".")]),
+            "senioridade": senioridade,
+            "descricao": ". ".join(rng.sample(FRASES_DESCRICAO, 3)) + ".",
+            "requisitos": _skills(rng),
+            "data_criacao": _data(rng),
+            "criado_por": empresa,
+        }
+        vaga.update(interpretar_salario(vaga["salario"]))
+        yield vaga
+
+
+def username_candidato(i):
+    return f"candidato{i}"
+
+
+def id_candidato(i):
+    # _id do login fixo por índice: perfis e candidaturas se ligam ao usuário sem consultar o banco.
+    return ObjectId(f"{i:024x}")
+
+
+def gerar_candidatos(escala, semente=43):
+    rng = random.Random(semente)
+    for i in range(int(escala * PROPORCOES["candidatos"])):
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {i}"
+        yield {
+            "nome": nome,
+            "formacao": rng.choice(FORMACOES),
+            "idiomas": rng.choice(["Inglês Básico", "Inglês Intermediário", "Inglês Avançado", "Espanhol Básico", ""]),
+            "resumo": f"Profissional com {rng.randint(1, 15)} anos de experiência como {rng.choice(CARGOS).lower()}.",
+            "experiencia": f"{rng.choice(EMPRESAS_BASE)} {rng.randint(1, 50)}: {rng.choice(CARGOS)}",
+            "skills": _skills(rng),
+            "data_atualizacao": _data(rng),
+            "usuario_id": id_candidato(i),
+            "username_vinculo": username_candidato(i),
+        }
+
+
+def gerar_usuarios(escala, senha_hash):
+    # Todos com o mesmo hash (calculado uma vez): gerar um scrypt por usuário levaria horas em 1M.
+    for i in range(int(escala * PROPORCOES["candidatos"])):
+        yield {"_id": id_candidato(i), "nome": f"Candidato {i}", "username": username_candidato(i),
+               "senha_hash": senha_hash, "role": "candidato", "data_criacao": DATA_BASE}
+    for empresa in nomes_empresas(escala):
+        yield {"nome": empresa, "username": empresa, "senha_hash": senha_hash,
+               "role": "empregador", "data_criacao": DATA_BASE}
+
+
+def gerar_aplicacoes(vagas, escala, semente=44):
+    # vagas: lista de (_id, titulo, empresa). Cada candidato aplica para vagas distintas entre si,
+    # então os pares (vaga, candidato) nunca se repetem, como exige o índice único
+    # aplicacoes_vaga_candidato, sem guardar os pares já gerados.
+    rng = random.Random(semente)
+    media = PROPORCOES["aplicacoes"] / PROPORCOES["candidatos"]
+    for candidato in range(int(escala * PROPORCOES["candidatos"])):
+        quantidade = min(len(vagas), rng.randint(0, int(2 * media)))
+        for indice_vaga in rng.sample(range(len(vagas)), quantidade):
+            id_vaga, titulo, empresa = vagas[indice_vaga]
+            yield {
+                "vaga_id": id_vaga,
+                "vaga_titulo": titulo,
+                "empresa_vaga": empresa,
+                "candidato_id": id_candidato(candidato),
+                "candidato_username": f"Candidato {candidato}",
+                "data_aplicacao": _data(rng),
+            }
@@ -0,0 +1,57 @@
+import argparse
+import statistics
+import time
+
+import busca_local
+from consultas import buscar_por_texto
+from db import get_database
+
+CONSULTAS_PADRAO = ["python", "python sql", "vendas", "gerente de projetos", "react node.js", "inglês avançado"]
+
+
+def _medir(funcao, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos, resultado
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def comparar(db, colecao, consultas, repeticoes):
+    inicio = time.perf_counter()
+    indice = busca_local.obter_indice(db, colecao)
+    print(f"📚 Índice BM25 de {colecao}: {len(indice)} documento(s) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    print(f"{'consulta':<24}{'backend':<8}{'p50 ms':>10}{'p95 ms':>10}{'média ms':>10}{'docs':>8}")
+
+    for consulta in consultas:
+        backends = {
+            "mongo": lambda: buscar_por_texto(db[colecao], consulta),
+            "bm25": lambda: indice.buscar(consulta),
+        }
+        for nome, funcao in backends.items():
+            tempos, resultado = _medir(funcao, repeticoes)
+            print(
+                f"{consulta:<24}{nome:<8}{_percentil(tempos, 50):>10.2f}{_percentil(tempos, 95):>10.2f}"
+                f"{statistics.mean(tempos):>10.2f}{len(resultado):>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara a latência da busca $text do MongoDB com o BM25 local.")
+    parser.add_argument("--colecao", choices=sorted(busca_local.PESOS_CAMPOS), default="vagas")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("consultas", nargs="*", default=CONSULTAS_PADRAO)
+    args = parser.parse_args()
+
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+    else:
+        comparar(db, args.colecao, args.consultas, args.repeticoes)
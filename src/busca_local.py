@@ -0,0 +1,156 @@
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+
+from cache import artefato_compartilhado, ouvir_escritas, versoes_apos_escrita, versoes_colecoes
+from texto import tokenizar
+
+K1 = 1.2
+B = 0.75
+TOP_K_PADRAO = 50
+
+# Mesmos campos dos índices de texto do MongoDB (criar_indices.py), com pesos por campo.
+PESOS_CAMPOS = {
+    "vagas": {"titulo": 3.0, "requisitos": 2.0, "skills": 2.0, "descricao": 1.0},
+    "candidatos": {"skills": 3.0, "nome": 2.0, "resumo": 1.5, "experiencia": 1.0, "formacao": 1.0},
+}
+
+# Campos guardados junto do índice para montar o resultado sem voltar ao banco.
+CAMPOS_EXIBICAO = {
+    "vagas": ["titulo", "empresa", "requisitos"],
+    "candidatos": ["nome", "skills", "resumo"],
+}
+
+
+class IndiceBM25:
+    # Índice invertido com BM25 sobre frequências ponderadas por campo (estilo BM25F):
+    # cada ocorrência conta o peso do campo em que aparece, tanto no tf quanto no tamanho do documento.
+
+    def __init__(self, pesos, campos_exibicao=(), k1=K1, b=B):
+        self.pesos = pesos
+        self.campos_exibicao = list(campos_exibicao)
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)
+        self._comprimentos = {}
+        self._termos_doc = {}
+        self._documentos = {}
+        self._soma_comprimentos = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._comprimentos)
+
+    def __getstate__(self):
+        # Para publicar no cache compartilhado: o lock fica de fora e é recriado ao carregar.
+        return {chave: valor for chave, valor in self.__dict__.items() if chave != "_lock"}
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.RLock()
+
+    def _frequencias(self, documento):
+        frequencias = Counter()
+        for campo, peso in self.pesos.items():
+            for termo in tokenizar(documento.get(campo, "")):
+                frequencias[termo] += peso
+        return frequencias
+
+    def adicionar(self, doc_id, documento):
+        frequencias = self._frequencias(documento)
+        with self._lock:
+            self.remover(doc_id)
+            for termo, tf in frequencias.items():
+                self._postings[termo][doc_id] = tf
+            comprimento = sum(frequencias.values())
+            self._comprimentos[doc_id] = comprimento
+            self._termos_doc[doc_id] = list(frequencias)
+            self._soma_comprimentos += comprimento
+            self._documentos[doc_id] = {campo: documento.get(campo) for campo in self.campos_exibicao}
+
+    def remover(self, doc_id):
+        with self._lock:
+            comprimento = self._comprimentos.pop(doc_id, None)
+            if comprimento is None:
+                return
+            self._soma_comprimentos -= comprimento
+            self._documentos.pop(doc_id, None)
+            for termo in self._termos_doc.pop(doc_id, ()):
+                del self._postings[termo][doc_id]
+                if not self._postings[termo]:
+                    del self._postings[termo]
+
+    def buscar(self, consulta, k=TOP_K_PADRAO):
+        termos = set(tokenizar(consulta))
+        with self._lock:
+            total_docs = len(self._comprimentos)
+            if not termos or total_docs == 0:
+                return []
+            media = self._soma_comprimentos / total_docs or 1.0
+
+            scores = defaultdict(float)
+            for termo in termos:
+                postings = self._postings.get(termo)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    normalizacao = self.k1 * (1 - self.b + self.b * self._comprimentos[doc_id] / media)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + normalizacao)
+
+            melhores = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                {"_id": doc_id, **self._documentos[doc_id], "score": score}
+                for doc_id, score in melhores
+            ]
+
+
+_indices = {}
+# Versões da coleção que cada índice reflete (ver obter_indice).
+_versoes_indices = {}
+_lock_indices = threading.Lock()
+
+
+def construir_indice(db, colecao):
+    indice = IndiceBM25(PESOS_CAMPOS[colecao], CAMPOS_EXIBICAO[colecao])
+    campos = set(PESOS_CAMPOS[colecao]) | set(CAMPOS_EXIBICAO[colecao])
+    for documento in db[colecao].find({}, {campo: 1 for campo in campos}).batch_size(1000):
+        indice.adicionar(documento["_id"], documento)
+    return indice
+
+
+def obter_indice(db, colecao):
+    # Construído na primeira busca (ou copiado de outra réplica pelo cache compartilhado) e
+    # depois atualizado pelas escritas deste processo. Se a versão atual da coleção não é a
+    # que o índice reflete, alguém escreveu por fora (outra réplica, importar.py...): o índice
+    # é recarregado.
+    versoes = versoes_colecoes((colecao,))
+    indice = _indices.get(colecao)
+    if indice is None or _versoes_indices.get(colecao) != versoes:
+        with _lock_indices:
+            indice = _indices.get(colecao)
+            if indice is None or _versoes_indices.get(colecao) != versoes:
+                indice = artefato_compartilhado(
+                    f"bm25:{db.name}:{colecao}", (colecao,), lambda: construir_indice(db, colecao), versoes=versoes
+                )
+                _indices[colecao] = indice
+                _versoes_indices[colecao] = versoes
+    return indice
+
+
+def buscar(db, colecao, consulta, k=TOP_K_PADRAO):
+    return obter_indice(db, colecao).buscar(consulta, k)
+
+
+def _ao_escrever(colecao, documento):
+    # Escrita sem o documento (remoção, atualização em massa) não é aplicada: a versão avança
+    # sem o índice, e a próxima busca o recarrega.
+    indice = _indices.get(colecao)
+    if indice is not None and documento is not None and "_id" in documento:
+        indice.adicionar(documento["_id"], documento)
+        _versoes_indices[colecao] = versoes_apos_escrita(_versoes_indices[colecao], (colecao,), colecao)
+
+
+ouvir_escritas(_ao_escrever)
@@ -0,0 +1,379 @@
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+from bson import ObjectId
+
+from cache import ouvir_escritas
+from texto import normalizar_texto, tokenizar
+
+DIMENSAO_PADRAO = 256
+TOP_K_PADRAO = 20
+NPROBE_PADRAO = 8
+TAMANHO_LOTE = 2048
+ITERACOES_KMEANS = 10
+AMOSTRA_KMEANS = 50000
+RRF_K = 60
+
+DIRETORIO_PADRAO = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "dados", "semantica"))
+
+# Mesmos campos dos índices de texto, concatenados em um único texto por documento.
+CAMPOS_TEXTO = {
+    "vagas": ["titulo", "requisitos", "skills", "descricao"],
+    "candidatos": ["skills", "resumo", "experiencia", "formacao", "nome"],
+}
+
+
+class VetorizadorHashing:
+    # Fallback sem modelo: n-gramas de caracteres (3 e 4) e palavras inteiras, espalhados por
+    # hashing com sinal em um vetor de dimensão fixa. Determinístico entre processos (crc32).
+    nome = "hashing"
+
+    def __init__(self, dimensao=DIMENSAO_PADRAO):
+        self.dimensao = dimensao
+
+    def _caracteristicas(self, texto):
+        for token in tokenizar(texto):
+            yield "w:" + token, 2.0
+            palavra = f" {token} "
+            for n in (3, 4):
+                for i in range(len(palavra) - n + 1):
+                    yield palavra[i:i + n], 1.0
+
+    def vetorizar(self, textos):
+        matriz = np.zeros((len(textos), self.dimensao), dtype=np.float32)
+        for linha, texto in enumerate(textos):
+            for caracteristica, peso in self._caracteristicas(texto):
+                h = zlib.crc32(caracteristica.encode("utf-8"))
+                matriz[linha, h % self.dimensao] += peso if (h >> 31) & 1 else -peso
+        return _normalizar_linhas(matriz)
+
+
+class VetorizadorModelo:
+    # Modelo local de embeddings (sentence-transformers), só a partir do cache em disco: sem rede.
+    nome = "modelo"
+
+    def __init__(self, modelo):
+        from sentence_transformers import SentenceTransformer
+
+        self._modelo = SentenceTransformer(modelo, device="cpu", local_files_only=True)
+        self.nome = f"modelo:{modelo}"
+        self.dimensao = self._modelo.get_sentence_embedding_dimension()
+
+    def vetorizar(self, textos):
+        vetores = self._modelo.encode([normalizar_texto(t) for t in textos], batch_size=64, normalize_embeddings=True)
+        return np.asarray(vetores, dtype=np.float32)
+
+
+def criar_vetorizador(modelo=None, dimensao=DIMENSAO_PADRAO):
+    if modelo:
+        try:
+            return VetorizadorModelo(modelo)
+        except Exception as e:
+            print(f"⚠️ Modelo de embeddings indisponível ({e}); usando vetorizador por hashing.")
+    return VetorizadorHashing(dimensao)
+
+
+def _normalizar_linhas(matriz):
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return matriz / normas
+
+
+def texto_documento(colecao, documento):
+    return " ".join(str(documento.get(campo) or "") for campo in CAMPOS_TEXTO[colecao])
+
+
+def _kmeans_esferico(vetores, n_listas, semente=42):
+    gerador = np.random.default_rng(semente)
+    amostra = vetores[gerador.choice(len(vetores), size=min(len(vetores), AMOSTRA_KMEANS), replace=False)]
+    centroides = amostra[gerador.choice(len(amostra), size=n_listas, replace=False)].copy()
+
+    for _ in range(ITERACOES_KMEANS):
+        atribuicao = np.argmax(amostra @ centroides.T, axis=1)
+        somas = np.zeros_like(centroides)
+        np.add.at(somas, atribuicao, amostra)
+        vazios = np.bincount(atribuicao, minlength=n_listas) == 0
+        somas[vazios] = amostra[gerador.choice(len(amostra), size=int(vazios.sum()))]
+        centroides = _normalizar_linhas(somas)
+    return centroides
+
+
+class IndiceIVF:
+    # Matriz float32 mapeada em memória (np.memmap via .npy) + listas invertidas (IVF):
+    # a consulta só compara contra os vetores dos nprobe centroides mais próximos.
+
+    def __init__(self, diretorio, colecao):
+        self.diretorio = diretorio
+        self.colecao = colecao
+        self.vetores = None
+        self.ids = None
+        self.centroides = None
+        self.ordem = None
+        self.offsets = None
+        self.meta = {}
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, f"{self.colecao}_{nome}")
+
+    def existe(self):
+        return os.path.exists(self._caminho("meta.json"))
+
+    def carregar(self):
+        with open(self._caminho("meta.json"), encoding="utf-8") as arquivo:
+            self.meta = json.load(arquivo)
+        self.vetores = np.load(self._caminho("vetores.npy"), mmap_mode="r")
+        self.ids = np.load(self._caminho("ids.npy"))
+        self.centroides = np.load(self._caminho("centroides.npy"))
+        self.ordem = np.load(self._caminho("ordem.npy"))
+        self.offsets = np.load(self._caminho("offsets.npy"))
+        return self
+
+    def versao(self):
+        # O meta.json é o último arquivo gravado na construção: a data dele identifica o índice.
+        try:
+            return os.stat(self._caminho("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _salvar(self, nome, matriz):
+        # Grava ao lado e troca de uma vez: quem recarrega nunca lê um arquivo pela metade.
+        caminho_tmp = self._caminho(f"{nome}.tmp.npy")
+        np.save(caminho_tmp, matriz)
+        os.replace(caminho_tmp, self._caminho(f"{nome}.npy"))
+
+    def construir(self, db, vetorizador, tamanho_lote=TAMANHO_LOTE):
+        os.makedirs(self.diretorio, exist_ok=True)
+        inicio_construcao = time.time()
+        projecao = {campo: 1 for campo in CAMPOS_TEXTO[self.colecao]}
+
+        # Vetores gravados em um arquivo bruto, lote a lote, até o cursor acabar: sem montar a
+        # matriz inteira em RAM e sem depender da contagem estimada, que pode estar defasada.
+        caminho_bruto = self._caminho("vetores.tmp")
+        ids = []
+        lote_textos = []
+        with open(caminho_bruto, "wb") as bruto:
+            def gravar_lote():
+                bruto.write(vetorizador.vetorizar(lote_textos).astype(np.float32).tobytes())
+                lote_textos.clear()
+
+            for documento in db[self.colecao].find({}, projecao).sort("_id", 1).batch_size(tamanho_lote):
+                ids.append(documento["_id"].binary)
+                lote_textos.append(texto_documento(self.colecao, documento))
+                if len(lote_textos) >= tamanho_lote:
+                    gravar_lote()
+            if lote_textos:
+                gravar_lote()
+
+        n = len(ids)
+        dimensao = vetorizador.dimensao
+        if n:
+            vetores = np.memmap(caminho_bruto, dtype=np.float32, mode="r", shape=(n, dimensao))
+        else:
+            vetores = np.zeros((0, dimensao), dtype=np.float32)
+        n_listas = max(1, min(n, int(4 * np.sqrt(n))))
+        centroides = _kmeans_esferico(vetores, n_listas) if n else np.zeros((1, dimensao), np.float32)
+
+        atribuicao = np.empty(n, dtype=np.int32)
+        for inicio in range(0, n, tamanho_lote):
+            atribuicao[inicio:inicio + tamanho_lote] = np.argmax(vetores[inicio:inicio + tamanho_lote] @ centroides.T, axis=1)
+        ordem = np.argsort(atribuicao, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(atribuicao[ordem], np.arange(len(centroides) + 1)).astype(np.int64)
+
+        # Copia o arquivo bruto para um .npy (carregado depois com mmap), também em lotes.
+        caminho_tmp = self._caminho("vetores.tmp.npy")
+        if n:
+            destino = np.lib.format.open_memmap(caminho_tmp, mode="w+", dtype=np.float32, shape=(n, dimensao))
+            for inicio in range(0, n, tamanho_lote):
+                destino[inicio:inicio + tamanho_lote] = vetores[inicio:inicio + tamanho_lote]
+            destino.flush()
+            del destino
+        else:
+            np.save(caminho_tmp, vetores)
+        del vetores
+        os.remove(caminho_bruto)
+        os.replace(caminho_tmp, self._caminho("vetores.npy"))
+
+        # ObjectIds como linhas de 12 bytes (uint8): o dtype "S12" cortaria bytes nulos no final.
+        self._salvar("ids", np.frombuffer(b"".join(ids), dtype=np.uint8).reshape(n, 12))
+        self._salvar("centroides", centroides)
+        self._salvar("ordem", ordem)
+        self._salvar("offsets", offsets)
+        caminho_meta = self._caminho("meta.tmp.json")
+        with open(caminho_meta, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "vetorizador": vetorizador.nome, "dimensao": dimensao, "documentos": n,
+                "listas": len(centroides), "inicio_construcao": inicio_construcao,
+            }, arquivo)
+        os.replace(caminho_meta, self._caminho("meta.json"))
+        return self.carregar()
+
+    def buscar(self, vetor, k=TOP_K_PADRAO, nprobe=NPROBE_PADRAO):
+        if self.vetores is None or len(self.ids) == 0:
+            return []
+        sondas = np.argsort(-(self.centroides @ vetor))[:nprobe]
+        candidatos = np.concatenate([self.ordem[self.offsets[c]:self.offsets[c + 1]] for c in sondas])
+        if len(candidatos) == 0:
+            return []
+        candidatos.sort()
+        scores = self.vetores[candidatos] @ vetor
+        if len(scores) > k:
+            melhores = np.argpartition(-scores, k)[:k]
+        else:
+            melhores = np.arange(len(scores))
+        melhores = melhores[np.argsort(-scores[melhores])]
+        return [(ObjectId(self.ids[candidatos[i]].tobytes()), float(scores[i])) for i in melhores]
+
+
+class IndiceSemanticoAusente(Exception):
+    pass
+
+
+class BuscaSemantica:
+    # Índice IVF em disco + um "delta" em memória com o que foi escrito depois da última construção.
+
+    def __init__(self, colecao, diretorio=DIRETORIO_PADRAO, modelo=None):
+        self.colecao = colecao
+        self.indice = IndiceIVF(diretorio, colecao)
+        self.versao = self.indice.versao()
+        if self.versao is not None:
+            self.indice.carregar()
+            # A consulta precisa ser vetorizada do mesmo jeito que o índice foi construído.
+            vetorizador = self.indice.meta.get("vetorizador", "")
+            modelo = vetorizador.split(":", 1)[1] if vetorizador.startswith("modelo:") else None
+            self.vetorizador = criar_vetorizador(modelo, self.indice.meta.get("dimensao", DIMENSAO_PADRAO))
+        else:
+            self.vetorizador = criar_vetorizador(modelo)
+        self._delta = {}
+        self._lock = threading.Lock()
+
+    def adicionar(self, documento):
+        vetor = self.vetorizador.vetorizar([texto_documento(self.colecao, documento)])[0]
+        with self._lock:
+            self._delta[documento["_id"]] = (time.time(), vetor)
+
+    def herdar_delta(self, anterior):
+        # Depois de uma reconstrução, só as escritas feitas desde o início dela podem ter ficado
+        # de fora do índice novo; as demais já estão nele.
+        if (anterior.vetorizador.nome, anterior.vetorizador.dimensao) != (self.vetorizador.nome, self.vetorizador.dimensao):
+            return
+        inicio = self.indice.meta.get("inicio_construcao", 0)
+        with anterior._lock:
+            recentes = {doc_id: item for doc_id, item in anterior._delta.items() if item[0] >= inicio}
+        with self._lock:
+            self._delta.update(recentes)
+
+    def buscar(self, consulta, k=TOP_K_PADRAO, nprobe=NPROBE_PADRAO):
+        if self.versao is None:
+            raise IndiceSemanticoAusente(
+                f"O índice semântico de {self.colecao} ainda não foi construído. "
+                f"Rode: python busca_semantica.py {self.colecao}"
+            )
+        vetor = self.vetorizador.vetorizar([consulta])[0]
+        with self._lock:
+            delta = dict(self._delta)
+
+        resultados = [(doc_id, s) for doc_id, s in self.indice.buscar(vetor, k, nprobe) if doc_id not in delta]
+        resultados += [(doc_id, float(v @ vetor)) for doc_id, (_, v) in delta.items()]
+        resultados.sort(key=lambda item: item[1], reverse=True)
+        return resultados[:k]
+
+
+_buscas = {}
+_lock_buscas = threading.Lock()
+
+
+def _configuracao():
+    try:
+        import streamlit as st
+
+        return dict(st.secrets.get("busca", {}))
+    except Exception:
+        return {}
+
+
+def _desatualizada(busca):
+    return busca is None or busca.versao != busca.indice.versao()
+
+
+def obter_busca(colecao):
+    # Recarrega quando o índice em disco muda (reconstruído pela CLI, por esta ou por outra
+    # réplica): um stat do meta.json por consulta.
+    busca = _buscas.get(colecao)
+    if _desatualizada(busca):
+        with _lock_buscas:
+            busca = _buscas.get(colecao)
+            if _desatualizada(busca):
+                config = _configuracao()
+                nova = BuscaSemantica(
+                    colecao,
+                    config.get("diretorio_indices", DIRETORIO_PADRAO),
+                    config.get("modelo_embeddings"),
+                )
+                if busca is not None:
+                    nova.herdar_delta(busca)
+                _buscas[colecao] = busca = nova
+    return busca
+
+
+def buscar(db, colecao, consulta, k=TOP_K_PADRAO, campos=None):
+    # Traz os documentos encontrados em uma única consulta $in, preservando a ordem do ranking.
+    resultados = obter_busca(colecao).buscar(consulta, k)
+    if not resultados:
+        return []
+    projecao = {campo: 1 for campo in campos} if campos else None
+    documentos = {doc["_id"]: doc for doc in db[colecao].find({"_id": {"$in": [i for i, _ in resultados]}}, projecao)}
+    return [{**documentos[i], "score": s} for i, s in resultados if i in documentos]
+
+
+def fundir_rrf(*rankings, k=RRF_K, limite=TOP_K_PADRAO):
+    # Reciprocal Rank Fusion: combina rankings de escalas diferentes (textScore/BM25 e cosseno)
+    # só pelas posições; o score final é a soma de 1 / (k + posição).
+    scores = {}
+    documentos = {}
+    for ranking in rankings:
+        for posicao, documento in enumerate(ranking, start=1):
+            doc_id = documento["_id"]
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + posicao)
+            documentos.setdefault(doc_id, documento)
+    ordenados = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limite]
+    return [{**documentos[doc_id], "score": score} for doc_id, score in ordenados]
+
+
+def _ao_escrever(colecao, documento):
+    busca = _buscas.get(colecao)
+    if busca is not None and documento is not None and "_id" in documento:
+        busca.adicionar(documento)
+
+
+ouvir_escritas(_ao_escrever)
+
+
+if __name__ == "__main__":
+    from db import get_database
+
+    parser = argparse.ArgumentParser(description="Constrói o índice vetorial (IVF) usado pela busca semântica.")
+    parser.add_argument("colecao", choices=sorted(CAMPOS_TEXTO))
+    parser.add_argument("--diretorio", default=None)
+    parser.add_argument("--modelo", default=None, help="Modelo sentence-transformers já baixado localmente.")
+    parser.add_argument("--dimensao", type=int, default=DIMENSAO_PADRAO)
+    args = parser.parse_args()
+
+    config = _configuracao()
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+    else:
+        inicio = time.perf_counter()
+        vetorizador = criar_vetorizador(args.modelo or config.get("modelo_embeddings"), args.dimensao)
+        indice = IndiceIVF(args.diretorio or config.get("diretorio_indices", DIRETORIO_PADRAO), args.colecao)
+        indice.construir(db, vetorizador)
+        print(
+            f"✅ Índice semântico de {args.colecao}: {indice.meta['documentos']} documento(s), "
+            f"{indice.meta['listas']} lista(s), {vetorizador.nome} ({vetorizador.dimensao} dims) "
+            f"em {time.perf_counter() - inicio:.1f} s."
+        )
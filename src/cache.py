@@ -0,0 +1,326 @@
+import functools
+import hashlib
+import hmac
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from cache_compartilhado import ErroCacheCompartilhado, _configuracao, criar_backend
+
+TTL_PADRAO = 60
+CAPACIDADE_PADRAO = 512
+TTL_ARTEFATOS = 3600
+# Valores maiores que isso ficam só no cache local do processo.
+TAMANHO_MAXIMO_COMPARTILHADO = 64 * 1024 * 1024
+# Depois de uma falha do cache compartilhado, o processo segue só com o local por este intervalo.
+INTERVALO_RECONEXAO = 10
+# Quantas escritas deste processo ficam lembradas até o change stream/polling devolvê-las.
+MAX_ESCRITAS_LOCAIS = 10000
+
+log = logging.getLogger("portal_vagas.cache")
+
+
+class CacheConsultas:
+    # Memoização das leituras com TTL + LRU. Cada coleção tem um contador de versão que
+    # entra na chave: uma escrita incrementa a versão e as entradas antigas deixam de ser
+    # encontradas (e saem pela política LRU), sem precisar varrer o cache.
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO):
+        self.capacidade = capacidade
+        self._entradas = OrderedDict()
+        self._versoes = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def versao(self, colecao):
+        with self._lock:
+            return self._versoes.get(colecao, 0)
+
+    def registrar_escrita(self, colecao):
+        with self._lock:
+            self._versoes[colecao] = self._versoes.get(colecao, 0) + 1
+
+    def _contar(self, colecao, evento):
+        contadores = self._contadores.setdefault(colecao, {"acertos": 0, "falhas": 0, "expirados": 0, "removidos": 0})
+        contadores[evento] += 1
+
+    def obter(self, colecao, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._contar(colecao, "falhas")
+                return False, None
+
+            expira_em, valor = entrada
+            if expira_em < time.monotonic():
+                del self._entradas[chave]
+                self._contar(colecao, "expirados")
+                self._contar(colecao, "falhas")
+                return False, None
+
+            self._entradas.move_to_end(chave)
+            self._contar(colecao, "acertos")
+            return True, valor
+
+    def guardar(self, colecao, chave, valor, ttl):
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self._contar(colecao, "removidos")
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._contadores.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            por_colecao = {colecao: dict(c) for colecao, c in self._contadores.items()}
+            entradas = len(self._entradas)
+
+        acertos = sum(c["acertos"] for c in por_colecao.values())
+        falhas = sum(c["falhas"] for c in por_colecao.values())
+        consultas = acertos + falhas
+        return {
+            "entradas": entradas,
+            "capacidade": self.capacidade,
+            "acertos": acertos,
+            "falhas": falhas,
+            "taxa_acerto": acertos / consultas if consultas else 0.0,
+            "por_colecao": por_colecao,
+        }
+
+
+class CacheCompartilhado:
+    # Segundo nível, comum a todas as réplicas (SQLite na mesma máquina ou Redis). As versões
+    # das coleções também ficam nele: uma escrita em qualquer réplica muda a chave das
+    # consultas em todas. Indisponível, cada processo segue com o próprio cache local.
+    # Os valores vão em pickle assinado com HMAC pelo segredo comum às réplicas: quem consegue
+    # escrever no Redis ou no arquivo não consegue fazer o app desserializar outra coisa.
+
+    def __init__(self, backend, segredo=None):
+        if backend is not None and not segredo:
+            raise ValueError("o cache compartilhado precisa de um segredo ([cache] segredo no secrets.toml)")
+        self.backend = backend
+        self._segredo = str(segredo or "").encode("utf-8")
+        self._falha_em = None
+        self._contadores = {"acertos": 0, "falhas": 0, "gravacoes": 0, "erros": 0}
+        self._lock = threading.Lock()
+
+    def _contar(self, evento):
+        with self._lock:
+            self._contadores[evento] += 1
+
+    def _chamar(self, metodo, *args):
+        if self.backend is None:
+            raise ErroCacheCompartilhado("sem backend configurado")
+        if self._falha_em is not None and time.monotonic() - self._falha_em < INTERVALO_RECONEXAO:
+            raise ErroCacheCompartilhado("indisponível")
+        try:
+            resultado = getattr(self.backend, metodo)(*args)
+        except ErroCacheCompartilhado as e:
+            self._falha_em = time.monotonic()
+            self._contar("erros")
+            log.warning("Cache compartilhado (%s) indisponível: %s", self.backend.nome, e)
+            raise
+        self._falha_em = None
+        return resultado
+
+    def versoes(self, colecoes):
+        try:
+            return self._chamar("versoes", colecoes)
+        except ErroCacheCompartilhado:
+            return None
+
+    def incrementar_versao(self, colecao):
+        try:
+            self._chamar("incrementar_versao", colecao)
+        except ErroCacheCompartilhado:
+            pass
+
+    def _assinatura(self, dados):
+        return hmac.new(self._segredo, dados, hashlib.sha256).digest()
+
+    def obter(self, chave):
+        try:
+            dados = self._chamar("obter", chave)
+        except ErroCacheCompartilhado:
+            return False, None
+        if dados is None:
+            self._contar("falhas")
+            return False, None
+        assinatura, dados = dados[:32], dados[32:]
+        if not hmac.compare_digest(assinatura, self._assinatura(dados)):
+            self._contar("erros")
+            log.warning("Cache compartilhado: entrada com assinatura inválida ignorada.")
+            return False, None
+        self._contar("acertos")
+        return True, pickle.loads(dados)
+
+    def guardar(self, chave, valor, ttl):
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(dados) > TAMANHO_MAXIMO_COMPARTILHADO:
+            return
+        dados = self._assinatura(dados) + dados
+        try:
+            self._chamar("guardar", chave, dados, ttl)
+            self._contar("gravacoes")
+        except ErroCacheCompartilhado:
+            pass
+
+    def estatisticas(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+        return {
+            "backend": self.backend.nome if self.backend else "local",
+            "disponivel": self.backend is not None and self._falha_em is None,
+            **contadores,
+        }
+
+
+def _criar_compartilhado():
+    try:
+        configuracao = _configuracao()
+        return CacheCompartilhado(criar_backend(configuracao), configuracao.get("segredo"))
+    except Exception as e:
+        log.warning("Cache compartilhado desativado: %s", e)
+        return CacheCompartilhado(None)
+
+
+def _chave_texto(chave):
+    # A mesma consulta precisa gerar a mesma chave em qualquer processo: objetos sem repr
+    # estável (com endereço de memória) não vão para o cache compartilhado.
+    texto = repr(chave)
+    if " at 0x" in texto:
+        return None
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+_cache = CacheConsultas()
+_compartilhado = _criar_compartilhado()
+_ouvintes = []
+_escritas_locais = OrderedDict()
+_lock_escritas = threading.Lock()
+
+
+def ouvir_escritas(ouvinte):
+    # Índices em memória (busca local etc.) se inscrevem aqui para acompanhar as escritas.
+    if ouvinte not in _ouvintes:
+        _ouvintes.append(ouvinte)
+
+
+def registrar_escrita(colecao, documento=None):
+    _cache.registrar_escrita(colecao)
+    _compartilhado.incrementar_versao(colecao)
+    if documento is not None and "_id" in documento:
+        chave = (colecao, documento["_id"])
+        with _lock_escritas:
+            _escritas_locais[chave] = _escritas_locais.pop(chave, 0) + 1
+            if len(_escritas_locais) > MAX_ESCRITAS_LOCAIS:
+                _escritas_locais.popitem(last=False)
+    for ouvinte in list(_ouvintes):
+        ouvinte(colecao, documento)
+
+
+def escrita_local(colecao, id_documento):
+    # O change stream e o polling também veem as escritas deste processo, que registrar_escrita
+    # já contou e os ouvintes já aplicaram: cada uma é reconhecida uma vez e não invalida de novo.
+    chave = (colecao, id_documento)
+    with _lock_escritas:
+        restantes = _escritas_locais.pop(chave, 0)
+        if restantes > 1:
+            _escritas_locais[chave] = restantes - 1
+    return restantes > 0
+
+
+def invalidar_colecao(colecao, compartilhada=True):
+    # Escrita feita por outro processo: só invalida o cache, sem notificar os ouvintes, que já
+    # recebem as escritas deste processo. Os scripts (importar.py, backfill.py) sobem também a
+    # versão compartilhada. O monitor ao vivo passa compartilhada=False: a réplica que escreveu
+    # já subiu essa versão, e cada réplica subir de novo faria todas recarregarem os índices em
+    # memória outra vez. Escritas feitas à mão no banco chegam ao cache compartilhado pelo TTL.
+    _cache.registrar_escrita(colecao)
+    if compartilhada:
+        _compartilhado.incrementar_versao(colecao)
+
+
+def versoes_colecoes(colecoes):
+    # As versões compartilhadas, quando o backend responde; senão, as deste processo. A origem
+    # entra na chave para as duas numerações não se confundirem.
+    compartilhadas = _compartilhado.versoes(colecoes)
+    if compartilhadas is not None:
+        return ("compartilhada", compartilhadas)
+    return ("local", tuple(_cache.versao(c) for c in colecoes))
+
+
+def versoes_apos_escrita(versoes, colecoes, colecao):
+    # As versões que uma estrutura em memória passa a refletir depois de aplicar uma escrita
+    # deste processo (registrar_escrita soma 1 na coleção escrita).
+    origem, valores = versoes
+    return origem, tuple(valor + (nome == colecao) for nome, valor in zip(colecoes, valores))
+
+
+def artefato_compartilhado(nome, colecoes, construir, ttl=TTL_ARTEFATOS, versoes=None):
+    # Estruturas montadas em memória a partir da coleção inteira (índices de busca): a primeira
+    # réplica monta e publica; as outras carregam a cópia da versão atual em vez de varrer o banco.
+    origem, valores = versoes_colecoes(colecoes) if versoes is None else versoes
+    if origem != "compartilhada":
+        return construir()
+    chave = _chave_texto(("artefato", nome, valores))
+    encontrado, valor = _compartilhado.obter(chave)
+    if encontrado:
+        return valor
+    valor = construir()
+    _compartilhado.guardar(chave, valor, ttl)
+    return valor
+
+
+def estatisticas_cache():
+    return {**_cache.estatisticas(), "compartilhado": _compartilhado.estatisticas()}
+
+
+def limpar_cache():
+    _cache.limpar()
+
+
+def cache_consulta(*colecoes, ttl=TTL_PADRAO):
+    # Decora funções de leitura no formato fn(db, *args). O resultado é compartilhado entre
+    # sessões, então quem chama deve tratá-lo como somente leitura.
+    def decorador(fn):
+        identificador = (fn.__module__, fn.__qualname__)
+        colecao_principal = colecoes[0]
+
+        @functools.wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            versoes = versoes_colecoes(colecoes)
+            chave = (identificador, db.name, versoes, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(chave)
+            except TypeError:
+                return fn(db, *args, **kwargs)
+
+            encontrado, valor = _cache.obter(colecao_principal, chave)
+            if encontrado:
+                return valor
+
+            # Local (por processo) primeiro, depois o compartilhado entre réplicas.
+            chave_compartilhada = _chave_texto(chave) if versoes[0] == "compartilhada" else None
+            if chave_compartilhada:
+                encontrado, valor = _compartilhado.obter(chave_compartilhada)
+                if encontrado:
+                    _cache.guardar(colecao_principal, chave, valor, ttl)
+                    return valor
+
+            valor = fn(db, *args, **kwargs)
+            _cache.guardar(colecao_principal, chave, valor, ttl)
+            if chave_compartilhada:
+                _compartilhado.guardar(chave_compartilhada, valor, ttl)
+            return valor
+
+        return wrapper
+
+    return decorador
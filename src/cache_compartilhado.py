@@ -0,0 +1,184 @@
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+PREFIXO = "portal_vagas:"
+CAMINHO_SQLITE_PADRAO = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "portal_vagas_cache.sqlite"
+)
+URL_REDIS_PADRAO = "redis://localhost:6379/0"
+TIMEOUT_PADRAO = 0.5
+# Faxina das entradas vencidas no SQLite: no máximo uma vez por intervalo, por processo.
+INTERVALO_LIMPEZA = 60
+
+
+class ErroCacheCompartilhado(Exception):
+    pass
+
+
+def _configuracao():
+    try:
+        import streamlit as st
+
+        return dict(st.secrets.get("cache", {}))
+    except Exception:
+        return {}
+
+
+class BackendSQLite:
+    # Um arquivo SQLite compartilhado pelas réplicas da mesma máquina (em /dev/shm, fica na
+    # memória). Modo WAL: leitores não esperam o escritor. Uma conexão por thread.
+    nome = "sqlite"
+
+    def __init__(self, caminho=CAMINHO_SQLITE_PADRAO, timeout=TIMEOUT_PADRAO):
+        self.caminho = caminho
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ultima_limpeza = 0.0
+        with self._conexao() as conexao:
+            conexao.execute("CREATE TABLE IF NOT EXISTS entradas (chave TEXT PRIMARY KEY, valor BLOB, expira_em REAL)")
+            conexao.execute("CREATE TABLE IF NOT EXISTS versoes (colecao TEXT PRIMARY KEY, versao INTEGER)")
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=self.timeout, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=OFF")
+            self._local.conexao = conexao
+        return conexao
+
+    def _executar(self, sql, parametros=()):
+        try:
+            return self._conexao().execute(sql, parametros)
+        except sqlite3.Error as e:
+            raise ErroCacheCompartilhado(str(e)) from e
+
+    def obter(self, chave):
+        linha = self._executar(
+            "SELECT valor FROM entradas WHERE chave = ? AND expira_em > ?", (chave, time.time())
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def guardar(self, chave, valor, ttl):
+        agora = time.time()
+        self._executar("INSERT OR REPLACE INTO entradas VALUES (?, ?, ?)", (chave, valor, agora + ttl))
+        if agora - self._ultima_limpeza > INTERVALO_LIMPEZA:
+            self._ultima_limpeza = agora
+            self._executar("DELETE FROM entradas WHERE expira_em <= ?", (agora,))
+
+    def versoes(self, colecoes):
+        linhas = self._executar(
+            f"SELECT colecao, versao FROM versoes WHERE colecao IN ({','.join('?' * len(colecoes))})", colecoes
+        ).fetchall()
+        por_colecao = dict(linhas)
+        return tuple(por_colecao.get(colecao, 0) for colecao in colecoes)
+
+    def incrementar_versao(self, colecao):
+        self._executar(
+            "INSERT INTO versoes VALUES (?, 1) ON CONFLICT(colecao) DO UPDATE SET versao = versao + 1", (colecao,)
+        )
+
+
+class BackendRedis:
+    # Cliente mínimo do protocolo do Redis (RESP2) sobre um socket: GET/SET/MGET/INCR bastam
+    # para o cache. Funciona com o Redis e com substitutos compatíveis (Valkey, KeyDB, um
+    # servidor local de testes). Uma conexão por thread; em erro, a conexão é descartada.
+    nome = "redis"
+
+    def __init__(self, url=URL_REDIS_PADRAO, timeout=TIMEOUT_PADRAO):
+        partes = urlparse(url)
+        self.endereco = (partes.hostname or "localhost", partes.port or 6379)
+        self.senha = partes.password
+        self.banco = int(partes.path.strip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conectar(self):
+        conexao = socket.create_connection(self.endereco, timeout=self.timeout)
+        conexao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.conexao = conexao
+        self._local.leitor = conexao.makefile("rb")
+        if self.senha:
+            self._comando("AUTH", self.senha)
+        if self.banco:
+            self._comando("SELECT", self.banco)
+
+    def _comando(self, *partes):
+        if getattr(self._local, "conexao", None) is None:
+            try:
+                self._conectar()
+            except OSError as e:
+                raise ErroCacheCompartilhado(str(e)) from e
+        pedido = [b"*%d\r\n" % len(partes)]
+        for parte in partes:
+            dados = parte if isinstance(parte, bytes) else str(parte).encode()
+            pedido.append(b"$%d\r\n%s\r\n" % (len(dados), dados))
+        try:
+            self._local.conexao.sendall(b"".join(pedido))
+            return self._ler_resposta()
+        except (OSError, ValueError) as e:
+            self._descartar()
+            raise ErroCacheCompartilhado(str(e)) from e
+
+    def _ler_resposta(self):
+        linha = self._local.leitor.readline()
+        if not linha.endswith(b"\r\n"):
+            raise ConnectionError("conexão encerrada pelo servidor")
+        tipo, conteudo = linha[:1], linha[1:-2]
+        if tipo == b"+":
+            return conteudo.decode()
+        if tipo == b"-":
+            raise ErroCacheCompartilhado(conteudo.decode())
+        if tipo == b":":
+            return int(conteudo)
+        if tipo == b"$":
+            tamanho = int(conteudo)
+            if tamanho < 0:
+                return None
+            dados = self._local.leitor.read(tamanho + 2)
+            return dados[:-2]
+        if tipo == b"*":
+            tamanho = int(conteudo)
+            return None if tamanho < 0 else [self._ler_resposta() for _ in range(tamanho)]
+        raise ValueError(f"resposta RESP inesperada: {linha!r}")
+
+    def _descartar(self):
+        conexao = getattr(self._local, "conexao", None)
+        self._local.conexao = None
+        if conexao is not None:
+            try:
+                conexao.close()
+            except OSError:
+                pass
+
+    def obter(self, chave):
+        return self._comando("GET", PREFIXO + chave)
+
+    def guardar(self, chave, valor, ttl):
+        self._comando("SET", PREFIXO + chave, valor, "PX", max(1, int(ttl * 1000)))
+
+    def versoes(self, colecoes):
+        valores = self._comando("MGET", *(f"{PREFIXO}versao:{colecao}" for colecao in colecoes))
+        return tuple(int(valor or 0) for valor in valores)
+
+    def incrementar_versao(self, colecao):
+        self._comando("INCR", f"{PREFIXO}versao:{colecao}")
+
+
+def criar_backend(configuracao=None):
+    # [cache] no secrets.toml: backend = "sqlite" (caminho = ...) ou "redis" (url = ...), e o
+    # segredo (o mesmo em todas as réplicas) que assina os valores.
+    # Sem a seção, o cache de consultas fica só na memória de cada processo.
+    configuracao = _configuracao() if configuracao is None else configuracao
+    tipo = configuracao.get("backend", "local")
+    timeout = float(configuracao.get("timeout", TIMEOUT_PADRAO))
+    if tipo == "sqlite":
+        return BackendSQLite(configuracao.get("caminho", CAMINHO_SQLITE_PADRAO), timeout)
+    if tipo == "redis":
+        return BackendRedis(configuracao.get("url", URL_REDIS_PADRAO), timeout)
+    return None
@@ -0,0 +1,226 @@
+from cache import cache_consulta
+from salario import MOEDA_PADRAO
+
+TAMANHO_PAGINA_FEED = 20
+LIMITE_PAGINA_FEED = 100
+TAMANHO_RESUMO_DESCRICAO = 150
+
+ORDENACAO_FEED = [("data_criacao", -1), ("_id", -1)]
+ORDENACAO_SALARIO = [("salario_max", -1), ("_id", -1)]
+ORDENS_FEED = {"recentes": ORDENACAO_FEED, "salario": ORDENACAO_SALARIO}
+
+# Filtros do feed: nome (também o parâmetro na URL) -> campo da vaga.
+FACETAS_FEED = {"tipo": "tipo", "senioridade": "senioridade", "cidade": "geo.cidade", "empresa": "empresa"}
+LIMITE_OPCOES_FACETA = 30
+
+# Apenas os campos exibidos no cartão da vaga; a descrição vem cortada pelo próprio banco
+# (um caractere a mais para sabermos se precisa de reticências).
+PROJECAO_CARTAO_VAGA = {
+    "titulo": 1,
+    "empresa": 1,
+    "local": 1,
+    "requisitos": 1,
+    "salario": 1,
+    "salario_max": 1,
+    "tipo": 1,
+    "data_criacao": 1,
+    "descricao": {"$substrCP": [{"$ifNull": ["$descricao", ""]}, 0, TAMANHO_RESUMO_DESCRICAO + 1]},
+}
+
+
+def filtro_apos_cursor(cursor, campo="data_criacao"):
+    # Paginação por chave (keyset): continua exatamente depois do último cartão exibido,
+    # sem skip, usando o índice composto (campo, _id).
+    if cursor is None:
+        return {}
+    valor, ultimo_id = cursor
+    return {
+        "$or": [
+            {campo: {"$lt": valor}},
+            {campo: valor, "_id": {"$lt": ultimo_id}},
+        ]
+    }
+
+
+def filtro_salario(minimo=None, moeda=MOEDA_PADRAO):
+    # Só vagas com valor informado, na mesma moeda (o índice começa pela moeda).
+    return {"salario_moeda": moeda, "salario_max": {"$gte": float(minimo or 0)}}
+
+
+def filtro_facetas(facetas):
+    # facetas: pares (nome, valor), como vêm da URL.
+    return {FACETAS_FEED[nome]: valor for nome, valor in facetas if valor}
+
+
+def _juntar(*filtros):
+    filtros = [filtro for filtro in filtros if filtro]
+    return {"$and": filtros} if len(filtros) > 1 else next(iter(filtros), {})
+
+
+def _filtro_base(salario_minimo, ordem):
+    return filtro_salario(salario_minimo) if salario_minimo or ordem == "salario" else {}
+
+
+@cache_consulta("vagas", ttl=30)
+def carregar_pagina_vagas(db, cursor=None, limite=TAMANHO_PAGINA_FEED, salario_minimo=None, ordem="recentes", facetas=()):
+    limite = max(1, min(int(limite), LIMITE_PAGINA_FEED))
+    ordenacao = ORDENS_FEED[ordem]
+    campo = ordenacao[0][0]
+    filtro = _juntar(_filtro_base(salario_minimo, ordem), filtro_facetas(facetas), filtro_apos_cursor(cursor, campo))
+
+    vagas = list(
+        db.vagas.find(filtro, PROJECAO_CARTAO_VAGA)
+        .sort(ordenacao)
+        .limit(limite + 1)
+    )
+
+    proximo_cursor = None
+    if len(vagas) > limite:
+        vagas = vagas[:limite]
+        proximo_cursor = (vagas[-1].get(campo), vagas[-1]["_id"])
+
+    return vagas, proximo_cursor
+
+
+@cache_consulta("vagas", ttl=60)
+def carregar_facetas(db, salario_minimo=None, ordem="recentes", facetas=()):
+    # Opções e contagens de todos os filtros em uma agregação só. Cada faceta conta com os
+    # filtros das outras aplicados, mas não com o próprio: escolher "Remoto" não some com
+    # "Híbrido" da lista, que mostra quantas vagas haveria ao trocar.
+    selecionadas = dict(facetas)
+    por_faceta = {}
+    for nome, campo in FACETAS_FEED.items():
+        outras = filtro_facetas((n, v) for n, v in selecionadas.items() if n != nome)
+        por_faceta[nome] = [
+            *([{"$match": outras}] if outras else []),
+            {"$group": {"_id": f"${campo}", "total": {"$sum": 1}}},
+            {"$match": {"_id": {"$nin": [None, ""]}}},
+            {"$sort": {"total": -1, "_id": 1}},
+            {"$limit": LIMITE_OPCOES_FACETA},
+        ]
+    pipeline = [
+        *([{"$match": base}] if (base := _filtro_base(salario_minimo, ordem)) else []),
+        {"$project": {campo: 1 for campo in FACETAS_FEED.values()}},
+        {"$facet": por_faceta},
+    ]
+    resultado = next(iter(db.vagas.aggregate(pipeline)), {})
+    return {nome: [(item["_id"], item["total"]) for item in resultado.get(nome, [])] for nome in FACETAS_FEED}
+
+
+@cache_consulta("vagas")
+def carregar_pontos_mapa(db):
+    # Agrupa no servidor pelas coordenadas já resolvidas na escrita (campo "geo"),
+    # então só trafega um ponto por cidade, com a contagem de vagas.
+    pipeline = [
+        {"$match": {"geo.lat": {"$exists": True}}},
+        {"$group": {
+            "_id": {"lat": "$geo.lat", "lon": "$geo.lon"},
+            "cidade": {"$first": "$geo.cidade"},
+            "total": {"$sum": 1},
+        }},
+        {"$project": {"_id": 0, "lat": "$_id.lat", "lon": "$_id.lon", "cidade": 1, "total": 1}},
+    ]
+    return list(db.vagas.aggregate(pipeline))
+
+
+PROJECAO_PERFIL_CANDIDATO = {"_id": 0, "nome": 1, "formacao": 1, "idiomas": 1, "skills": 1, "resumo": 1}
+
+
+def _pipeline_painel(filtro):
+    # Vagas -> candidaturas -> perfil de cada candidato, com a contagem calculada no servidor
+    # (evita o N+1 de uma consulta por vaga/candidato).
+    return [
+        {"$match": filtro},
+        {"$sort": {"data_criacao": -1}},
+        {"$project": {
+            "titulo": 1, "empresa": 1, "local": 1, "salario": 1,
+            "descricao": 1, "requisitos": 1, "data_criacao": 1,
+        }},
+        {"$lookup": {
+            "from": "aplicacoes",
+            "localField": "_id",
+            "foreignField": "vaga_id",
+            "pipeline": [
+                # Perfil pelo _id do login: um ponto no índice único candidatos_por_usuario.
+                {"$lookup": {
+                    "from": "candidatos",
+                    "localField": "candidato_id",
+                    "foreignField": "usuario_id",
+                    "pipeline": [{"$project": PROJECAO_PERFIL_CANDIDATO}],
+                    "as": "perfil",
+                }},
+                {"$project": {
+                    "_id": 0,
+                    "candidato_username": 1,
+                    "data_aplicacao": 1,
+                    "perfil": {"$first": "$perfil"},
+                }},
+            ],
+            "as": "candidaturas",
+        }},
+        {"$addFields": {"qtd_candidatos": {"$size": "$candidaturas"}}},
+    ]
+
+
+def _filtro_empregador(usuario):
+    return {"$or": [{"criado_por": usuario}, {"empresa": usuario}]}
+
+
+@cache_consulta("aplicacoes", "vagas", "candidatos", ttl=30)
+def carregar_painel_empregador(db, usuario):
+    # Uma única agregação para todas as vagas do empregador.
+    return list(db.vagas.aggregate(_pipeline_painel(_filtro_empregador(usuario))))
+
+
+@cache_consulta("aplicacoes", "vagas", "candidatos", ttl=30)
+def carregar_vaga_empregador(db, usuario, id_vaga):
+    # A mesma agregação para uma vaga só, usada quando o painel dela é refeito sozinho.
+    filtro = {"$and": [{"_id": id_vaga}, _filtro_empregador(usuario)]}
+    return next(iter(db.vagas.aggregate(_pipeline_painel(filtro))), None)
+
+
+LIMITE_BUSCA = 100
+
+# Campos devolvidos pelas buscas do Assistente: o suficiente para o resultado, sem os textos longos.
+CAMPOS_RESULTADO_BUSCA = {
+    "vagas": ["titulo", "empresa", "requisitos", "salario", "salario_max", "salario_moeda"],
+    "candidatos": ["nome", "skills", "resumo"],
+}
+
+
+def buscar_por_texto(colecao, termo_busca, limite=LIMITE_BUSCA):
+    query = {"$text": {"$search": termo_busca}}
+    projecao = {
+        **{campo: 1 for campo in CAMPOS_RESULTADO_BUSCA[colecao.name]},
+        "score": {"$meta": "textScore"},
+    }
+    ordenacao = [("score", {"$meta": "textScore"})]
+    # Com sort por textScore + limit, o servidor mantém só os k melhores em vez de ordenar tudo.
+    return list(colecao.find(query, projecao).sort(ordenacao).limit(limite))
+
+
+@cache_consulta("vagas", ttl=120)
+def buscar_vagas_por_texto(db, termo_busca, limite=LIMITE_BUSCA):
+    return buscar_por_texto(db.vagas, termo_busca, limite)
+
+
+@cache_consulta("candidatos", ttl=120)
+def buscar_candidatos_por_texto(db, termo_busca, limite=LIMITE_BUSCA):
+    return buscar_por_texto(db.candidatos, termo_busca, limite)
+
+
+@cache_consulta("vagas", "candidatos", ttl=300)
+def carregar_resumos(db, colecao, ids):
+    # Campos de exibição de resultados guardados só como referência (_id) no histórico do chat.
+    projecao = {campo: 1 for campo in CAMPOS_RESULTADO_BUSCA[colecao]}
+    return {doc["_id"]: doc for doc in db[colecao].find({"_id": {"$in": list(ids)}}, projecao)}
+
+
+@cache_consulta("matches", ttl=300)
+def carregar_recomendacoes(db, origem, ids):
+    # Rankings pré-calculados por matching.py; um único $in para todos os ids da página.
+    documentos = db.matches.find(
+        {"origem": origem, "origem_id": {"$in": list(ids)}},
+        {"_id": 0, "origem_id": 1, "resultados": 1},
+    )
+    return {doc["origem_id"]: doc["resultados"] for doc in documentos}
@@ -1,48 +1,253 @@
-from db import get_database
-
-# Conecta ao banco
-db = get_database()
-
-if db is not None:
-    print("🔄 Reiniciando índices Full Text Search...")
-
-    try:
-        db.vagas.drop_index("search_index_vagas")
-        print("🗑️ Índice antigo de Vagas removido.")
-    except Exception:
-        pass 
-
-    try:
- 
-        db.vagas.create_index([
-            ("titulo", "text"),
-            ("descricao", "text"),
-            ("requisitos", "text"),
-            ("skills", "text")
-        ], name="search_index_vagas")
-        print("✅ Novo índice de VAGAS criado!")
-    except Exception as e:
-        print(f"❌ Erro ao criar índice de vagas: {e}")
-
-
-
-    try:
-        db.candidatos.drop_index("search_index_candidatos")
-        print("🗑️ Índice antigo de Candidatos removido.")
-    except Exception:
-        pass
-
-    try:
-        db.candidatos.create_index([
-            ("resumo", "text"),
-            ("skills", "text"),
-            ("experiencia", "text"),
-            ("formacao", "text"),
-            ("nome", "text")
-        ], name="search_index_candidatos")
-        print("✅ Novo índice de CANDIDATOS criado!")
-    except Exception as e:
-        print(f"❌ Erro ao criar índice de candidatos: {e}")
-
-else:
-    print("Erro de conexão. Verifique o secrets.toml")
\ No newline at end of file
+import argparse
+import hashlib
+import json
+import sys
+
+from indices import MANIFESTO, CONSULTAS
+
+# Opções que, se mudarem no manifesto, exigem reconstruir o índice.
+OPCOES_COMPARADAS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "collation")
+CAMPOS_INTERNOS_TEXTO = ("_fts", "_ftsx")
+
+
+def _normalizar_chaves(chaves):
+    return tuple((campo, int(tipo) if isinstance(tipo, (int, float)) else tipo) for campo, tipo in chaves)
+
+
+def _assinatura(chaves, opcoes):
+    # Forma comparável de um índice, igual para a entrada do manifesto e para o list_indexes().
+    pesos = opcoes.get("weights") or {}
+    texto = tuple(sorted((campo, pesos.get(campo, 1)) for campo, tipo in chaves if tipo == "text"))
+    comuns = _normalizar_chaves((campo, tipo) for campo, tipo in chaves if tipo != "text")
+    extras = [(op, json.dumps(opcoes[op], sort_keys=True, default=str)) for op in OPCOES_COMPARADAS if opcoes.get(op)]
+    if texto:
+        extras += [("weights", texto), ("default_language", opcoes.get("default_language", "english"))]
+    return comuns, tuple(extras)
+
+
+def _assinatura_existente(info):
+    chaves = [(campo, tipo) for campo, tipo in info["key"].items() if campo not in CAMPOS_INTERNOS_TEXTO]
+    if "weights" in info:
+        chaves += [(campo, "text") for campo in info["weights"]]
+    return _assinatura(chaves, info)
+
+
+def _texto(chaves):
+    return any(tipo == "text" for _, tipo in chaves)
+
+
+def _conflita(chaves, opcoes, info):
+    # O MongoDB não aceita dois índices de texto na mesma coleção, nem duas versões do mesmo
+    # padrão de chaves, a não ser que difiram no partialFilterExpression ou na collation:
+    # nesses casos o antigo precisa sair antes do build do novo.
+    if _texto(chaves):
+        return "weights" in info
+    if _normalizar_chaves(info["key"].items()) != _normalizar_chaves(chaves):
+        return False
+    return all(opcoes.get(op) == info.get(op) for op in ("partialFilterExpression", "collation"))
+
+
+def _ponte(nome, info):
+    # Índice provisório com as chaves do antigo mais o _id: serve às mesmas consultas enquanto
+    # o antigo sai e o novo, com as mesmas chaves, é construído.
+    chaves = [(campo, tipo) for campo, tipo in info["key"].items()]
+    if "_id" not in info["key"]:
+        chaves.append(("_id", 1))
+    opcoes = {op: info[op] for op in ("partialFilterExpression", "collation") if op in info}
+    return {"nome": f"{nome}__ponte", "chaves": chaves, "opcoes": opcoes}
+
+
+def planejar(db, remover_extras=False):
+    plano = []
+    colecoes = sorted({colecao for colecao, *_ in MANIFESTO})
+    for nome_colecao in colecoes:
+        existentes = {info["name"]: info for info in db[nome_colecao].list_indexes()}
+        declarados = set()
+
+        for colecao, nome, chaves, opcoes in MANIFESTO:
+            if colecao != nome_colecao:
+                continue
+            desejada = _assinatura(chaves, opcoes)
+            # Versões anteriores do índice têm o nome do manifesto, com ou sem sufixo "__<hash>".
+            anteriores = [n for n in existentes if n == nome or n.startswith(f"{nome}__")]
+            atual = next((n for n, info in existentes.items() if _assinatura_existente(info) == desejada), None)
+            declarados.update(anteriores)
+
+            if atual is not None:
+                declarados.add(atual)
+                plano.append({"colecao": nome_colecao, "nome": nome, "acao": "manter", "atual": atual,
+                              "remover": [n for n in anteriores if n != atual]})
+                continue
+
+            conflitos = [n for n, info in existentes.items() if n != "_id_" and _conflita(chaves, opcoes, info)]
+            sufixo = hashlib.sha1(repr(desejada).encode("utf-8")).hexdigest()[:8]
+            # Texto não tem ponte: o MongoDB aceita um só índice de texto por coleção.
+            pontes = [] if _texto(chaves) else [_ponte(nome, existentes[n]) for n in conflitos]
+            plano.append({
+                "colecao": nome_colecao,
+                "nome": nome,
+                "acao": "criar",
+                "chaves": chaves,
+                "opcoes": opcoes,
+                # Se o nome do manifesto ainda está ocupado pela versão antiga, o novo é construído
+                # ao lado dela com um sufixo, e a antiga só sai depois.
+                "nome_novo": nome if nome not in existentes or nome in conflitos else f"{nome}__{sufixo}",
+                "conflitos": conflitos,
+                "pontes": pontes,
+                "remover": [n for n in anteriores if n not in conflitos] + [ponte["nome"] for ponte in pontes],
+            })
+
+        extras = [n for n in existentes if n != "_id_" and n not in declarados]
+        if extras:
+            plano.append({"colecao": nome_colecao, "acao": "extras", "remover": extras if remover_extras else [],
+                          "nomes": extras})
+    return plano
+
+
+def exibir_plano(plano):
+    for passo in plano:
+        colecao = passo["colecao"].upper()
+        if passo["acao"] == "manter":
+            print(f"✅ {colecao}.{passo['nome']}: em dia (índice {passo['atual']}).")
+        elif passo["acao"] == "criar":
+            aviso = ""
+            if passo["pontes"]:
+                pontes = ", ".join(ponte["nome"] for ponte in passo["pontes"])
+                aviso = (f" — {', '.join(passo['conflitos'])} sai antes (mesmas chaves); as consultas usam {pontes}"
+                         " durante o build, sem a unicidade do antigo")
+            elif passo["conflitos"]:
+                aviso = (f" — remove antes {', '.join(passo['conflitos'])}: só um índice de texto por coleção,"
+                         " a busca fica sem índice durante o build")
+            print(f"🆕 {colecao}.{passo['nome']}: construir como {passo['nome_novo']}{aviso}.")
+        else:
+            destino = "removidos" if passo["remover"] else "mantidos (use --remover-extras)"
+            print(f"❔ {colecao}: índices fora do manifesto, {destino}: {', '.join(passo['nomes'])}.")
+        for nome in passo["remover"]:
+            if passo["acao"] != "extras":
+                print(f"   🗑️ {nome} sai depois que o novo estiver pronto.")
+
+
+def aplicar(db, plano):
+    erros = 0
+    for passo in plano:
+        colecao = db[passo["colecao"]]
+
+        if passo["acao"] == "criar":
+            try:
+                for ponte in passo["pontes"]:
+                    colecao.create_index(ponte["chaves"], name=ponte["nome"], **ponte["opcoes"])
+                    print(f"🌉 Índice provisório {ponte['nome']} em {colecao.name.upper()} construído.")
+            except Exception as e:
+                print(f"❌ Erro ao criar índice provisório: {e} (o índice antigo foi mantido)")
+                erros += 1
+                continue
+            for nome in passo["conflitos"]:
+                colecao.drop_index(nome)
+                print(f"🗑️ {nome} removido para dar lugar ao novo índice.")
+            try:
+                # create_index só retorna com o índice pronto; até lá as consultas seguem no antigo
+                # (ou na ponte).
+                colecao.create_index(passo["chaves"], name=passo["nome_novo"], **passo["opcoes"])
+                print(f"✅ Índice {passo['nome_novo']} em {colecao.name.upper()} construído!")
+            except Exception as e:
+                mantido = "a ponte fica até a próxima execução" if passo["conflitos"] else "o índice antigo foi mantido"
+                print(f"❌ Erro ao criar índice {passo['nome_novo']}: {e} ({mantido})")
+                erros += 1
+                continue
+
+        for nome in passo["remover"]:
+            colecao.drop_index(nome)
+            print(f"🗑️ Índice {nome} em {colecao.name.upper()} removido.")
+    return erros
+
+
+def _planos_consulta(plano):
+    if isinstance(plano, dict):
+        if "stage" in plano:
+            yield plano
+        for valor in plano.values():
+            yield from _planos_consulta(valor)
+    elif isinstance(plano, list):
+        for valor in plano:
+            yield from _planos_consulta(valor)
+
+
+def _campos_consulta(filtro):
+    campos = set()
+    for campo, valor in filtro.items():
+        if campo == "$and":
+            for parte in valor:
+                campos |= _campos_consulta(parte)
+        elif not campo.startswith("$"):
+            campos.add(campo)
+    return campos
+
+
+def indices_elegiveis(colecao, filtro, ordenacao=None):
+    # Índices do manifesto que o planner pode usar para a consulta: começam por um campo
+    # filtrado (ou pelo campo da ordenação) e, se parciais, só pedem campos que o filtro fixa.
+    # Sem servidor, já aponta um índice parcial que deixou de servir a uma consulta.
+    if "$or" in filtro:
+        por_ramo = [indices_elegiveis(colecao, ramo) for ramo in filtro["$or"]]
+        return sorted(set().union(*por_ramo)) if all(por_ramo) else []
+    campos = _campos_consulta(filtro)
+    campos_ordem = {ordenacao[0][0]} if ordenacao else set()
+    elegiveis = []
+    for nome_colecao, nome, chaves, opcoes in MANIFESTO:
+        if nome_colecao != colecao:
+            continue
+        if any(tipo == "text" for _, tipo in chaves):
+            if "$text" in filtro:
+                elegiveis.append(nome)
+            continue
+        parcial = opcoes.get("partialFilterExpression", {})
+        if chaves[0][0] in campos | campos_ordem and set(parcial) <= campos:
+            elegiveis.append(nome)
+    return elegiveis
+
+
+def explicar(db):
+    varreduras = 0
+    for descricao, colecao, filtro, ordenacao in CONSULTAS:
+        if not indices_elegiveis(colecao, filtro, ordenacao):
+            varreduras += 1
+            print(f"⚠️ {descricao} ({colecao}): nenhum índice do manifesto serve a esta consulta.")
+            continue
+        cursor = db[colecao].find(filtro).limit(20)
+        if ordenacao:
+            cursor = cursor.sort(ordenacao)
+        estagios = list(_planos_consulta(cursor.explain()["queryPlanner"]["winningPlan"]))
+        indices = sorted({estagio["indexName"] for estagio in estagios if "indexName" in estagio})
+
+        if any(estagio["stage"] == "COLLSCAN" for estagio in estagios):
+            varreduras += 1
+            print(f"⚠️ {descricao} ({colecao}): COLLSCAN — varre a coleção inteira.")
+        elif any(estagio["stage"] == "SORT" for estagio in estagios):
+            print(f"🟡 {descricao} ({colecao}): usa {', '.join(indices)}, mas ordena em memória.")
+        else:
+            print(f"✅ {descricao} ({colecao}): {', '.join(indices) or 'sem índice'}.")
+    return varreduras
+
+
+if __name__ == "__main__":
+    from db import get_database
+
+    parser = argparse.ArgumentParser(description="Sincroniza os índices do banco com o manifesto de indices.py, sem derrubar os antigos antes da hora.")
+    parser.add_argument("--plano", action="store_true", help="Só mostra o que seria feito.")
+    parser.add_argument("--remover-extras", action="store_true", help="Remove índices que não estão no manifesto.")
+    parser.add_argument("--explain", action="store_true", help="Roda o explain() das consultas do app e aponta COLLSCANs.")
+    args = parser.parse_args()
+
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+        sys.exit(1)
+
+    if args.explain:
+        sys.exit(1 if explicar(db) else 0)
+
+    plano = planejar(db, args.remover_extras)
+    exibir_plano(plano)
+    if not args.plano:
+        print("🔄 Aplicando o manifesto de índices...")
+        sys.exit(1 if aplicar(db, plano) else 0)
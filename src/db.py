@@ -1,18 +1,155 @@
+import threading
+import time
+
 import streamlit as st
-from pymongo import MongoClient
+from pymongo import MongoClient, ReadPreference, monitoring
+from pymongo.errors import PyMongoError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 import certifi
 
-@st.cache_resource
-def get_database():
+from instrumentacao import monitor_comandos
+
+NOME_BANCO = "portal_vagas"
+
+# Depois de esgotar as tentativas, espera este intervalo antes de tentar reconectar de novo,
+# para que as várias chamadas de um mesmo rerun não repitam o backoff inteiro.
+INTERVALO_RECONEXAO = 10
+
+# Valores usados quando o secrets.toml não define a opção em [mongo].
+OPCOES_PADRAO = {
+    "maxPoolSize": 50,
+    "minPoolSize": 0,
+    "maxIdleTimeMS": 60000,
+    "serverSelectionTimeoutMS": 5000,
+    "connectTimeoutMS": 5000,
+    "socketTimeoutMS": 20000,
+    "retryReads": True,
+    "retryWrites": True,
+    # O driver ignora (com aviso) os compressores cujo pacote não está instalado.
+    "compressors": "zstd,snappy,zlib",
+}
+
+PREFERENCIAS_LEITURA = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+class MonitorPool(monitoring.ConnectionPoolListener):
+    # Contadores do pool de conexões por servidor, alimentados pelos eventos do pymongo.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servidores = {}
+
+    def _somar(self, endereco, **incrementos):
+        with self._lock:
+            contadores = self._servidores.setdefault(f"{endereco[0]}:{endereco[1]}", {
+                "abertas": 0, "em_uso": 0, "checkouts": 0, "falhas_checkout": 0, "pool_limpo": 0,
+            })
+            for chave, valor in incrementos.items():
+                contadores[chave] += valor
+
+    def pool_created(self, event):
+        self._somar(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._somar(event.address, pool_limpo=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._somar(event.address, abertas=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._somar(event.address, abertas=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._somar(event.address, falhas_checkout=1)
+
+    def connection_checked_out(self, event):
+        self._somar(event.address, em_uso=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._somar(event.address, em_uso=-1)
+
+    def estatisticas(self):
+        with self._lock:
+            return {servidor: dict(contadores) for servidor, contadores in self._servidores.items()}
+
+
+monitor_pool = MonitorPool()
+
+
+def estatisticas_pool():
+    return monitor_pool.estatisticas()
+
+
+def _configuracao_mongo():
+    config = dict(st.secrets["mongo"])
+    opcoes = {**OPCOES_PADRAO, **{chave: config[chave] for chave in OPCOES_PADRAO if chave in config}}
+    return config["uri"], opcoes, config.get("read_preference_leitura", "secondaryPreferred")
+
+
+@retry(
+    retry=retry_if_exception_type(PyMongoError),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, max=4),
+    reraise=True,
+)
+def _criar_cliente(uri, opcoes):
+    client = MongoClient(
+        uri,
+        tlsCAFile=certifi.where(),
+        tlsAllowInvalidCertificates=True,
+        event_listeners=[monitor_pool, monitor_comandos],
+        **opcoes,
+    )
     try:
-        uri = st.secrets["mongo"]["uri"]
-        
-        client = MongoClient(uri, tlsCAFile=certifi.where(), tlsAllowInvalidCertificates=True)
-        
         client.admin.command('ping')
-        
-        return client.portal_vagas
-        
+    except Exception:
+        client.close()
+        raise
+    return client
+
+
+@st.cache_resource
+def _conectar():
+    # Exceções não entram no cache do st.cache_resource: a próxima chamada tenta de novo.
+    uri, opcoes, _ = _configuracao_mongo()
+    return _criar_cliente(uri, opcoes)
+
+
+_falha = {"quando": None, "erro": None}
+
+
+def get_database(somente_leitura=False):
+    if _falha["quando"] is not None and time.monotonic() - _falha["quando"] < INTERVALO_RECONEXAO:
+        st.error(f"Erro ao conectar ao MongoDB: {_falha['erro']}")
+        return None
+
+    try:
+        client = _conectar()
     except Exception as e:
+        _falha["quando"], _falha["erro"] = time.monotonic(), e
         st.error(f"Erro ao conectar ao MongoDB: {e}")
-        return None
\ No newline at end of file
+        return None
+    _falha["quando"] = None
+
+    if somente_leitura:
+        _, _, preferencia = _configuracao_mongo()
+        return client.get_database(NOME_BANCO, read_preference=PREFERENCIAS_LEITURA[preferencia])
+    return client[NOME_BANCO]
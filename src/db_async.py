@@ -0,0 +1,185 @@
+import asyncio
+import threading
+from typing import Any, TypedDict
+
+import certifi
+import streamlit as st
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+
+from db import NOME_BANCO, PREFERENCIAS_LEITURA, _configuracao_mongo, monitor_pool
+from instrumentacao import definir_rerun, monitor_comandos, rerun_atual
+
+TIMEOUT_CONSULTAS = 30
+
+
+class Vaga(TypedDict, total=False):
+    _id: ObjectId
+    titulo: str
+    empresa: str
+    local: str
+    tipo: str
+    salario: str
+    salario_min: float | None
+    salario_max: float | None
+    salario_moeda: str | None
+    salario_a_combinar: bool
+    senioridade: str
+    descricao: str
+    requisitos: str
+    criado_por: str
+    data_criacao: Any
+
+
+class Candidato(TypedDict, total=False):
+    _id: ObjectId
+    nome: str
+    formacao: str
+    idiomas: str
+    resumo: str
+    experiencia: str
+    skills: str
+    usuario_id: ObjectId
+    username_vinculo: str
+    data_atualizacao: Any
+
+
+class Aplicacao(TypedDict, total=False):
+    _id: ObjectId
+    vaga_id: ObjectId
+    vaga_titulo: str
+    empresa_vaga: str
+    candidato_id: ObjectId
+    candidato_username: str
+    data_aplicacao: Any
+
+
+class Usuario(TypedDict, total=False):
+    _id: ObjectId
+    nome: str
+    username: str
+    role: str
+    data_criacao: Any
+
+
+class _Executor:
+    # Um event loop em uma thread própria, dono do AsyncMongoClient. As páginas continuam
+    # síncronas: entregam corrotinas para este loop e esperam o resultado.
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="mongo-async", daemon=True)
+        self._thread.start()
+        uri, opcoes, preferencia = _configuracao_mongo()
+        self.cliente = self.rodar(self._criar_cliente(uri, opcoes))
+        self.preferencia_leitura = PREFERENCIAS_LEITURA[preferencia]
+
+    async def _criar_cliente(self, uri, opcoes):
+        # Criado dentro do loop, ao qual o cliente assíncrono fica vinculado.
+        return AsyncMongoClient(
+            uri,
+            tlsCAFile=certifi.where(),
+            tlsAllowInvalidCertificates=True,
+            event_listeners=[monitor_pool, monitor_comandos],
+            **opcoes,
+        )
+
+    def rodar(self, corrotina, timeout=TIMEOUT_CONSULTAS):
+        return asyncio.run_coroutine_threadsafe(corrotina, self.loop).result(timeout)
+
+    def banco(self, somente_leitura=False):
+        if somente_leitura:
+            return self.cliente.get_database(NOME_BANCO, read_preference=self.preferencia_leitura)
+        return self.cliente[NOME_BANCO]
+
+
+@st.cache_resource
+def _executor():
+    return _Executor()
+
+
+def executar(*chamadas, somente_leitura=False):
+    # Fachada síncrona: cada chamada é (funcao_async, *args), no formato fn(db, *args) do resto
+    # do projeto. Todas rodam ao mesmo tempo e os resultados voltam na mesma ordem.
+    executor = _executor()
+    db = executor.banco(somente_leitura)
+    rerun = rerun_atual()
+
+    async def _todas():
+        # Os comandos disparados no loop contam no custo da página que pediu as consultas.
+        definir_rerun(rerun)
+        return await asyncio.gather(*(funcao(db, *args) for funcao, *args in chamadas))
+
+    return executor.rodar(_todas())
+
+
+# --- repositórios ---
+
+async def buscar(db, colecao: str, filtro: dict | None = None, projecao: dict | None = None,
+                 ordenacao: list | None = None, pular: int = 0, limite: int = 0) -> list[dict]:
+    cursor = db[colecao].find(filtro or {}, projecao)
+    if ordenacao:
+        cursor = cursor.sort(ordenacao)
+    return await cursor.skip(pular).limit(limite).to_list()
+
+
+async def contar(db, colecao: str, filtro: dict | None = None) -> int:
+    # Sem filtro, a contagem vem dos metadados da coleção, sem varrer documentos.
+    if filtro:
+        return await db[colecao].count_documents(filtro)
+    return await db[colecao].estimated_document_count()
+
+
+async def buscar_vagas(db, filtro: dict | None = None, projecao: dict | None = None,
+                       ordenacao: list | None = None, pular: int = 0, limite: int = 0) -> list[Vaga]:
+    return await buscar(db, "vagas", filtro, projecao, ordenacao, pular, limite)
+
+
+async def contar_vagas(db, filtro: dict | None = None) -> int:
+    return await contar(db, "vagas", filtro)
+
+
+async def vagas_do_empregador(db, usuario: str) -> list[Vaga]:
+    filtro = {"$or": [{"criado_por": usuario}, {"empresa": usuario}]}
+    return await buscar_vagas(db, filtro, ordenacao=[("data_criacao", -1)])
+
+
+async def buscar_candidatos(db, filtro: dict | None = None, projecao: dict | None = None,
+                            ordenacao: list | None = None, pular: int = 0, limite: int = 0) -> list[Candidato]:
+    return await buscar(db, "candidatos", filtro, projecao, ordenacao, pular, limite)
+
+
+async def contar_candidatos(db, filtro: dict | None = None) -> int:
+    return await contar(db, "candidatos", filtro)
+
+
+async def candidato_por_usuario(db, usuario_id: ObjectId) -> Candidato | None:
+    return await db.candidatos.find_one({"usuario_id": usuario_id})
+
+
+async def aplicacoes_das_vagas(db, ids_vagas: list[ObjectId]) -> dict[ObjectId, list[Aplicacao]]:
+    por_vaga = {id_vaga: [] for id_vaga in ids_vagas}
+    async for aplicacao in db.aplicacoes.find({"vaga_id": {"$in": list(ids_vagas)}}):
+        por_vaga[aplicacao["vaga_id"]].append(aplicacao)
+    return por_vaga
+
+
+async def contar_aplicacoes(db, filtro: dict | None = None) -> int:
+    return await contar(db, "aplicacoes", filtro)
+
+
+async def buscar_usuarios(db, filtro: dict | None = None, projecao: dict | None = None,
+                          ordenacao: list | None = None, pular: int = 0, limite: int = 0) -> list[Usuario]:
+    # A senha nunca sai daqui, qualquer que seja a projeção pedida.
+    projecao = {campo: valor for campo, valor in (projecao or {}).items() if campo not in ("senha", "senha_hash")}
+    if not any(valor for campo, valor in projecao.items() if campo != "_id"):
+        projecao.update({"senha": 0, "senha_hash": 0})
+    return await buscar(db, "usuarios", filtro, projecao, ordenacao, pular, limite)
+
+
+async def contar_usuarios(db, filtro: dict | None = None) -> int:
+    return await contar(db, "usuarios", filtro)
+
+
+async def usuario_por_username(db, username: str) -> Usuario | None:
+    return await db.usuarios.find_one({"username": username}, {"senha": 0, "senha_hash": 0})
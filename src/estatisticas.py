@@ -0,0 +1,154 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+ID_DASHBOARD = "dashboard"
+SEM_INFORMACAO = "Não informado"
+TOP_VAGAS = 10
+TAMANHO_LOTE = 1000
+
+
+def _colecao_stats(db):
+    return db["stats"]
+
+
+def _colecao_stats_vagas(db):
+    # Candidaturas por vaga, um documento por vaga (_id = vaga_id): cresce com o número de
+    # vagas, então não cabe no documento do dashboard.
+    return db["stats_vagas"]
+
+
+def _chave(valor):
+    # Os valores viram nomes de campo no documento de estatísticas: "." e "$" não são permitidos.
+    texto = str(valor) if valor not in (None, "") else SEM_INFORMACAO
+    return texto.replace(".", "·").replace("$", "＄")
+
+
+def _chave_mes(data):
+    return data.strftime("%Y-%m") if isinstance(data, datetime) else SEM_INFORMACAO
+
+
+def _chave_local(vaga):
+    geo = vaga.get("geo") or {}
+    return geo.get("cidade") or "outros"
+
+
+def _agrupar(campo):
+    return [{"$group": {"_id": campo, "total": {"$sum": 1}}}]
+
+
+def recalcular_estatisticas(db):
+    # Recontagem completa: um $facet sobre vagas para o documento do dashboard e um $group
+    # sobre candidaturas, gravado em lotes na coleção por vaga.
+    pipeline = [
+        {"$facet": {
+            "por_tipo": _agrupar("$tipo"),
+            "por_senioridade": _agrupar("$senioridade"),
+            "por_local": _agrupar({"$ifNull": ["$geo.cidade", "outros"]}),
+            "por_mes": _agrupar({"$dateToString": {
+                "format": "%Y-%m", "date": "$data_criacao", "onNull": SEM_INFORMACAO,
+            }}),
+        }}
+    ]
+    resultado = next(db.vagas.aggregate(pipeline), {})
+    instante = datetime.now()
+
+    def como_dict(grupos):
+        return {_chave(g["_id"]): g["total"] for g in grupos}
+
+    stats = {
+        "_id": ID_DASHBOARD,
+        "vagas": {
+            "total": db.vagas.estimated_document_count(),
+            "por_tipo": como_dict(resultado.get("por_tipo", [])),
+            "por_senioridade": como_dict(resultado.get("por_senioridade", [])),
+            "por_local": como_dict(resultado.get("por_local", [])),
+            "por_mes": como_dict(resultado.get("por_mes", [])),
+        },
+        "candidatos": {"total": db.candidatos.estimated_document_count()},
+        "usuarios": {"total": db.usuarios.estimated_document_count()},
+        "aplicacoes": {"total": db.aplicacoes.estimated_document_count()},
+        "atualizado_em": instante,
+    }
+    recalcular_aplicacoes_por_vaga(db, instante)
+    _colecao_stats(db).replace_one({"_id": ID_DASHBOARD}, stats, upsert=True)
+    return stats
+
+
+def recalcular_aplicacoes_por_vaga(db, instante):
+    # Cada grupo é um documento pequeno no cursor da agregação: sem limite de tamanho no
+    # resultado. Vagas que deixaram de ter candidaturas saem pela marca do recálculo.
+    colecao = _colecao_stats_vagas(db)
+    grupos = db.aplicacoes.aggregate([
+        {"$match": {"vaga_id": {"$ne": None}}},
+        {"$group": {
+            "_id": "$vaga_id",
+            "titulo": {"$last": "$vaga_titulo"},
+            "empresa": {"$last": "$empresa_vaga"},
+            "total": {"$sum": 1},
+        }},
+    ])
+    lote = []
+    for grupo in grupos:
+        lote.append(UpdateOne({"_id": grupo.pop("_id")}, {"$set": {**grupo, "recalculo": instante}}, upsert=True))
+        if len(lote) >= TAMANHO_LOTE:
+            colecao.bulk_write(lote, ordered=False)
+            lote = []
+    if lote:
+        colecao.bulk_write(lote, ordered=False)
+    colecao.delete_many({"recalculo": {"$ne": instante}})
+
+
+def carregar_mais_procuradas(db, limite=TOP_VAGAS):
+    return list(_colecao_stats_vagas(db).find({}, {"recalculo": 0}).sort("total", -1).limit(limite))
+
+
+async def carregar_mais_procuradas_async(db, limite=TOP_VAGAS):
+    return await _colecao_stats_vagas(db).find({}, {"recalculo": 0}).sort("total", -1).limit(limite).to_list()
+
+
+def carregar_estatisticas(db):
+    stats = _colecao_stats(db).find_one({"_id": ID_DASHBOARD})
+    if stats is None:
+        stats = recalcular_estatisticas(db)
+    return stats
+
+
+async def carregar_estatisticas_async(db):
+    # Só a leitura; se o documento ainda não existe, quem chama recorre ao carregar_estatisticas.
+    return await _colecao_stats(db).find_one({"_id": ID_DASHBOARD})
+
+
+def _incrementar(db, incrementos):
+    # Sem upsert: enquanto o documento não existir, a primeira leitura faz a recontagem completa.
+    _colecao_stats(db).update_one(
+        {"_id": ID_DASHBOARD},
+        {"$inc": incrementos, "$set": {"atualizado_em": datetime.now()}},
+    )
+
+
+def registrar_vaga(db, vaga):
+    _incrementar(db, {
+        "vagas.total": 1,
+        f"vagas.por_tipo.{_chave(vaga.get('tipo'))}": 1,
+        f"vagas.por_senioridade.{_chave(vaga.get('senioridade'))}": 1,
+        f"vagas.por_local.{_chave(_chave_local(vaga))}": 1,
+        f"vagas.por_mes.{_chave_mes(vaga.get('data_criacao'))}": 1,
+    })
+
+
+def registrar_candidato(db):
+    _incrementar(db, {"candidatos.total": 1})
+
+
+def registrar_usuario(db):
+    _incrementar(db, {"usuarios.total": 1})
+
+
+def registrar_aplicacao(db, vaga):
+    _incrementar(db, {"aplicacoes.total": 1})
+    _colecao_stats_vagas(db).update_one(
+        {"_id": vaga["_id"]},
+        {"$inc": {"total": 1}, "$setOnInsert": {"titulo": vaga.get("titulo"), "empresa": vaga.get("empresa")}},
+        upsert=True,
+    )
@@ -0,0 +1,102 @@
+import re
+
+from texto import normalizar_texto
+
+COORDENADAS_CIDADES = {
+    "sao paulo": [-23.5505, -46.6333], "sp": [-23.5505, -46.6333],
+    "rio de janeiro": [-22.9068, -43.1729], "rj": [-22.9068, -43.1729],
+    "belo horizonte": [-19.9167, -43.9345], "mg": [-19.9167, -43.9345],
+    "vitoria": [-20.3155, -40.3128], "es": [-20.3155, -40.3128],
+    "campinas": [-22.9099, -47.0626],
+    "santos": [-23.9618, -46.3322],
+    "sao jose dos campos": [-23.2237, -45.9009],
+    "ribeirao preto": [-21.1704, -47.8103],
+    "sorocaba": [-23.5015, -47.4521],
+    "uberlandia": [-18.9128, -48.2755],
+    "juiz de fora": [-21.7661, -43.3503],
+    "niteroi": [-22.8859, -43.1152],
+    "curitiba": [-25.4284, -49.2733], "pr": [-25.4284, -49.2733],
+    "florianopolis": [-27.5954, -48.5480], "sc": [-27.5954, -48.5480],
+    "porto alegre": [-30.0346, -51.2177], "rs": [-30.0346, -51.2177],
+    "joinville": [-26.3044, -48.8461],
+    "blumenau": [-26.9194, -49.0661],
+    "londrina": [-23.3045, -51.1696],
+    "maringa": [-23.4210, -51.9331],
+    "caxias do sul": [-29.1691, -51.1793],
+    "brasilia": [-15.7975, -47.8919], "df": [-15.7975, -47.8919],
+    "goiania": [-16.6869, -49.2648], "go": [-16.6869, -49.2648],
+    "cuiaba": [-15.6010, -56.0979], "mt": [-15.6010, -56.0979],
+    "campo grande": [-20.4697, -54.6201], "ms": [-20.4697, -54.6201],
+    "salvador": [-12.9777, -38.5016], "ba": [-12.9777, -38.5016],
+    "recife": [-8.0476, -34.8770], "pe": [-8.0476, -34.8770],
+    "fortaleza": [-3.7172, -38.5434], "ce": [-3.7172, -38.5434],
+    "sao luis": [-2.5307, -44.3068], "ma": [-2.5307, -44.3068],
+    "maceio": [-9.6498, -35.7089], "al": [-9.6498, -35.7089],
+    "teresina": [-5.0920, -42.8038], "pi": [-5.0920, -42.8038],
+    "natal": [-5.7945, -35.2110], "rn": [-5.7945, -35.2110],
+    "joao pessoa": [-7.1195, -34.8450], "pb": [-7.1195, -34.8450],
+    "aracaju": [-10.9472, -37.0731], "se": [-10.9472, -37.0731],
+    "manaus": [-3.0425, -60.0020], "am": [-3.0425, -60.0020],
+    "belem": [-1.2721, -48.3014], "pa": [-1.2721, -48.3014],
+    "porto velho": [-8.7612, -63.9039], "ro": [-8.7612, -63.9039],
+    "boa vista": [2.8235, -60.6758], "rr": [2.8235, -60.6758],
+    "macapa": [0.0355, -51.0705], "ap": [0.0355, -51.0705],
+    "rio branco": [-9.9754, -67.8249], "ac": [-9.9754, -67.8249],
+    "palmas": [-10.2491, -48.3243], "to": [-10.2491, -48.3243],
+    "nova iorque": [40.7128, -74.0060], "new york": [40.7128, -74.0060], "ny": [40.7128, -74.0060],
+    "san francisco": [37.7749, -122.4194], "vale do silicio": [37.3875, -122.0575], "silicon valley": [37.3875, -122.0575],
+    "austin": [30.2672, -97.7431], "texas": [31.9686, -99.9018],
+    "seattle": [47.6062, -122.3321],
+    "boston": [42.3601, -71.0589],
+    "miami": [25.7617, -80.1918], "florida": [27.6648, -81.5158],
+    "toronto": [43.6510, -79.3470],
+    "vancouver": [49.2827, -123.1207],
+    "montreal": [45.5017, -73.5673],
+    "quebec": [46.8139, -71.2080],
+    "lisboa": [38.7223, -9.1393], "lisbon": [38.7223, -9.1393],
+    "porto": [41.1579, -8.6291],
+    "londres": [51.5074, -0.1278], "london": [51.5074, -0.1278],
+    "berlim": [52.5200, 13.4050], "berlin": [52.5200, 13.4050],
+    "munique": [48.1351, 11.5820], "munich": [48.1351, 11.5820],
+    "amsterdam": [52.3676, 4.9041], "amsterda": [52.3676, 4.9041],
+    "madrid": [40.4168, -3.7038],
+    "barcelona": [41.3851, 2.1734],
+    "dublin": [53.3498, -6.2603],
+    "paris": [48.8566, 2.3522],
+    "tallinn": [59.4370, 24.7536],
+    "buenos aires": [-34.6037, -58.3816],
+    "santiago": [-33.4489, -70.6693],
+    "montevideu": [-34.9011, -56.1645],
+    "cidade do mexico": [19.4326, -99.1332],
+    "mexico city": [19.4326, -99.1332],
+    "bogota": [4.7110, -74.0721],
+    "sydney": [-33.8688, 151.2093],
+    "melbourne": [-37.8136, 144.9631],
+    "cingapura": [1.3521, 103.8198],
+    "singapore": [1.3521, 103.8198],
+    "toquio": [35.6762, 139.6503],
+    "tokyo": [35.6762, 139.6503],
+    "tel aviv": [32.0853, 34.7818]
+}
+
+
+# Uma única regex com todas as cidades, das mais longas para as mais curtas, compilada uma vez
+# na importação do módulo ("porto alegre" antes de "porto", "sao paulo" antes de "sp").
+_REGEX_CIDADES = re.compile(
+    r"\b(?:" + "|".join(re.escape(c) for c in sorted(COORDENADAS_CIDADES, key=len, reverse=True)) + r")\b"
+)
+
+
+def resolver_local(local):
+    # Entre todas as cidades citadas no texto, vale a de nome mais longo
+    # ("SP - Campinas" vira Campinas, não o estado).
+    cidade = None
+    for encontrada in _REGEX_CIDADES.finditer(normalizar_texto(local)):
+        if cidade is None or len(encontrada.group()) > len(cidade):
+            cidade = encontrada.group()
+
+    if cidade is None:
+        return None
+
+    lat, lon = COORDENADAS_CIDADES[cidade]
+    return {"cidade": cidade, "lat": lat, "lon": lon}
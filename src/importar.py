@@ -0,0 +1,231 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from cache import invalidar_colecao
+from geo import resolver_local
+from salario import interpretar_salario
+
+TAMANHO_LOTE_PADRAO = 1000
+WORKERS_PADRAO = 4
+INTERVALO_PROGRESSO = 5
+
+# Os mesmos campos (e obrigatórios) dos formulários do Empregador e do Candidato.
+CAMPOS = {
+    "vagas": ["titulo", "empresa", "local", "tipo", "salario", "senioridade", "descricao", "requisitos", "criado_por"],
+    "candidatos": ["nome", "formacao", "idiomas", "resumo", "experiencia", "skills", "username_vinculo"],
+}
+OBRIGATORIOS = {
+    "vagas": ["titulo", "empresa", "descricao"],
+    "candidatos": ["nome", "resumo", "skills"],
+}
+CAMPO_DATA = {"vagas": "data_criacao", "candidatos": "data_atualizacao"}
+
+
+def _ler_csv(caminho, inicio):
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        for offset, registro in enumerate(csv.DictReader(arquivo)):
+            if offset >= inicio:
+                yield offset, registro
+
+
+def _ler_jsonl(caminho, inicio):
+    with open(caminho, encoding="utf-8") as arquivo:
+        for offset, linha in enumerate(arquivo):
+            if offset < inicio:
+                continue
+            try:
+                yield offset, json.loads(linha) if linha.strip() else None
+            except json.JSONDecodeError:
+                yield offset, None
+
+
+def _ler_parquet(caminho, inicio):
+    import pyarrow.parquet as pq
+
+    offset = 0
+    for lote in pq.ParquetFile(caminho).iter_batches(batch_size=TAMANHO_LOTE_PADRAO):
+        # Lotes inteiros antes do ponto de retomada são pulados sem converter as linhas.
+        if offset + lote.num_rows <= inicio:
+            offset += lote.num_rows
+            continue
+        for registro in lote.to_pylist():
+            if offset >= inicio:
+                yield offset, registro
+            offset += 1
+
+
+LEITORES = {
+    "csv": _ler_csv,
+    "jsonl": _ler_jsonl,
+    "parquet": _ler_parquet,
+}
+
+
+def _data(valor):
+    if isinstance(valor, datetime):
+        return valor
+    try:
+        return datetime.fromisoformat(str(valor))
+    except ValueError:
+        return None
+
+
+def normalizar(colecao, registro):
+    # Devolve o documento pronto para gravar ou None se o registro não passa na validação.
+    if not isinstance(registro, dict):
+        return None
+    documento = {}
+    for campo in CAMPOS[colecao]:
+        valor = registro.get(campo)
+        documento[campo] = "" if valor is None else str(valor).strip()
+    if not all(documento[campo] for campo in OBRIGATORIOS[colecao]):
+        return None
+    # Sem dono informado no arquivo, o documento fica sem vínculo (em vez de um username vazio).
+    for campo in ("criado_por", "username_vinculo"):
+        if campo in documento and not documento[campo]:
+            del documento[campo]
+
+    campo_data = CAMPO_DATA[colecao]
+    documento[campo_data] = _data(registro.get(campo_data)) or datetime.now()
+    if colecao == "vagas":
+        documento["geo"] = resolver_local(documento["local"])
+        documento.update(interpretar_salario(documento["salario"]))
+    return documento
+
+
+def validar(colecao, registros):
+    for offset, registro in registros:
+        yield offset, normalizar(colecao, registro)
+
+
+def em_lotes(itens, tamanho):
+    # Cada lote leva o intervalo de offsets que consumiu (inclusive os registros rejeitados),
+    # para o checkpoint avançar sobre eles também.
+    lote = []
+    inicio = None
+    for offset, documento in itens:
+        if inicio is None:
+            inicio = offset
+        lote.append((offset, documento))
+        if len(lote) >= tamanho:
+            yield inicio, offset + 1, lote
+            lote, inicio = [], None
+    if lote:
+        yield inicio, lote[-1][0] + 1, lote
+
+
+def _gravar_lote(colecao, origem, lote):
+    # Upsert por (arquivo, offset): um lote regravado depois de uma retomada não duplica nada.
+    operacoes = [
+        UpdateOne({"origem_importacao": f"{origem}#{offset}"}, {"$setOnInsert": documento}, upsert=True)
+        for offset, documento in lote
+        if documento is not None
+    ]
+    if not operacoes:
+        return 0
+    return colecao.bulk_write(operacoes, ordered=False).upserted_count
+
+
+def importar(db, colecao, caminho, formato, tamanho_lote=TAMANHO_LOTE_PADRAO, workers=WORKERS_PADRAO, recomecar=False):
+    origem = os.path.basename(caminho)
+    id_checkpoint = f"{colecao}:{origem}"
+    if recomecar:
+        db.importacoes.delete_one({"_id": id_checkpoint})
+    checkpoint = db.importacoes.find_one({"_id": id_checkpoint}) or {}
+    inicio_arquivo = checkpoint.get("offset", 0)
+
+    totais = {"lidos": 0, "inseridos": 0, "rejeitados": 0, "offset": inicio_arquivo}
+    lotes = em_lotes(validar(colecao, LEITORES[formato](caminho, inicio_arquivo)), tamanho_lote)
+
+    def salvar_checkpoint(offset):
+        totais["offset"] = offset
+        db.importacoes.update_one(
+            {"_id": id_checkpoint},
+            {"$set": {"colecao": colecao, "arquivo": origem, "offset": offset, "atualizado_em": datetime.now()}},
+            upsert=True,
+        )
+
+    inicio = time.perf_counter()
+    ultimo_relatorio = inicio
+    pendentes = deque()
+
+    def concluir_mais_antigo():
+        # Os lotes terminam fora de ordem; o checkpoint só avança até o lote contíguo mais antigo.
+        fim, tamanho, rejeitados, futuro = pendentes.popleft()
+        totais["inseridos"] += futuro.result()
+        totais["lidos"] += tamanho
+        totais["rejeitados"] += rejeitados
+        salvar_checkpoint(fim)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="importacao") as executor:
+            for inicio_lote, fim_lote, lote in lotes:
+                # No máximo 2 lotes por worker em memória, por maior que seja o arquivo.
+                while len(pendentes) >= 2 * workers:
+                    concluir_mais_antigo()
+                rejeitados = sum(1 for _, documento in lote if documento is None)
+                futuro = executor.submit(_gravar_lote, db[colecao], origem, lote)
+                pendentes.append((fim_lote, len(lote), rejeitados, futuro))
+
+                agora = time.perf_counter()
+                if agora - ultimo_relatorio >= INTERVALO_PROGRESSO:
+                    ultimo_relatorio = agora
+                    print(
+                        f"⏳ {totais['lidos']} registro(s) lidos, {totais['inseridos']} inserido(s), "
+                        f"{totais['rejeitados']} rejeitado(s) — {totais['lidos'] / (agora - inicio):.0f} registros/s "
+                        f"(offset {totais['offset']})"
+                    )
+            while pendentes:
+                concluir_mais_antigo()
+    finally:
+        # As réplicas do app não veem escritas de outro processo: sobe a versão compartilhada
+        # (também se a importação parou no meio, com parte dos lotes já gravada).
+        if totais["inseridos"]:
+            invalidar_colecao(colecao)
+
+    totais["segundos"] = time.perf_counter() - inicio
+    return totais
+
+
+def _formato(caminho):
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    return {"json": "jsonl", "ndjson": "jsonl", "parq": "parquet"}.get(extensao, extensao)
+
+
+if __name__ == "__main__":
+    from db import get_database
+    from estatisticas import recalcular_estatisticas
+
+    parser = argparse.ArgumentParser(description="Importa vagas ou currículos em massa a partir de CSV, JSONL ou Parquet.")
+    parser.add_argument("colecao", choices=sorted(CAMPOS))
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=sorted(LEITORES), help="Padrão: deduzido pela extensão do arquivo.")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO)
+    parser.add_argument("--workers", type=int, default=WORKERS_PADRAO)
+    parser.add_argument("--recomecar", action="store_true", help="Ignora o checkpoint e lê o arquivo desde o início.")
+    args = parser.parse_args()
+
+    formato = args.formato or _formato(args.arquivo)
+    if formato not in LEITORES:
+        parser.error(f"Formato não reconhecido: {formato}. Use --formato.")
+
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+    else:
+        totais = importar(db, args.colecao, args.arquivo, formato, args.lote, args.workers, args.recomecar)
+        if totais["inseridos"]:
+            recalcular_estatisticas(db)
+        print(
+            f"✅ Importação concluída: {totais['inseridos']} inserido(s), {totais['rejeitados']} rejeitado(s) "
+            f"de {totais['lidos']} registro(s) em {totais['segundos']:.1f} s "
+            f"({totais['lidos'] / max(totais['segundos'], 1e-9):.0f} registros/s). Offset final: {totais['offset']}."
+        )
@@ -0,0 +1,81 @@
+from bson import ObjectId
+
+from consultas import ORDENACAO_FEED, ORDENACAO_SALARIO, filtro_apos_cursor, filtro_facetas, filtro_salario
+
+# Manifesto de índices: (coleção, nome, chaves, opções). É a única fonte de verdade para o
+# criar_indices.py, que compara esta lista com o que existe no banco e só mexe no que mudou.
+MANIFESTO = [
+    ("vagas", "search_index_vagas", [
+        ("titulo", "text"),
+        ("descricao", "text"),
+        ("requisitos", "text"),
+        ("skills", "text"),
+    ], {}),
+    ("vagas", "feed_vagas", [("data_criacao", -1), ("_id", -1)], {}),
+    # Moeda (igualdade), depois a chave de ordenação, depois o intervalo: filtro por salário
+    # mínimo e "maior salário" saem do índice, sem ordenar em memória.
+    ("vagas", "vagas_por_salario", [("salario_moeda", 1), ("salario_max", -1), ("_id", -1)], {}),
+    ("vagas", "feed_vagas_salario", [("salario_moeda", 1), ("data_criacao", -1), ("_id", -1), ("salario_max", -1)], {}),
+    ("vagas", "vagas_por_criador", [("criado_por", 1), ("data_criacao", -1)], {}),
+    ("vagas", "vagas_por_empresa", [("empresa", 1), ("data_criacao", -1), ("_id", -1)], {}),
+    # Filtros do feed: igualdade nos campos escolhidos, depois a ordem do feed. Um índice por
+    # faceta (tipo cobre também tipo + senioridade); nas demais combinações o planner usa o
+    # mais seletivo e confere o resto nos documentos.
+    ("vagas", "feed_vagas_tipo", [("tipo", 1), ("senioridade", 1), ("data_criacao", -1), ("_id", -1)], {}),
+    ("vagas", "feed_vagas_senioridade", [("senioridade", 1), ("data_criacao", -1), ("_id", -1)], {}),
+    ("vagas", "feed_vagas_cidade", [("geo.cidade", 1), ("data_criacao", -1), ("_id", -1)], {}),
+    ("vagas", "vagas_origem_importacao", [("origem_importacao", 1)], {"unique": True, "sparse": True}),
+
+    ("candidatos", "search_index_candidatos", [
+        ("resumo", "text"),
+        ("skills", "text"),
+        ("experiencia", "text"),
+        ("formacao", "text"),
+        ("nome", "text"),
+    ], {}),
+    ("candidatos", "candidatos_por_usuario", [("usuario_id", 1)], {"unique": True, "sparse": True}),
+    ("candidatos", "candidatos_por_nome", [("nome", 1)], {}),
+    ("candidatos", "candidatos_origem_importacao", [("origem_importacao", 1)], {"unique": True, "sparse": True}),
+
+    # Parcial: candidaturas antigas ainda sem vaga_id ou candidato_id (backfill.py aplicacoes/perfis)
+    # ficam fora da unicidade, e o build não falha por causa delas. Igualdade nos dois campos
+    # implica $exists, então o planner usa o índice para a candidatura única; as consultas só
+    # por vaga_id (painel, contagens ao vivo) não casam com o filtro e usam aplicacoes_por_vaga.
+    ("aplicacoes", "aplicacoes_vaga_candidato", [("vaga_id", 1), ("candidato_id", 1)],
+     {"unique": True, "partialFilterExpression": {"vaga_id": {"$exists": True}, "candidato_id": {"$exists": True}}}),
+    ("aplicacoes", "aplicacoes_por_vaga", [("vaga_id", 1)], {}),
+    ("aplicacoes", "aplicacoes_por_data", [("data_aplicacao", -1)], {}),
+    ("usuarios", "usuarios_username", [("username", 1)], {"unique": True}),
+    # Tokens de logout saem sozinhos quando expirariam de qualquer forma.
+    ("tokens_revogados", "tokens_revogados_expiracao", [("expira_em", 1)], {"expireAfterSeconds": 0}),
+    ("matches", "matches_por_origem", [("origem", 1), ("origem_id", 1)], {"unique": True}),
+    ("stats_vagas", "stats_vagas_por_total", [("total", -1)], {}),
+]
+
+# Formatos das consultas do app, com valores de exemplo, para o modo --explain:
+# (descrição, coleção, filtro, ordenação).
+_ID_EXEMPLO = ObjectId()
+
+CONSULTAS = [
+    ("Feed: primeira página", "vagas", {}, ORDENACAO_FEED),
+    ("Feed: página seguinte", "vagas", filtro_apos_cursor((_ID_EXEMPLO.generation_time, _ID_EXEMPLO)), ORDENACAO_FEED),
+    ("Feed: filtro por tipo e senioridade", "vagas", filtro_facetas([("tipo", "Remoto"), ("senioridade", "Pleno")]), ORDENACAO_FEED),
+    ("Feed: filtro por senioridade", "vagas", filtro_facetas([("senioridade", "Pleno")]), ORDENACAO_FEED),
+    ("Feed: filtro por cidade", "vagas", filtro_facetas([("cidade", "sao paulo")]), ORDENACAO_FEED),
+    ("Feed: filtro por empresa", "vagas", filtro_facetas([("empresa", "exemplo")]), ORDENACAO_FEED),
+    ("Feed: salário mínimo", "vagas", filtro_salario(5000), ORDENACAO_FEED),
+    ("Feed: maior salário", "vagas", filtro_salario(5000), ORDENACAO_SALARIO),
+    ("Feed: maior salário, página seguinte", "vagas",
+     {"$and": [filtro_salario(5000), filtro_apos_cursor((9000.0, _ID_EXEMPLO), "salario_max")]}, ORDENACAO_SALARIO),
+    ("Painel do empregador", "vagas", {"$or": [{"criado_por": "exemplo"}, {"empresa": "exemplo"}]}, [("data_criacao", -1)]),
+    ("Busca textual de vagas", "vagas", {"$text": {"$search": "python"}}, None),
+    ("Importação: upsert de vaga", "vagas", {"origem_importacao": "arquivo.csv#0"}, None),
+    ("Perfil do candidato", "candidatos", {"usuario_id": _ID_EXEMPLO}, None),
+    ("Busca textual de candidatos", "candidatos", {"$text": {"$search": "python"}}, None),
+    ("Candidaturas de uma vaga", "aplicacoes", {"vaga_id": _ID_EXEMPLO}, None),
+    ("Ao vivo: contagem por vaga", "aplicacoes", {"vaga_id": {"$in": [_ID_EXEMPLO]}}, None),
+    ("Candidatura única", "aplicacoes", {"vaga_id": _ID_EXEMPLO, "candidato_id": _ID_EXEMPLO}, None),
+    ("Ao vivo: polling de candidaturas", "aplicacoes", {"data_aplicacao": {"$gt": _ID_EXEMPLO.generation_time}}, None),
+    ("Login", "usuarios", {"username": "exemplo"}, None),
+    ("Recomendações", "matches", {"origem": "vaga", "origem_id": {"$in": [_ID_EXEMPLO]}}, None),
+]
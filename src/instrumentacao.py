@@ -0,0 +1,293 @@
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import bson
+from pymongo import monitoring
+
+AMOSTRAS_POR_CHAVE = 1024
+RERUNS_POR_PAGINA = 200
+MAX_LENTAS = 100
+LIMITE_LENTO_MS = 100
+TAMANHO_RESUMO_COMANDO = 300
+
+COMANDOS_IGNORADOS = {"ping", "hello", "ismaster", "isMaster", "buildInfo", "endSessions", "saslStart", "saslContinue"}
+# Arquivos do próprio acesso ao banco: a origem de um comando é o primeiro quadro fora deles.
+ARQUIVOS_INFRA = {"db.py", "db_async.py", "cache.py", "instrumentacao.py"}
+DIRETORIO_APP = os.path.dirname(os.path.abspath(__file__))
+
+log = logging.getLogger("portal_vagas.mongo")
+
+
+def _configuracao():
+    try:
+        import streamlit as st
+
+        return dict(st.secrets.get("instrumentacao", {}))
+    except Exception:
+        return {}
+
+
+_rerun_atual = contextvars.ContextVar("rerun_atual", default=None)
+_origens = {}
+
+
+def _novo_rerun(pagina):
+    return {"pagina": pagina, "inicio": time.perf_counter(), "fim": None, "ultimo_comando": None,
+            "comandos": 0, "tempo_mongo_ms": 0.0}
+
+
+def _origem():
+    # Sobe a pilha até o primeiro quadro do app que não seja infraestrutura de banco.
+    # O rótulo é guardado por code object, então cada origem só é calculada uma vez.
+    quadro = sys._getframe(2)
+    while quadro is not None:
+        codigo = quadro.f_code
+        rotulo = _origens.get(codigo)
+        if rotulo is None:
+            arquivo = os.path.abspath(codigo.co_filename)
+            if arquivo.startswith(DIRETORIO_APP) and os.path.basename(arquivo) not in ARQUIVOS_INFRA:
+                rotulo = f"{os.path.relpath(arquivo, DIRETORIO_APP)}:{codigo.co_qualname}"
+            else:
+                rotulo = ""
+            _origens[codigo] = rotulo
+        if rotulo:
+            return rotulo
+        quadro = quadro.f_back
+    return threading.current_thread().name
+
+
+def _resumo(comando):
+    partes = {chave: comando[chave] for chave in ("filter", "pipeline", "sort", "q", "query") if chave in comando}
+    texto = json.dumps(partes, default=str, ensure_ascii=False)
+    return texto if len(texto) <= TAMANHO_RESUMO_COMANDO else texto[:TAMANHO_RESUMO_COMANDO] + "…"
+
+
+def _documentos(resposta):
+    cursor = resposta.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    return resposta.get("n", 0)
+
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))]
+
+
+class MonitorComandos(monitoring.CommandListener):
+    # Latência, documentos e bytes de cada comando, agrupados por (página, origem, comando,
+    # coleção). Guarda uma janela com as últimas AMOSTRAS_POR_CHAVE latências de cada grupo,
+    # de onde saem p50/p95/p99, e registra no log os comandos acima do limite de lentidão.
+
+    def __init__(self, limite_lento_ms=LIMITE_LENTO_MS, medir_bytes=True):
+        self.limite_lento_ms = limite_lento_ms
+        self.medir_bytes = medir_bytes
+        self._lock = threading.Lock()
+        self._pendentes = {}
+        self._grupos = {}
+        self._lentas = deque(maxlen=MAX_LENTAS)
+        self._reruns = {}
+        self._inicio = time.time()
+
+    def started(self, event):
+        if event.command_name in COMANDOS_IGNORADOS:
+            return
+        colecao = event.command.get(event.command_name)
+        if not isinstance(colecao, str):
+            colecao = event.command.get("collection", "")
+        rerun = _rerun_atual.get()
+        self._pendentes[(event.request_id, event.connection_id)] = (
+            rerun,
+            rerun["pagina"] if rerun else "(segundo plano)",
+            _origem(),
+            colecao,
+            _resumo(event.command),
+        )
+
+    def succeeded(self, event):
+        self._concluir(event, event.reply, falhou=False)
+
+    def failed(self, event):
+        self._concluir(event, {}, falhou=True)
+
+    def _concluir(self, event, resposta, falhou):
+        pendente = self._pendentes.pop((event.request_id, event.connection_id), None)
+        if pendente is None:
+            return
+        rerun, pagina, origem, colecao, resumo = pendente
+        duracao_ms = event.duration_micros / 1000
+        documentos = _documentos(resposta)
+        tamanho = len(bson.encode(resposta)) if self.medir_bytes and resposta else 0
+
+        with self._lock:
+            grupo = self._grupos.setdefault((pagina, origem, event.command_name, colecao), {
+                "chamadas": 0, "falhas": 0, "tempo_total_ms": 0.0, "documentos": 0, "bytes": 0,
+                "latencias": deque(maxlen=AMOSTRAS_POR_CHAVE),
+            })
+            grupo["chamadas"] += 1
+            grupo["falhas"] += falhou
+            grupo["tempo_total_ms"] += duracao_ms
+            grupo["documentos"] += documentos
+            grupo["bytes"] += tamanho
+            grupo["latencias"].append(duracao_ms)
+            if rerun is not None:
+                rerun["comandos"] += 1
+                rerun["tempo_mongo_ms"] += duracao_ms
+                rerun["ultimo_comando"] = time.perf_counter()
+
+        if duracao_ms >= self.limite_lento_ms:
+            lenta = {
+                "quando": time.time(), "pagina": pagina, "origem": origem, "comando": event.command_name,
+                "colecao": colecao, "duracao_ms": round(duracao_ms, 2), "documentos": documentos, "resumo": resumo,
+            }
+            self._lentas.append(lenta)
+            log.warning("Consulta lenta (%.0f ms) %s.%s em %s: %s", duracao_ms, colecao, event.command_name, origem, resumo)
+
+    def iniciar_rerun(self, pagina):
+        # Fecha a execução anterior desta thread e abre uma nova; os comandos emitidos até a
+        # próxima chamada somam no custo dela.
+        anterior = _rerun_atual.get()
+        if anterior is not None:
+            self._fechar_rerun(anterior)
+        _rerun_atual.set(_novo_rerun(pagina))
+
+    def finalizar_rerun(self):
+        # Chamado no fim do script: com ele a duração é exata; sem ele (st.stop, exceção),
+        # vale o tempo até o último comando.
+        rerun = _rerun_atual.get()
+        if rerun is not None:
+            rerun["fim"] = time.perf_counter()
+            self._fechar_rerun(rerun)
+            _rerun_atual.set(None)
+
+    @contextlib.contextmanager
+    def medir(self, pagina):
+        # Trecho que roda sozinho (st.fragment). Dentro do rerun da página inteira, o custo só
+        # soma no da página; rodando sozinho, vira uma execução própria com o rótulo dado.
+        externo = _rerun_atual.get()
+        rerun = _novo_rerun(pagina)
+        rerun["sozinho"] = externo is None
+        token = _rerun_atual.set(rerun)
+        try:
+            yield
+        finally:
+            _rerun_atual.reset(token)
+            rerun["fim"] = time.perf_counter()
+            if externo is None:
+                self._fechar_rerun(rerun)
+            else:
+                with self._lock:
+                    externo["comandos"] += rerun["comandos"]
+                    externo["tempo_mongo_ms"] += rerun["tempo_mongo_ms"]
+                    externo["ultimo_comando"] = rerun["ultimo_comando"] or externo["ultimo_comando"]
+
+    def _fechar_rerun(self, rerun):
+        with self._lock:
+            fim = rerun.get("fim") or rerun["ultimo_comando"] or rerun["inicio"]
+            self._reruns.setdefault(rerun["pagina"], deque(maxlen=RERUNS_POR_PAGINA)).append(
+                (rerun["comandos"], rerun["tempo_mongo_ms"], (fim - rerun["inicio"]) * 1000)
+            )
+
+    def consultas(self):
+        with self._lock:
+            grupos = [(chave, dict(grupo, latencias=sorted(grupo["latencias"]))) for chave, grupo in self._grupos.items()]
+        linhas = []
+        for (pagina, origem, comando, colecao), grupo in grupos:
+            latencias = grupo.pop("latencias")
+            linhas.append({
+                "pagina": pagina, "origem": origem, "comando": comando, "colecao": colecao, **grupo,
+                "p50_ms": _percentil(latencias, 50), "p95_ms": _percentil(latencias, 95), "p99_ms": _percentil(latencias, 99),
+            })
+        return sorted(linhas, key=lambda linha: linha["tempo_total_ms"], reverse=True)
+
+    def reruns(self):
+        with self._lock:
+            por_pagina = {pagina: list(execucoes) for pagina, execucoes in self._reruns.items()}
+        linhas = []
+        for pagina, execucoes in por_pagina.items():
+            tempos = sorted(tempo for _, tempo, _ in execucoes)
+            duracoes = sorted(duracao for _, _, duracao in execucoes)
+            linhas.append({
+                "pagina": pagina,
+                "reruns": len(execucoes),
+                "comandos_por_rerun": sum(c for c, _, _ in execucoes) / len(execucoes),
+                "mongo_ms_medio": sum(tempos) / len(tempos),
+                "mongo_ms_p95": _percentil(tempos, 95),
+                "duracao_ms_medio": sum(duracoes) / len(duracoes),
+                "duracao_ms_p95": _percentil(duracoes, 95),
+            })
+        return sorted(linhas, key=lambda linha: linha["pagina"])
+
+    def lentas(self):
+        with self._lock:
+            return list(self._lentas)[::-1]
+
+    def exportar(self):
+        return {
+            "desde": self._inicio,
+            "exportado_em": time.time(),
+            "limite_lento_ms": self.limite_lento_ms,
+            "consultas": self.consultas(),
+            "reruns": self.reruns(),
+            "lentas": self.lentas(),
+        }
+
+    def limpar(self):
+        with self._lock:
+            self._grupos.clear()
+            self._lentas.clear()
+            self._reruns.clear()
+            self._inicio = time.time()
+
+
+_config = _configuracao()
+monitor_comandos = MonitorComandos(
+    limite_lento_ms=float(_config.get("limite_lento_ms", LIMITE_LENTO_MS)),
+    medir_bytes=bool(_config.get("medir_bytes", True)),
+)
+
+
+def iniciar_rerun(pagina):
+    monitor_comandos.iniciar_rerun(pagina)
+
+
+def finalizar_rerun():
+    monitor_comandos.finalizar_rerun()
+
+
+def medir_rerun(pagina):
+    # Para funções com @st.fragment: cada rerun isolado do fragmento é medido à parte.
+    def decorador(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with monitor_comandos.medir(pagina):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorador
+
+
+def rerun_atual():
+    return _rerun_atual.get()
+
+
+def rerun_completo():
+    # Verdadeiro no rerun da página inteira (inclusive dentro dos fragmentos que ele desenha);
+    # falso quando um fragmento medido por medir_rerun roda sozinho.
+    rerun = _rerun_atual.get()
+    return rerun is not None and not rerun.get("sozinho", False)
+
+
+def definir_rerun(rerun):
+    # Leva a execução da página para outra thread/tarefa (ex.: o loop do cliente assíncrono).
+    _rerun_atual.set(rerun)
@@ -0,0 +1,167 @@
+import argparse
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+from pymongo import ReplaceOne
+from scipy import sparse
+
+from texto import tokenizar
+
+TOP_K_PADRAO = 10
+TAMANHO_BLOCO_PADRAO = 1024
+TAMANHO_LOTE_ESCRITA = 1000
+
+CAMPOS_CANDIDATO = {"skills": 2.0, "resumo": 1.0}
+CAMPOS_VAGA = {"requisitos": 2.0, "descricao": 1.0}
+
+# O que vai junto de cada recomendação, para as páginas exibirem sem consultar outra coleção.
+ROTULOS = {
+    "vagas": ["titulo", "empresa"],
+    "candidatos": ["nome", "skills"],
+}
+
+
+def _frequencias(documento, campos):
+    frequencias = Counter()
+    for campo, peso in campos.items():
+        for termo in tokenizar(documento.get(campo, "")):
+            frequencias[termo] += peso
+    return frequencias
+
+
+def _matriz(frequencias_docs, vocabulario):
+    linhas, colunas, valores = [], [], []
+    for linha, frequencias in enumerate(frequencias_docs):
+        for termo, tf in frequencias.items():
+            coluna = vocabulario.get(termo)
+            if coluna is not None:
+                linhas.append(linha)
+                colunas.append(coluna)
+                valores.append(tf)
+    return sparse.csr_matrix(
+        (np.array(valores, dtype=np.float32), (linhas, colunas)),
+        shape=(len(frequencias_docs), len(vocabulario)),
+    )
+
+
+def _tfidf(matriz, idf):
+    # tf sublinear * idf, com linhas normalizadas (L2): o produto escalar vira similaridade do cosseno.
+    matriz = matriz.copy()
+    matriz.data = np.log1p(matriz.data)
+    matriz = matriz @ sparse.diags(idf)
+    normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+    normas[normas == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / normas) @ matriz, dtype=np.float32)
+
+
+def construir_matrizes(vagas, candidatos):
+    freq_vagas = [_frequencias(v, CAMPOS_VAGA) for v in vagas]
+    freq_candidatos = [_frequencias(c, CAMPOS_CANDIDATO) for c in candidatos]
+
+    # Só interessam termos que aparecem dos dois lados: os demais nunca contribuem para o produto.
+    termos_vagas = set().union(*freq_vagas) if freq_vagas else set()
+    termos_candidatos = set().union(*freq_candidatos) if freq_candidatos else set()
+    vocabulario = {termo: i for i, termo in enumerate(sorted(termos_vagas & termos_candidatos))}
+
+    m_vagas = _matriz(freq_vagas, vocabulario)
+    m_candidatos = _matriz(freq_candidatos, vocabulario)
+
+    total_docs = m_vagas.shape[0] + m_candidatos.shape[0]
+    df = np.bincount(m_vagas.indices, minlength=len(vocabulario)) + np.bincount(m_candidatos.indices, minlength=len(vocabulario))
+    idf = (np.log((1 + total_docs) / (1 + df)) + 1).astype(np.float32)
+
+    return _tfidf(m_vagas, idf), _tfidf(m_candidatos, idf)
+
+
+def top_k_em_blocos(origem, destino, k=TOP_K_PADRAO, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    # Um produto esparso por bloco de linhas: a memória fica limitada ao bloco, não a origem x destino.
+    destino_t = destino.T.tocsc()
+    for inicio in range(0, origem.shape[0], tamanho_bloco):
+        similaridades = (origem[inicio:inicio + tamanho_bloco] @ destino_t).tocsr()
+        for deslocamento in range(similaridades.shape[0]):
+            ini, fim = similaridades.indptr[deslocamento], similaridades.indptr[deslocamento + 1]
+            scores = similaridades.data[ini:fim]
+            colunas = similaridades.indices[ini:fim]
+            if len(scores) > k:
+                melhores = np.argpartition(-scores, k)[:k]
+                scores, colunas = scores[melhores], colunas[melhores]
+            ordem = np.argsort(-scores)
+            yield inicio + deslocamento, list(zip(colunas[ordem].tolist(), scores[ordem].tolist()))
+
+
+def _documentos_matches(origem, docs_origem, docs_destino, colecao_destino, pares, atualizado_em):
+    for linha, melhores in pares:
+        yield {
+            "origem": origem,
+            "origem_id": docs_origem[linha]["_id"],
+            "resultados": [
+                {
+                    "id": docs_destino[coluna]["_id"],
+                    "score": round(score, 4),
+                    **{campo: docs_destino[coluna].get(campo) for campo in ROTULOS[colecao_destino]},
+                }
+                for coluna, score in melhores
+            ],
+            "atualizado_em": atualizado_em,
+        }
+
+
+def _gravar_matches(db, documentos):
+    total = 0
+    lote = []
+    for documento in documentos:
+        filtro = {"origem": documento["origem"], "origem_id": documento["origem_id"]}
+        lote.append(ReplaceOne(filtro, documento, upsert=True))
+        if len(lote) >= TAMANHO_LOTE_ESCRITA:
+            db.matches.bulk_write(lote, ordered=False)
+            total += len(lote)
+            lote = []
+    if lote:
+        db.matches.bulk_write(lote, ordered=False)
+        total += len(lote)
+    return total
+
+
+def calcular_matches(db, k=TOP_K_PADRAO, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    inicio = datetime.now()
+    vagas = list(db.vagas.find({}, {campo: 1 for campo in [*CAMPOS_VAGA, *ROTULOS["vagas"]]}))
+    candidatos = list(db.candidatos.find({}, {campo: 1 for campo in [*CAMPOS_CANDIDATO, *ROTULOS["candidatos"]]}))
+    if not vagas or not candidatos:
+        return {"vagas": 0, "candidatos": 0}
+
+    m_vagas, m_candidatos = construir_matrizes(vagas, candidatos)
+
+    gravadas_vagas = _gravar_matches(db, _documentos_matches(
+        "vaga", vagas, candidatos, "candidatos",
+        top_k_em_blocos(m_vagas, m_candidatos, k, tamanho_bloco), inicio,
+    ))
+    gravados_candidatos = _gravar_matches(db, _documentos_matches(
+        "candidato", candidatos, vagas, "vagas",
+        top_k_em_blocos(m_candidatos, m_vagas, k, tamanho_bloco), inicio,
+    ))
+
+    # Remove rankings de documentos que não existem mais.
+    db.matches.delete_many({"atualizado_em": {"$lt": inicio}})
+    return {"vagas": gravadas_vagas, "candidatos": gravados_candidatos}
+
+
+if __name__ == "__main__":
+    from db import get_database
+
+    parser = argparse.ArgumentParser(description="Calcula os melhores matches entre todas as vagas e todos os candidatos.")
+    parser.add_argument("--top-k", type=int, default=TOP_K_PADRAO)
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO)
+    args = parser.parse_args()
+
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+    else:
+        inicio = time.perf_counter()
+        totais = calcular_matches(db, args.top_k, args.bloco)
+        print(
+            f"✅ Matches gravados: {totais['vagas']} vaga(s) e {totais['candidatos']} candidato(s) "
+            f"em {time.perf_counter() - inicio:.1f} s."
+        )
@@ -3,14 +3,29 @@ from datetime import datetime
 
 try:
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun
+    from auth import sessao_atual, id_usuario
+    from cache import registrar_escrita
+    from estatisticas import registrar_candidato
+    from consultas import carregar_recomendacoes
+    from autocompletar import sugerir, LIMITE_OPCOES
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun
+    from auth import sessao_atual, id_usuario
+    from cache import registrar_escrita
+    from estatisticas import registrar_candidato
+    from consultas import carregar_recomendacoes
+    from autocompletar import sugerir, LIMITE_OPCOES
 
 st.set_page_config(page_title="Meu Currículo", page_icon="👤")
 
+iniciar_rerun("Candidato")
+sessao = sessao_atual(st.session_state, get_database())
+
 if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.warning("⚠️ Você precisa fazer login para acessar essa página.")
     st.stop()
@@ -24,9 +39,19 @@ st.markdown("Mantenha seus dados atualizados para aplicar às vagas.")
 
 db = get_database()
 dados_existentes = {}
+# O perfil é do login, não do nome: leitura pontual pelo índice único de usuario_id.
+filtro_perfil = {"usuario_id": id_usuario(sessao)}
 
 if db is not None:
-    dados_existentes = db.candidatos.find_one({"nome": st.session_state["user_name"]}) or {}
+    dados_existentes = db.candidatos.find_one(filtro_perfil) or {}
+
+if db is not None and "_id" in dados_existentes:
+    id_perfil = dados_existentes["_id"]
+    vagas_recomendadas = carregar_recomendacoes(db, "candidato", (id_perfil,)).get(id_perfil, [])
+    if vagas_recomendadas:
+        with st.expander(f"⭐ {len(vagas_recomendadas)} Vaga(s) Recomendada(s) para Você", expanded=True):
+            for rec in vagas_recomendadas:
+                st.markdown(f"**💼 {rec.get('titulo')}** — 🏢 {rec.get('empresa')} | compatibilidade {rec.get('score', 0):.0%}")
 
 
 with st.form("form_candidato"):
@@ -65,10 +90,14 @@ with st.form("form_candidato"):
     skills = st.text_area("Habilidades e Tecnologias", 
                          value=dados_existentes.get("skills", ""),
                          placeholder="Ex: Python, Excel, Vendas, Liderança...")
+    skills_sugeridas = st.multiselect("➕ Adicionar habilidades sugeridas",
+                                      sugerir(db, "skills", k=LIMITE_OPCOES) if db is not None else [],
+                                      accept_new_options=True, placeholder="Digite para ver sugestões")
 
     submitted = st.form_submit_button("💾 Salvar / Atualizar Currículo")
 
     if submitted:
+        skills = ", ".join(filter(None, [skills.strip(), *skills_sugeridas]))
         if not nome or not skills or not resumo:
             st.warning("⚠️ Preencha pelo menos Nome, Resumo e Habilidades.")
         else:
@@ -82,17 +111,26 @@ with st.form("form_candidato"):
                     "experiencia": experiencia,
                     "skills": skills,
                     "data_atualizacao": datetime.now(),
-                    "username_vinculo": st.session_state.get("user_name") 
+                    "usuario_id": filtro_perfil["usuario_id"],
+                    "username_vinculo": sessao["username"],
                 }
                 
                 try:
-                    db.candidatos.update_one(
-                        {"nome": nome}, 
+                    resultado = db.candidatos.update_one(
+                        filtro_perfil, 
                         {"$set": perfil_atualizado}, 
                         upsert=True
                     )
+                    if resultado.upserted_id is not None:
+                        perfil_atualizado["_id"] = resultado.upserted_id
+                        registrar_candidato(db)
+                    else:
+                        perfil_atualizado["_id"] = dados_existentes.get("_id") or db.candidatos.find_one(filtro_perfil, {"_id": 1})["_id"]
+                    registrar_escrita("candidatos", perfil_atualizado)
                     st.success("✅ Currículo salvo com sucesso! Agora você pode aplicar para as vagas na tela inicial.")
                 except Exception as e:
                     st.error(f"Erro ao salvar: {e}")
             else:
-                st.error("Erro de conexão com o banco.")
\ No newline at end of file
+                st.error("Erro de conexão com o banco.")
+
+finalizar_rerun()
@@ -4,14 +4,35 @@ from datetime import datetime
 
 try:
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun, medir_rerun
+    from auth import sessao_atual
+    from cache import registrar_escrita
+    from estatisticas import registrar_vaga
+    from geo import resolver_local
+    from salario import interpretar_salario
+    from consultas import carregar_painel_empregador, carregar_vaga_empregador, carregar_recomendacoes
+    from ao_vivo import obter_monitor
+    from autocompletar import sugerir, LIMITE_OPCOES
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun, medir_rerun
+    from auth import sessao_atual
+    from cache import registrar_escrita
+    from estatisticas import registrar_vaga
+    from geo import resolver_local
+    from salario import interpretar_salario
+    from consultas import carregar_painel_empregador, carregar_vaga_empregador, carregar_recomendacoes
+    from ao_vivo import obter_monitor
+    from autocompletar import sugerir, LIMITE_OPCOES
 
 st.set_page_config(page_title="Área do Empregador", page_icon="🏢")
 
+iniciar_rerun("Empregador")
+sessao_atual(st.session_state, get_database())
+
 if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.warning("⚠️ Você precisa fazer login para acessar essa página.")
     st.stop()
@@ -25,8 +46,15 @@ st.markdown(f"Bem-vindo, **{st.session_state['user_name']}**.")
 
 tab1, tab2 = st.tabs(["➕ Nova Vaga", "📋 Minhas Vagas & Candidatos"])
 
-with tab1:
-    st.markdown("### Cadastrar Nova Oportunidade")
+# O formulário e o painel de cada vaga são fragmentos: publicar uma vaga ou atualizar uma
+# vaga não refaz a página inteira nem o painel das outras vagas.
+@st.fragment
+@medir_rerun("Empregador › nova vaga")
+def formulario_vaga():
+    # Termos já usados em outras vagas e currículos; o filtro por digitação roda no navegador.
+    db_sugestoes = get_database(somente_leitura=True)
+    locais_sugeridos = sugerir(db_sugestoes, "locais", k=LIMITE_OPCOES) if db_sugestoes is not None else []
+    skills_sugeridas = sugerir(db_sugestoes, "skills", k=LIMITE_OPCOES) if db_sugestoes is not None else []
     
     with st.form("form_vaga"):
         titulo = st.text_input("Título da Vaga*", placeholder="Ex: Desenvolvedor Full Stack Jr")
@@ -34,7 +62,8 @@ with tab1:
         
         c1, c2 = st.columns(2)
         with c1:
-            local = st.text_input("Localização*", placeholder="Ex: Remoto, São Paulo - SP")
+            local = st.selectbox("Localização*", locais_sugeridos, index=None, accept_new_options=True,
+                                 placeholder="Ex: Remoto, São Paulo - SP")
             tipo = st.selectbox("Modelo", ["Remoto", "Híbrido", "Presencial"])
         with c2:
             salario = st.text_input("Faixa Salarial", placeholder="Ex: R$ 5.000 - R$ 7.000")
@@ -42,6 +71,8 @@ with tab1:
         
         descricao = st.text_area("Descrição da Vaga*", height=150)
         requisitos = st.text_area("Requisitos e Tecnologias*", placeholder="Ex: Python, Django, SQL, Inglês Avançado")
+        requisitos_sugeridos = st.multiselect("➕ Adicionar requisitos sugeridos", skills_sugeridas, accept_new_options=True,
+                                              placeholder="Digite para ver sugestões")
         
         submitted = st.form_submit_button("📢 Publicar Vaga")
         
@@ -51,12 +82,16 @@ with tab1:
             else:
                 db = get_database()
                 if db is not None:
+                    local = local or ""
+                    requisitos = ", ".join(filter(None, [requisitos.strip(), *requisitos_sugeridos]))
                     nova_vaga = {
                         "titulo": titulo,
                         "empresa": empresa,
                         "local": local,
+                        "geo": resolver_local(local),
                         "tipo": tipo,
                         "salario": salario,
+                        **interpretar_salario(salario),
                         "senioridade": senioridade,
                         "descricao": descricao,
                         "requisitos": requisitos,
@@ -65,78 +100,109 @@ with tab1:
                     }
                     try:
                         db.vagas.insert_one(nova_vaga)
+                        registrar_escrita("vagas", nova_vaga)
+                        registrar_vaga(db, nova_vaga)
+                        # O painel de vagas se atualiza sozinho e já traz a nova vaga.
                         st.success(f"Vaga **{titulo}** publicada com sucesso!")
-                        st.rerun() 
                     except Exception as e:
                         st.error(f"Erro ao salvar: {e}")
 
-with tab2:
-    st.markdown("### Suas Vagas Publicadas")
-    
-    if st.button("🔄 Atualizar Painel"):
-        st.rerun()
+with tab1:
+    st.markdown("### Cadastrar Nova Oportunidade")
+    formulario_vaga()
+
+INTERVALO_PAINEL = 10
+
+def pedir_atualizacao(id_vaga):
+    st.session_state[f"atualizar_vaga_{id_vaga}"] = True
+
+@st.fragment
+@medir_rerun("Empregador › vaga")
+def painel_vaga(vaga, novas, recomendados):
+    id_vaga = vaga["_id"]
+    if st.session_state.pop(f"atualizar_vaga_{id_vaga}", False):
+        # Rerun só deste painel: relê esta vaga direto do banco, sem o cache, para a lista
+        # trazer as candidaturas que o monitor já contou.
+        db = get_database()
+        if db is not None:
+            vaga = carregar_vaga_empregador.__wrapped__(db, st.session_state["user_name"], id_vaga) or vaga
+            novas = 0
+    # Contagem e currículos saem da mesma agregação; o monitor só avisa do que ainda não chegou nela.
+    qtd_candidatos = vaga.get("qtd_candidatos", 0)
+
+    with st.container(border=True):
+        col_info, col_status = st.columns([3, 1])
+        
+        with col_info:
+            st.subheader(vaga.get('titulo', 'Sem Título'))
+            st.markdown(f"📍 **Local:** {vaga.get('local')} | 💰 **Salário:** {vaga.get('salario')}")
+            st.caption(f"Publicado em: {vaga.get('data_criacao', datetime.now()).strftime('%d/%m/%Y')}")
+            st.markdown(f"**Descrição:**\n {vaga.get('descricao')}")
+            st.markdown(f"**Requisitos:**\n {vaga.get('requisitos')}")
         
+        candidaturas = vaga.get("candidaturas", [])
+
+        with col_status:
+            st.metric("Candidatos", qtd_candidatos, delta=f"+{novas} nova(s)" if novas else None)
+            st.button("🔄 Atualizar", key=f"btn_atualizar_{id_vaga}", on_click=pedir_atualizacao, args=(id_vaga,))
+
+        if qtd_candidatos > 0:
+            with st.expander(f"👥 Ver {qtd_candidatos} Currículo(s) Recebido(s)"):
+                for cand in candidaturas:
+                    nome_candidato = cand.get("candidato_username")
+                    perfil = cand.get("perfil")
+                    
+                    st.markdown("---")
+                    if perfil:
+                        c1, c2 = st.columns([3, 1])
+                        with c1:
+                            st.markdown(f"**👤 {perfil.get('nome')}**")
+                            st.write(f"🎓 {perfil.get('formacao')} | 🗣️ {perfil.get('idiomas')}")
+                            st.write(f"🛠️ **Skills:** {perfil.get('skills')}")
+                            st.caption(f"📝 **Resumo:** {perfil.get('resumo')}")
+                        with c2:
+                            data_app = cand.get('data_aplicacao')
+                            if isinstance(data_app, datetime):
+                                st.caption(f"Aplicou: {data_app.strftime('%d/%m')}")
+                    else:
+                        st.write(f"Usuário: {nome_candidato} (Perfil não preenchido)")
+        else:
+            st.caption("🚫 Nenhum candidato aplicou para esta vaga ainda.")
+
+        if recomendados:
+            with st.expander(f"⭐ {len(recomendados)} Candidato(s) Recomendado(s)"):
+                for rec in recomendados:
+                    st.markdown(f"**👤 {rec.get('nome')}** — compatibilidade {rec.get('score', 0):.0%}")
+                    st.caption(f"🛠️ {rec.get('skills')}")
+
+@st.fragment(run_every=INTERVALO_PAINEL)
+@medir_rerun("Empregador › painel")
+def painel_vagas():
+    # Roda sozinho a cada intervalo. O painel vem do cache, que o monitor ao vivo invalida
+    # quando chega candidatura nova; o snapshot em memória aponta as que o cache ainda não tem.
     db = get_database()
     if db is not None:
         usuario_atual = st.session_state["user_name"]
-        
-        filtro = {
-            "$or": [
-                {"criado_por": usuario_atual},
-                {"empresa": usuario_atual}
-            ]
-        }
-        minhas_vagas = list(db.vagas.find(filtro, {"_id": 0}).sort("data_criacao", -1))
+        minhas_vagas = carregar_painel_empregador(db, usuario_atual)
+        contagens = obter_monitor(db).contagens([v["_id"] for v in minhas_vagas])
+        recomendacoes = carregar_recomendacoes(db, "vaga", tuple(v["_id"] for v in minhas_vagas))
         
         if len(minhas_vagas) > 0:
             st.info(f"Você tem {len(minhas_vagas)} vagas ativas.")
             
-            for i, vaga in enumerate(minhas_vagas):
-                with st.container(border=True):
-                    col_info, col_status = st.columns([3, 1])
-                    
-                    with col_info:
-                        st.subheader(vaga.get('titulo', 'Sem Título'))
-                        st.markdown(f"📍 **Local:** {vaga.get('local')} | 💰 **Salário:** {vaga.get('salario')}")
-                        st.caption(f"Publicado em: {vaga.get('data_criacao', datetime.now()).strftime('%d/%m/%Y')}")
-                        st.markdown(f"**Descrição:**\n {vaga.get('descricao')}")
-                        st.markdown(f"**Requisitos:**\n {vaga.get('requisitos')}")
-                    
-                    candidaturas = list(db.aplicacoes.find({
-                        "vaga_titulo": vaga.get('titulo'),
-                        "empresa_vaga": vaga.get('empresa')
-                    }))
-                    qtd_candidatos = len(candidaturas)
-
-                    with col_status:
-                        st.metric("Candidatos", qtd_candidatos)
-
-                    if qtd_candidatos > 0:
-                        with st.expander(f"👥 Ver {qtd_candidatos} Currículo(s) Recebido(s)"):
-                            for cand in candidaturas:
-                                nome_candidato = cand.get("candidato_username")
-                                
-                                perfil = db.candidatos.find_one({"username_vinculo": nome_candidato})
-                                if not perfil:
-                                    perfil = db.candidatos.find_one({"nome": nome_candidato})
-                                
-                                st.markdown("---")
-                                if perfil:
-                                    c1, c2 = st.columns([3, 1])
-                                    with c1:
-                                        st.markdown(f"**👤 {perfil.get('nome')}**")
-                                        st.write(f"🎓 {perfil.get('formacao')} | 🗣️ {perfil.get('idiomas')}")
-                                        st.write(f"🛠️ **Skills:** {perfil.get('skills')}")
-                                        st.caption(f"📝 **Resumo:** {perfil.get('resumo')}")
-                                    with c2:
-                                        data_app = cand.get('data_aplicacao')
-                                        if isinstance(data_app, datetime):
-                                            st.caption(f"Aplicou: {data_app.strftime('%d/%m')}")
-                                else:
-                                    st.write(f"Usuário: {nome_candidato} (Perfil não preenchido)")
-                    else:
-                        st.caption("🚫 Nenhum candidato aplicou para esta vaga ainda.")
+            for vaga in minhas_vagas:
+                painel_vaga(
+                    vaga,
+                    max(0, contagens.get(vaga["_id"], 0) - vaga.get("qtd_candidatos", 0)),
+                    recomendacoes.get(vaga["_id"], []),
+                )
 
         else:
             st.warning("Você ainda não publicou nenhuma vaga.")
-            st.write("Use a aba 'Nova Vaga' para começar.")
\ No newline at end of file
+            st.write("Use a aba 'Nova Vaga' para começar.")
+
+with tab2:
+    st.markdown("### Suas Vagas Publicadas")
+    painel_vagas()
+
+finalizar_rerun()
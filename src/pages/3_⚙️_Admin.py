@@ -2,17 +2,53 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import plotly.express as px
+import math
+import os
+import tempfile
+import json
 
 try:
-    from db import get_database
+    from db import get_database, estatisticas_pool
+    from instrumentacao import iniciar_rerun, finalizar_rerun, medir_rerun, rerun_completo, monitor_comandos
+    from auth import sessao_atual, cadastrar_usuario
+    from cache import registrar_escrita, estatisticas_cache
+    from tabelas import (
+        carregar_pagina_tabela, carregar_pagina_tabela_async,
+        COLUNAS_TABELA, EXPORTADORES, TAMANHO_PAGINA_TABELA,
+    )
+    from db_async import executar
+    from estatisticas import (
+        carregar_estatisticas, carregar_estatisticas_async, recalcular_estatisticas,
+        carregar_mais_procuradas, carregar_mais_procuradas_async,
+        registrar_usuario, registrar_vaga, registrar_candidato,
+    )
+    from geo import resolver_local
+    from salario import interpretar_salario
 except ImportError:
     import sys
-    import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from db import get_database
+    from db import get_database, estatisticas_pool
+    from instrumentacao import iniciar_rerun, finalizar_rerun, medir_rerun, rerun_completo, monitor_comandos
+    from auth import sessao_atual, cadastrar_usuario
+    from cache import registrar_escrita, estatisticas_cache
+    from tabelas import (
+        carregar_pagina_tabela, carregar_pagina_tabela_async,
+        COLUNAS_TABELA, EXPORTADORES, TAMANHO_PAGINA_TABELA,
+    )
+    from db_async import executar
+    from estatisticas import (
+        carregar_estatisticas, carregar_estatisticas_async, recalcular_estatisticas,
+        carregar_mais_procuradas, carregar_mais_procuradas_async,
+        registrar_usuario, registrar_vaga, registrar_candidato,
+    )
+    from geo import resolver_local
+    from salario import interpretar_salario
 
 st.set_page_config(page_title="Painel Administrativo", page_icon="⚙️", layout="wide")
 
+iniciar_rerun("Admin")
+sessao_atual(st.session_state, get_database())
+
 if "logged_in" not in st.session_state or st.session_state["user_role"] != "admin":
     st.warning("🔒 Acesso restrito para Administradores.")
     st.stop()
@@ -25,35 +61,193 @@ if db is None:
     st.error("Erro de conexão com o banco.")
     st.stop()
 
-tab_dash, tab_users, tab_vagas, tab_candidatos = st.tabs([
+def parametros_tabela(colecao):
+    # Valores atuais dos filtros da grade (os mesmos padrões dos widgets na primeira execução),
+    # lidos antes de desenhar as abas para que todas as consultas saiam juntas.
+    colunas = COLUNAS_TABELA[colecao]
+    return {
+        "pagina": st.session_state.get(f"{colecao}_pagina", 1) - 1,
+        "ordenar_por": st.session_state.get(f"{colecao}_ordenar_por", colunas[0]),
+        "decrescente": st.session_state.get(f"{colecao}_desc", False),
+        "coluna_filtro": st.session_state.get(f"{colecao}_coluna_filtro", colunas[0]),
+        "termo": st.session_state.get(f"{colecao}_termo", ""),
+    }
+
+def exibir_tabela(colecao, pre_carregada=None):
+    colunas = COLUNAS_TABELA[colecao]
+
+    f1, f2, f3, f4 = st.columns([2, 3, 2, 1])
+    coluna_filtro = f1.selectbox("Filtrar por", colunas, key=f"{colecao}_coluna_filtro")
+    termo = f2.text_input("Contém", key=f"{colecao}_termo")
+    ordenar_por = f3.selectbox("Ordenar por", colunas, key=f"{colecao}_ordenar_por")
+    decrescente = f4.toggle("Desc.", key=f"{colecao}_desc")
+
+    chave_pagina = f"{colecao}_pagina"
+    pagina = st.session_state.get(chave_pagina, 1)
+
+    def carregar(pagina):
+        return carregar_pagina_tabela(
+            db, colecao,
+            pagina=pagina - 1,
+            ordenar_por=ordenar_por,
+            decrescente=decrescente,
+            coluna_filtro=coluna_filtro,
+            termo=termo,
+        )
+
+    df, total = pre_carregada if pre_carregada is not None else carregar(pagina)
+    total_paginas = max(1, math.ceil(total / TAMANHO_PAGINA_TABELA))
+    if pagina > total_paginas:
+        # O filtro mudou e a página atual deixou de existir
+        pagina = total_paginas
+        st.session_state[chave_pagina] = pagina
+        df, total = carregar(pagina)
+
+    if df.empty:
+        st.info("Nenhum registro encontrado.")
+    else:
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    p1, p2 = st.columns([1, 3])
+    p1.number_input("Página", min_value=1, max_value=total_paginas, key=chave_pagina)
+    p2.caption(f"{total} registro(s) | {total_paginas} página(s) de até {TAMANHO_PAGINA_TABELA}")
+
+    with st.expander("📦 Exportar coleção completa"):
+        formato = st.radio("Formato", sorted(EXPORTADORES), horizontal=True, key=f"{colecao}_formato")
+        chave_arquivo = f"{colecao}_arquivo_exportado"
+        if st.button("Gerar arquivo", key=f"{colecao}_exportar"):
+            st.session_state.pop(chave_arquivo, None)
+            # O arquivo só existe enquanto é gerado: o download serve os bytes guardados na
+            # sessão, que somem com ela, e nada fica para trás no disco da réplica.
+            with tempfile.TemporaryDirectory() as diretorio:
+                caminho = os.path.join(diretorio, f"{colecao}.{formato}")
+                with st.spinner("Exportando em lotes..."):
+                    EXPORTADORES[formato](db, colecao, caminho)
+                with open(caminho, "rb") as arquivo:
+                    st.session_state[chave_arquivo] = (f"{colecao}.{formato}", arquivo.read())
+
+        exportado = st.session_state.get(chave_arquivo)
+        if exportado:
+            nome_arquivo, dados = exportado
+            st.download_button("⬇️ Baixar", data=dados, file_name=nome_arquivo, key=f"{colecao}_baixar")
+
+tab_dash, tab_users, tab_vagas, tab_candidatos, tab_perf = st.tabs([
     "📊 Visão Geral", 
     "🔑 Gerenciar Usuários", 
     "🏢 Gerenciar Vagas", 
-    "👥 Gerenciar Currículos"
+    "👥 Gerenciar Currículos",
+    "⏱️ Performance",
 ])
 
-with tab_dash:
+# As leituras independentes da página (estatísticas e a página atual de cada grade) saem
+# todas de uma vez pelo cliente assíncrono: o tempo total é o da mais lenta, não a soma.
+COLECOES_TABELAS = ["usuarios", "vagas", "candidatos"]
+try:
+    stats, mais_procuradas, *paginas_tabelas = executar(
+        (carregar_estatisticas_async,),
+        (carregar_mais_procuradas_async,),
+        *((carregar_pagina_tabela_async, colecao, parametros_tabela(colecao)) for colecao in COLECOES_TABELAS),
+    )
+except Exception:
+    # Sem o cliente assíncrono, cada aba faz a própria leitura síncrona.
+    stats, mais_procuradas, paginas_tabelas = None, None, [None] * len(COLECOES_TABELAS)
+pagina_usuarios, pagina_vagas, pagina_candidatos = paginas_tabelas
+
+def pre_carregado(valor):
+    # Cada aba é um fragmento e recebe o que foi lido junto com a página. Esses valores só
+    # valem no rerun completo: num rerun só da aba (filtro, paginação, formulário), o
+    # Streamlit repete os mesmos argumentos, então a aba lê os dados de novo.
+    return valor if rerun_completo() else None
+
+@st.fragment
+@medir_rerun("Admin › Visão Geral")
+def aba_visao_geral(stats, mais_procuradas):
     st.subheader("Indicadores de Performance")
     
-    total_vagas = db.vagas.count_documents({})
-    total_candidatos = db.candidatos.count_documents({})
-    total_users = db.usuarios.count_documents({})
+    stats = pre_carregado(stats) or carregar_estatisticas(db)
+    total_vagas = stats["vagas"]["total"]
+    total_candidatos = stats["candidatos"]["total"]
+    total_users = stats["usuarios"]["total"]
+    total_aplicacoes = stats["aplicacoes"]["total"]
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     col1.metric("Vagas Totais", total_vagas)
     col2.metric("Candidatos Totais", total_candidatos)
     col3.metric("Usuários do Sistema", total_users)
+    col4.metric("Candidaturas", total_aplicacoes)
+
+    c_atualizado, c_recalcular = st.columns([3, 1])
+    c_atualizado.caption(f"Estatísticas atualizadas em {stats['atualizado_em'].strftime('%d/%m/%Y %H:%M:%S')}")
+    # Callback: roda antes do rerun da aba, que já lê as estatísticas novas.
+    c_recalcular.button("🔄 Recalcular Estatísticas", on_click=recalcular_estatisticas, args=(db,))
     
     st.divider()
-    
-    vagas_dados = list(db.vagas.find({}, {"_id": 0, "tipo": 1}))
-    if vagas_dados:
-        df = pd.DataFrame(vagas_dados)
-        if "tipo" in df.columns:
-            fig = px.pie(df, names="tipo", title="Distribuição de Vagas por Modelo")
+
+    def grafico_contagem(contagens, rotulo):
+        return pd.DataFrame(list(contagens.items()), columns=[rotulo, "total"])
+
+    g1, g2 = st.columns(2)
+    with g1:
+        if stats["vagas"]["por_tipo"]:
+            df = grafico_contagem(stats["vagas"]["por_tipo"], "tipo")
+            fig = px.pie(df, names="tipo", values="total", title="Distribuição de Vagas por Modelo")
+            st.plotly_chart(fig, use_container_width=True)
+    with g2:
+        if stats["vagas"]["por_senioridade"]:
+            df = grafico_contagem(stats["vagas"]["por_senioridade"], "senioridade")
+            fig = px.bar(df, x="senioridade", y="total", title="Vagas por Senioridade")
             st.plotly_chart(fig, use_container_width=True)
 
-with tab_users:
+    g3, g4 = st.columns(2)
+    with g3:
+        if stats["vagas"]["por_local"]:
+            df = grafico_contagem(stats["vagas"]["por_local"], "local").nlargest(15, "total")
+            fig = px.bar(df, x="total", y="local", orientation="h", title="Top Localidades")
+            st.plotly_chart(fig, use_container_width=True)
+    with g4:
+        if stats["vagas"]["por_mes"]:
+            df = grafico_contagem(stats["vagas"]["por_mes"], "mes").sort_values("mes")
+            fig = px.line(df, x="mes", y="total", markers=True, title="Vagas Publicadas por Mês")
+            st.plotly_chart(fig, use_container_width=True)
+
+    mais_procuradas = pre_carregado(mais_procuradas)
+    if mais_procuradas is None:
+        mais_procuradas = carregar_mais_procuradas(db)
+    if mais_procuradas:
+        df = pd.DataFrame([
+            {"vaga": f"{vaga.get('titulo')} | {vaga.get('empresa')}", "total": vaga["total"]} for vaga in mais_procuradas
+        ])
+        fig = px.bar(df, x="total", y="vaga", orientation="h", title="Vagas com Mais Candidaturas")
+        st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("⚡ Cache de Consultas"):
+        stats_cache = estatisticas_cache()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Taxa de Acerto", f"{stats_cache['taxa_acerto']:.0%}")
+        c2.metric("Acertos / Falhas", f"{stats_cache['acertos']} / {stats_cache['falhas']}")
+        c3.metric("Entradas", f"{stats_cache['entradas']} / {stats_cache['capacidade']}")
+        compartilhado = stats_cache["compartilhado"]
+        if compartilhado["backend"] != "local":
+            estado = "🟢" if compartilhado["disponivel"] else "🔴"
+            st.caption(
+                f"{estado} Cache compartilhado entre réplicas ({compartilhado['backend']}): "
+                f"{compartilhado['acertos']} acertos, {compartilhado['falhas']} falhas, "
+                f"{compartilhado['gravacoes']} gravações, {compartilhado['erros']} erros."
+            )
+        if stats_cache["por_colecao"]:
+            st.dataframe(pd.DataFrame(stats_cache["por_colecao"]).T, use_container_width=True)
+
+    with st.expander("🔌 Pool de Conexões"):
+        stats_pool = estatisticas_pool()
+        if stats_pool:
+            st.dataframe(pd.DataFrame(stats_pool).T, use_container_width=True)
+        else:
+            st.caption("Nenhum evento de pool registrado ainda.")
+
+@st.fragment
+@medir_rerun("Admin › Usuários")
+def aba_usuarios(pagina):
+    pagina = pre_carregado(pagina)
     st.subheader("🔑 Cadastro de Usuários (Acesso ao Sistema)")
     st.info("Aqui você cria os logins para que as pessoas possam acessar o sistema.")
     
@@ -71,30 +265,24 @@ with tab_users:
                 if not u_login or not u_senha or not u_nome:
                     st.warning("Preencha todos os campos.")
                 else:
-                    if db.usuarios.find_one({"username": u_login}):
+                    novo_usuario = cadastrar_usuario(db, u_nome, u_login, u_senha, u_role)
+                    if novo_usuario is None:
                         st.error(f"O usuário '{u_login}' já existe!")
                     else:
-                        novo_usuario = {
-                            "nome": u_nome,
-                            "username": u_login,
-                            "senha": u_senha,
-                            "role": u_role,
-                            "data_criacao": datetime.now()
-                        }
-                        db.usuarios.insert_one(novo_usuario)
+                        registrar_escrita("usuarios")
+                        registrar_usuario(db)
                         st.success(f"Usuário **{u_login}** ({u_role}) criado com sucesso!")
-                        st.rerun()
+                        pagina = None
 
     st.divider()
     st.write("### 📋 Usuários Cadastrados")
     
-    users_list = list(db.usuarios.find({}, {"_id": 0, "senha": 0})) # Esconde a senha na listagem
-    if users_list:
-        st.dataframe(pd.DataFrame(users_list), use_container_width=True)
-    else:
-        st.info("Nenhum usuário encontrado.")
+    exibir_tabela("usuarios", pagina) # A senha nunca entra na projeção
 
-with tab_vagas:
+@st.fragment
+@medir_rerun("Admin › Vagas")
+def aba_vagas(pagina):
+    pagina = pre_carregado(pagina)
     st.subheader("🏢 Controle de Vagas")
     
     with st.expander("➕ Cadastrar Nova Vaga (Modo Admin)"):
@@ -118,8 +306,10 @@ with tab_vagas:
                     "titulo": a_titulo,
                     "empresa": a_empresa,
                     "local": a_local,
+                    "geo": resolver_local(a_local),
                     "tipo": a_tipo,
                     "salario": a_salario,
+                    **interpretar_salario(a_salario),
                     "senioridade": a_senioridade,
                     "descricao": a_desc,
                     "requisitos": a_req,
@@ -127,15 +317,18 @@ with tab_vagas:
                     "criado_por": "ADMIN"
                 }
                 db.vagas.insert_one(nova_vaga)
+                registrar_escrita("vagas", nova_vaga)
+                registrar_vaga(db, nova_vaga)
                 st.success("Vaga criada pelo Admin!")
-                st.rerun()
+                pagina = None
 
     st.write("### 📋 Todas as Vagas no Banco")
-    todas_vagas = list(db.vagas.find({}, {"_id": 0}))
-    if todas_vagas:
-        st.dataframe(pd.DataFrame(todas_vagas), use_container_width=True)
+    exibir_tabela("vagas", pagina)
 
-with tab_candidatos:
+@st.fragment
+@medir_rerun("Admin › Currículos")
+def aba_candidatos(pagina):
+    pagina = pre_carregado(pagina)
     st.subheader("👥 Controle de Currículos (Perfis)")
     
     with st.expander("➕ Cadastrar Novo Currículo (Modo Admin)"):
@@ -154,6 +347,9 @@ with tab_candidatos:
             c_username = st.text_input("Vincular ao usuário de login (Opcional)", placeholder="Digite o login do usuário se existir")
 
             if st.form_submit_button("Salvar Currículo"):
+                # Com login vinculado, o perfil é o daquele usuário (índice único usuario_id);
+                # sem login, é sempre um perfil novo: nomes iguais não se sobrescrevem.
+                usuario_vinculado = db.usuarios.find_one({"username": c_username}, {"_id": 1}) if c_username else None
                 novo_candidato = {
                     "nome": c_nome,
                     "email": c_email,
@@ -166,15 +362,90 @@ with tab_candidatos:
                     "username_vinculo": c_username if c_username else None,
                     "criado_por": "ADMIN"
                 }
-                db.candidatos.update_one(
-                    {"nome": c_nome}, 
-                    {"$set": novo_candidato}, 
-                    upsert=True
-                )
-                st.success("Currículo salvo pelo Admin!")
-                st.rerun()
+                if c_username and usuario_vinculado is None:
+                    st.error(f"O usuário '{c_username}' não existe.")
+                elif usuario_vinculado is None:
+                    novo_candidato["_id"] = db.candidatos.insert_one(novo_candidato).inserted_id
+                    registrar_candidato(db)
+                else:
+                    filtro_perfil = {"usuario_id": usuario_vinculado["_id"]}
+                    novo_candidato.update(filtro_perfil)
+                    resultado = db.candidatos.update_one(
+                        filtro_perfil, 
+                        {"$set": novo_candidato}, 
+                        upsert=True
+                    )
+                    if resultado.upserted_id is not None:
+                        novo_candidato["_id"] = resultado.upserted_id
+                        registrar_candidato(db)
+                    else:
+                        novo_candidato["_id"] = db.candidatos.find_one(filtro_perfil, {"_id": 1})["_id"]
+                if "_id" in novo_candidato:
+                    registrar_escrita("candidatos", novo_candidato)
+                    st.success("Currículo salvo pelo Admin!")
+                    pagina = None
 
     st.write("### 📋 Todos os Currículos no Banco")
-    todos_cands = list(db.candidatos.find({}, {"_id": 0}))
-    if todos_cands:
-        st.dataframe(pd.DataFrame(todos_cands), use_container_width=True)
\ No newline at end of file
+    exibir_tabela("candidatos", pagina)
+
+@st.fragment
+@medir_rerun("Admin › Performance")
+def aba_performance():
+    st.subheader("⏱️ Consultas ao MongoDB")
+    st.caption(
+        f"Medido neste processo desde {datetime.fromtimestamp(monitor_comandos.exportar()['desde']).strftime('%d/%m/%Y %H:%M:%S')}. "
+        f"Consultas acima de {monitor_comandos.limite_lento_ms:.0f} ms são registradas como lentas."
+    )
+
+    st.markdown("#### 📄 Custo por rerun de cada página")
+    reruns = monitor_comandos.reruns()
+    st.caption('Linhas "Página › trecho" são reruns de um fragmento sozinho: compare com a linha da página inteira.')
+    if reruns:
+        st.dataframe(pd.DataFrame(reruns).round(1), use_container_width=True, hide_index=True)
+    else:
+        st.caption("Nenhum rerun concluído ainda.")
+
+    st.markdown("#### 🔥 Maiores ofensores (tempo total)")
+    consultas_medidas = monitor_comandos.consultas()
+    if consultas_medidas:
+        colunas_perf = ["pagina", "origem", "comando", "colecao", "chamadas", "tempo_total_ms",
+                        "p50_ms", "p95_ms", "p99_ms", "documentos", "bytes", "falhas"]
+        df_perf = pd.DataFrame(consultas_medidas[:20], columns=colunas_perf)
+        st.dataframe(df_perf.round(2), use_container_width=True, hide_index=True)
+    else:
+        st.caption("Nenhuma consulta medida ainda.")
+
+    st.markdown("#### 🐢 Consultas lentas recentes")
+    lentas = monitor_comandos.lentas()
+    if lentas:
+        df_lentas = pd.DataFrame(lentas)
+        df_lentas["quando"] = pd.to_datetime(df_lentas["quando"], unit="s")
+        st.dataframe(df_lentas, use_container_width=True, hide_index=True)
+    else:
+        st.caption("Nenhuma consulta lenta registrada.")
+
+    c_exportar, c_limpar = st.columns(2)
+    c_exportar.download_button(
+        "⬇️ Exportar medições (JSON)",
+        data=json.dumps(monitor_comandos.exportar(), default=str, ensure_ascii=False, indent=2),
+        file_name=f"instrumentacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        mime="application/json",
+    )
+    c_limpar.button("🧹 Zerar medições", on_click=monitor_comandos.limpar)
+
+with tab_dash:
+    aba_visao_geral(stats, mais_procuradas)
+
+with tab_users:
+    aba_usuarios(pagina_usuarios)
+
+with tab_vagas:
+    aba_vagas(pagina_vagas)
+
+with tab_candidatos:
+    aba_candidatos(pagina_candidatos)
+
+with tab_perf:
+    aba_performance()
+
+finalizar_rerun()
@@ -3,21 +3,78 @@ import time
 
 try:
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun
+    from consultas import (
+        buscar_vagas_por_texto, buscar_candidatos_por_texto, carregar_resumos,
+        CAMPOS_RESULTADO_BUSCA, LIMITE_BUSCA,
+    )
+    from salario import MOEDA_PADRAO
+    import busca_local
+    import busca_semantica
+    from autocompletar import sugerir_termos, normalizar_termo
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from db import get_database
+    from instrumentacao import iniciar_rerun, finalizar_rerun
+    from consultas import (
+        buscar_vagas_por_texto, buscar_candidatos_por_texto, carregar_resumos,
+        CAMPOS_RESULTADO_BUSCA, LIMITE_BUSCA,
+    )
+    from salario import MOEDA_PADRAO
+    import busca_local
+    import busca_semantica
+    from autocompletar import sugerir_termos, normalizar_termo
 
 st.set_page_config(page_title="Busca & Matching", page_icon="🤖")
 
+iniciar_rerun("Assistente IA")
+
 st.markdown("# 🤖 Sistema de Matching Automático")
-st.markdown("Busca baseada em Full Text Search (MongoDB) com ranking de relevância (Score).")
+CONFIG_BUSCA = st.secrets.get("busca", {})
+BACKEND_BUSCA = CONFIG_BUSCA.get("backend", "mongo")
+# Parte textual do modo híbrido: "mongo" ($text) ou "bm25"
+BACKEND_TEXTUAL = CONFIG_BUSCA.get("textual", "mongo")
+
+DESCRICOES_BACKEND = {
+    "mongo": "Busca baseada em Full Text Search (MongoDB) com ranking de relevância (Score).",
+    "bm25": "Busca local com índice invertido (BM25 com pesos por campo) e ranking de relevância (Score).",
+    "semantica": "Busca semântica por similaridade de vetores (índice ANN local) com ranking de relevância (Score).",
+    "hibrida": "Busca híbrida: ranking textual e semântico combinados por Reciprocal Rank Fusion (Score).",
+}
+st.markdown(DESCRICOES_BACKEND.get(BACKEND_BUSCA, DESCRICOES_BACKEND["mongo"]))
+
+# Resultados exibidos por vez ("mostrar mais" revela os próximos) e tamanho do histórico.
+RESULTADOS_POR_PAGINA = 10
+MAX_MENSAGENS = 40
+
+c_tipo, c_relevancia = st.columns([2, 1])
+tipo_busca = c_tipo.radio("O que você está procurando?", ["🔍 Vagas", "📄 Candidatos"], horizontal=True)
+# Corte relativo ao melhor resultado: as escalas de score mudam de um backend para outro.
+relevancia_minima = c_relevancia.slider(
+    "Relevância mínima (% do melhor)", 0, 100,
+    int(CONFIG_BUSCA.get("relevancia_minima", 0.2) * 100), step=5,
+)
 
-tipo_busca = st.radio("O que você está procurando?", ["🔍 Vagas", "📄 Candidatos"], horizontal=True)
+salario_minimo, ordenar_por_salario = 0, False
+if tipo_busca == "🔍 Vagas":
+    c_salario, c_ordem = st.columns([2, 1])
+    salario_minimo = c_salario.number_input("💰 Salário mínimo (R$/mês)", min_value=0, step=500)
+    ordenar_por_salario = c_ordem.toggle("Ordenar por salário")
+
+def busca_textual(db, colecao, termo_busca, backend):
+    if backend == "bm25":
+        return busca_local.buscar(db, colecao, termo_busca, LIMITE_BUSCA)
+
+    if colecao == "vagas":
+        return buscar_vagas_por_texto(db, termo_busca, LIMITE_BUSCA)
+                
+    else:
+        return buscar_candidatos_por_texto(db, termo_busca, LIMITE_BUSCA)
 
 def buscar_com_score(termo_busca, tipo):
-    db = get_database()
+    db = get_database(somente_leitura=True)
     
     if db is None:
         return "Erro de conexão com o banco."
@@ -25,25 +82,112 @@ def buscar_com_score(termo_busca, tipo):
     if not termo_busca:
         return []
 
-    query = {"$text": {"$search": termo_busca}}
-    projecao = {"score": {"$meta": "textScore"}}
-    ordenacao = [("score", {"$meta": "textScore"})]
+    colecao = "vagas" if tipo == "🔍 Vagas" else "candidatos"
+    campos = CAMPOS_RESULTADO_BUSCA[colecao]
 
-    if tipo == "🔍 Vagas":
-        cursor = db.vagas.find(query, projecao).sort(ordenacao)
-        return list(cursor)
-                
-    else:
-        cursor = db.candidatos.find(query, projecao).sort(ordenacao)
-        return list(cursor)
+    try:
+        if BACKEND_BUSCA == "semantica":
+            return busca_semantica.buscar(db, colecao, termo_busca, LIMITE_BUSCA, campos)
+
+        if BACKEND_BUSCA == "hibrida":
+            return busca_semantica.fundir_rrf(
+                busca_textual(db, colecao, termo_busca, BACKEND_TEXTUAL),
+                busca_semantica.buscar(db, colecao, termo_busca, LIMITE_BUSCA, campos),
+                limite=LIMITE_BUSCA,
+            )
+    except busca_semantica.IndiceSemanticoAusente as e:
+        return f"⚠️ {e}"
+
+    return busca_textual(db, colecao, termo_busca, BACKEND_BUSCA)
+
+def referencias(resultados, fracao_minima):
+    # O histórico guarda só (_id, score) de cada resultado; os campos são buscados ao exibir.
+    if not resultados:
+        return []
+    corte = resultados[0].get("score", 0) * fracao_minima
+    return [(item["_id"], item.get("score", 0)) for item in resultados if item.get("score", 0) >= corte]
+
+def filtrar_por_salario(refs, minimo, ordenar):
+    # Sobre os resultados já ranqueados (no máximo LIMITE_BUSCA), com os campos numéricos
+    # gravados na escrita; a ordenação é estável, então empates mantêm a ordem de relevância.
+    db = get_database(somente_leitura=True)
+    if not (minimo or ordenar) or db is None or not refs:
+        return refs
+    resumos = carregar_resumos(db, "vagas", tuple(i for i, _ in refs))
+
+    def valor(ref):
+        item = resumos.get(ref[0], {})
+        return (item.get("salario_max") or 0) if item.get("salario_moeda") == MOEDA_PADRAO else 0
+
+    if minimo:
+        refs = [ref for ref in refs if valor(ref) >= minimo]
+    if ordenar:
+        refs = sorted(refs, key=valor, reverse=True)
+    return refs
+
+def exibir_resultados(msg, indice):
+    refs = msg["resultados"]
+    visiveis = refs[:msg["exibidos"]]
+    db = get_database(somente_leitura=True)
+    documentos = carregar_resumos(db, msg["colecao"], tuple(i for i, _ in visiveis)) if db is not None else {}
+
+    ordem = "salário" if msg.get("por_salario") else "relevância"
+    resposta = f"Encontrei **{len(refs)} matches** para '{msg['consulta']}', ordenados por {ordem}:\n\n"
+    for id_doc, score in visiveis:
+        item = documentos.get(id_doc)
+        if item is None:
+            continue
+        if msg["colecao"] == "vagas":
+            resposta += f"### 🏆 Score: {round(score, 2)} | {item.get('titulo')}\n"
+            resposta += f"- **Empresa:** {item.get('empresa')}\n"
+            resposta += f"- **Salário:** {item.get('salario') or 'A combinar'}\n"
+            resposta += f"- **Requisitos:** {item.get('requisitos')}\n\n"
+        else:
+            resposta += f"### 🏆 Score: {round(score, 2)} | {item.get('nome')}\n"
+            resposta += f"- **Skills:** {item.get('skills')}\n"
+            resposta += f"- **Resumo:** {item.get('resumo')}\n\n"
+    resposta += f"---\n*Exibindo {len(visiveis)} de {len(refs)}. O Score indica quantas vezes os termos aparecem e sua importância no texto.*"
+    st.write(resposta)
+
+    if msg["exibidos"] < len(refs):
+        if st.button("⬇️ Mostrar mais", key=f"mais_{indice}"):
+            msg["exibidos"] += RESULTADOS_POR_PAGINA
+            st.rerun()
 
 if "messages" not in st.session_state:
     st.session_state["messages"] = [{"role": "assistant", "content": "Olá! Digite skills ou palavras-chave para ver o matching por relevância."}]
 
-for msg in st.session_state.messages:
-    st.chat_message(msg["role"]).write(msg["content"])
+for i, msg in enumerate(st.session_state.messages):
+    with st.chat_message(msg["role"]):
+        if "resultados" in msg:
+            exibir_resultados(msg, i)
+        else:
+            st.write(msg["content"])
 
-if prompt := st.chat_input("Ex: Python, Vendas, Gerente..."):
+def sugestoes_consulta(consulta, tipo):
+    # Termos cadastrados que completam a consulta (grafias que o $text reconhece, em vez de variações).
+    db = get_database(somente_leitura=True)
+    if db is None or not consulta:
+        return []
+    categorias = ["titulos", "skills"] if tipo == "🔍 Vagas" else ["skills"]
+    digitado = normalizar_termo(consulta)
+    sugestoes = []
+    for categoria in categorias:
+        for termo in sugerir_termos(db, categoria, consulta):
+            if normalizar_termo(termo) != digitado and termo not in sugestoes:
+                sugestoes.append(termo)
+    return sugestoes[:8]
+
+def usar_sugestao():
+    st.session_state["consulta_pendente"] = st.session_state["sugestao_escolhida"]
+    st.session_state["sugestao_escolhida"] = None
+
+ultima_consulta = next((m["content"] for m in reversed(st.session_state.messages) if m["role"] == "user"), "")
+sugestoes = sugestoes_consulta(ultima_consulta, tipo_busca)
+if sugestoes:
+    st.pills("🔎 Termos relacionados", sugestoes, key="sugestao_escolhida", on_change=usar_sugestao)
+
+if prompt := st.chat_input("Ex: Python, Vendas, Gerente...") or st.session_state.pop("consulta_pendente", None):
     st.session_state.messages.append({"role": "user", "content": prompt})
     st.chat_message("user").write(prompt)
 
@@ -51,28 +195,31 @@ if prompt := st.chat_input("Ex: Python, Vendas, Gerente..."):
         with st.spinner("Calculando matching no MongoDB..."):
             
             resultados = buscar_com_score(prompt, tipo_busca)
+            refs = []
+            if not isinstance(resultados, str):
+                refs = filtrar_por_salario(referencias(resultados, relevancia_minima / 100), salario_minimo, ordenar_por_salario)
             
             if isinstance(resultados, str):
-                resposta = resultados
-            elif len(resultados) > 0:
-                resposta = f"Encontrei **{len(resultados)} matches** ordenados por relevância:\n\n"
-                
-                for item in resultados:
-                    score = round(item.get('score', 0), 2)
-                    
-                    if tipo_busca == "🔍 Vagas":
-                        resposta += f"### 🏆 Score: {score} | {item.get('titulo')}\n"
-                        resposta += f"- **Empresa:** {item.get('empresa')}\n"
-                        resposta += f"- **Requisitos:** {item.get('requisitos')}\n\n"
-                    else:
-                        resposta += f"### 🏆 Score: {score} | {item.get('nome')}\n"
-                        resposta += f"- **Skills:** {item.get('skills')}\n"
-                        resposta += f"- **Resumo:** {item.get('resumo')}\n\n"
-                        
-                resposta += "---\n*O Score indica quantas vezes os termos aparecem e sua importância no texto.*"
+                mensagem = {"role": "assistant", "content": resultados}
+            elif len(refs) > 0:
+                mensagem = {
+                    "role": "assistant",
+                    "consulta": prompt,
+                    "colecao": "vagas" if tipo_busca == "🔍 Vagas" else "candidatos",
+                    "resultados": refs,
+                    "por_salario": ordenar_por_salario,
+                    "exibidos": RESULTADOS_POR_PAGINA,
+                }
             else:
-                resposta = f"Nenhum match encontrado para '{prompt}' nos índices do banco."
+                mensagem = {"role": "assistant", "content": f"Nenhum match encontrado para '{prompt}' nos índices do banco."}
 
-            st.write(resposta)
+            if "resultados" in mensagem:
+                exibir_resultados(mensagem, len(st.session_state.messages))
+            else:
+                st.write(mensagem["content"])
     
-    st.session_state.messages.append({"role": "assistant", "content": resposta})
\ No newline at end of file
+    st.session_state.messages.append(mensagem)
+    # Histórico limitado: as mensagens mais antigas (depois da saudação) vão saindo.
+    del st.session_state.messages[1:-MAX_MENSAGENS]
+
+finalizar_rerun()
@@ -0,0 +1,115 @@
+import re
+
+from texto import normalizar_texto
+
+MOEDA_PADRAO = "BRL"
+# Base mensal: valores por hora ou por ano são convertidos (220 h/mês, regime CLT).
+HORAS_POR_MES = 220
+
+MOEDAS = [
+    ("USD", re.compile(r"us\$|usd|\bdolar(?:es)?\b|\$(?=\s*\d)(?<!r\$)")),
+    ("EUR", re.compile(r"€|\beur\b|\beuros?\b")),
+    ("BRL", re.compile(r"r\$|\bbrl\b|\breais\b")),
+]
+
+_SEM_VALOR = re.compile(r"combinar|negociavel|confidencial|nao informado|sigiloso|compativel com o mercado")
+_POR_HORA = re.compile(r"/\s*h(?:ora)?\b|por hora|\bhora\b")
+_POR_ANO = re.compile(r"/\s*ano\b|por ano|\banua(?:l|is)\b|\bano\b")
+_ATE = re.compile(r"\bate\b")
+_A_PARTIR = re.compile(r"a partir de|acima de|\bmin(?:imo)?\b|[\dk]\s*\+(?!\s*\w)")
+
+# Número com separadores (5.000 / 5,000.00 / 5.000,50), símbolo de moeda antes e multiplicador
+# opcional depois (R$ 5k, 10 mil).
+_NUMERO = re.compile(r"(r\$|us\$|\$|€|\bbrl|\busd|\beur)?\s*(\d[\d.,]*)\s*(k|mil)?\b")
+# O que pode ficar entre as duas pontas de uma faixa ("3 a 5 mil", "5.000 - 7.000", "de 3 até 5k").
+_ENTRE_FAIXA = re.compile(r"\s*(?:-|–|—|a|e|ate)\s*")
+# O contexto de um valor (período, "até", moeda por extenso) vai até o número ou a parte seguinte:
+# em "R$ 5.000 mensais + PLR anual", o "anual" é da PLR.
+_FIM_CONTEXTO = re.compile(r"[\d+;,()]")
+# Sem moeda nem multiplicador no texto todo, só valores a partir daqui contam ("5.000 - 7.000"),
+# para "2 vagas" ou "40 horas" não virarem salário.
+VALOR_MINIMO_SEM_MOEDA = 100
+
+
+def _valor(numero, multiplicador):
+    # O último separador seguido de 1 ou 2 dígitos é o decimal; os demais são de milhar.
+    inteiro, decimal = numero, ""
+    posicao = max(numero.rfind("."), numero.rfind(","))
+    if posicao >= 0 and len(numero) - posicao - 1 in (1, 2):
+        inteiro, decimal = numero[:posicao], numero[posicao + 1:]
+    inteiro = inteiro.replace(".", "").replace(",", "")
+    if not inteiro:
+        return None
+    valor = float(f"{inteiro}.{decimal or 0}")
+    return valor * 1000 if multiplicador else valor
+
+
+def _grupos(normalizado):
+    # Cada grupo é um valor ou uma faixa: [(moeda, número, multiplicador), ...] e onde ele está no texto.
+    grupos = []
+    anterior = None
+    for encontrado in _NUMERO.finditer(normalizado):
+        item = encontrado.groups()
+        faixa = anterior is not None and _ENTRE_FAIXA.fullmatch(normalizado, anterior.end(), encontrado.start())
+        if faixa and len(grupos[-1][0]) == 1:
+            grupos[-1][0].append(item)
+            grupos[-1][2] = encontrado.end()
+        else:
+            grupos.append([[item], encontrado.start(), encontrado.end()])
+        anterior = encontrado
+    return grupos
+
+
+def _valores_grupo(itens):
+    # Multiplicador só na segunda ponta vale para as duas ("entre 3 e 5 mil", "3-5k"),
+    # a não ser que a primeira já seja maior ("R$ 800 a 5 mil").
+    if len(itens) == 2 and itens[1][2] and not itens[0][2]:
+        primeiro = _valor(itens[0][1], None)
+        if primeiro is not None and primeiro <= (_valor(itens[1][1], None) or 0):
+            itens = [(itens[0][0], itens[0][1], itens[1][2]), itens[1]]
+    return [v for _, n, m in itens if (v := _valor(n, m))]
+
+
+def _contexto(normalizado, inicio, fim):
+    antes = [m.end() for m in _FIM_CONTEXTO.finditer(normalizado, 0, inicio)]
+    depois = _FIM_CONTEXTO.search(normalizado, fim)
+    return normalizado[antes[-1] if antes else 0:depois.end() if depois else len(normalizado)]
+
+
+def interpretar_salario(texto):
+    # Campos numéricos para filtrar e ordenar por salário; o texto original continua em "salario".
+    normalizado = normalizar_texto(texto).strip()
+    resultado = {"salario_min": None, "salario_max": None, "salario_moeda": None, "salario_a_combinar": True}
+    if not normalizado or _SEM_VALOR.search(normalizado):
+        return resultado
+
+    # O primeiro valor com moeda ou multiplicador; sem nenhum, o primeiro que pareça um salário.
+    grupos = _grupos(normalizado)
+    com_moeda = [g for g in grupos if any(moeda or multiplicador for moeda, _, multiplicador in g[0])]
+    candidatos = [(g, v) for g in (com_moeda or grupos) if (v := _valores_grupo(g[0]))]
+    if not com_moeda:
+        candidatos = [(g, v) for g, v in candidatos if min(v) >= VALOR_MINIMO_SEM_MOEDA]
+    if not candidatos:
+        return resultado
+    (itens, inicio, fim), valores = candidatos[0]
+    contexto = _contexto(normalizado, inicio, fim)
+
+    if _POR_HORA.search(contexto):
+        valores = [v * HORAS_POR_MES for v in valores]
+    elif _POR_ANO.search(contexto):
+        valores = [v / 12 for v in valores]
+
+    # Só um valor: "até X" fica sem piso; "a partir de X" não tem teto informado, e o piso
+    # vale como teto para filtrar e ordenar.
+    minimo, maximo = min(valores), max(valores)
+    if len(valores) == 1 and _ATE.search(contexto) and not _A_PARTIR.search(contexto):
+        minimo = None
+
+    moeda = next((moeda for moeda, regex in MOEDAS if regex.search(contexto)), None)
+    resultado.update({
+        "salario_min": round(minimo, 2) if minimo is not None else None,
+        "salario_max": round(maximo, 2) if maximo is not None else None,
+        "salario_moeda": moeda or next((moeda for moeda, regex in MOEDAS if regex.search(normalizado)), MOEDA_PADRAO),
+        "salario_a_combinar": False,
+    })
+    return resultado
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import csv
+import re
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+TAMANHO_PAGINA_TABELA = 50
+TAMANHO_LOTE_EXPORTACAO = 5000
+
+# Colunas exibidas nas grades do Admin (sem os textos longos).
+COLUNAS_TABELA = {
+    "vagas": ["titulo", "empresa", "local", "tipo", "senioridade", "salario", "criado_por", "data_criacao"],
+    "candidatos": ["nome", "email", "formacao", "idiomas", "skills", "username_vinculo", "data_atualizacao"],
+    "usuarios": ["nome", "username", "role", "data_criacao"],
+}
+
+# Colunas levadas na exportação completa. A senha dos usuários nunca sai do banco.
+COLUNAS_EXPORTACAO = {
+    "vagas": COLUNAS_TABELA["vagas"] + ["descricao", "requisitos"],
+    "candidatos": COLUNAS_TABELA["candidatos"] + ["resumo", "experiencia"],
+    "usuarios": COLUNAS_TABELA["usuarios"],
+}
+
+
+def _projecao(colunas):
+    return {"_id": 0, **{coluna: 1 for coluna in colunas}}
+
+
+def _filtro(coluna, termo):
+    if not coluna or not termo:
+        return {}
+    return {coluna: {"$regex": re.escape(termo), "$options": "i"}}
+
+
+def consulta_pagina_tabela(colecao, pagina=0, tamanho=TAMANHO_PAGINA_TABELA,
+                           ordenar_por=None, decrescente=False, coluna_filtro=None, termo=None):
+    colunas = COLUNAS_TABELA[colecao]
+    return {
+        "filtro": _filtro(coluna_filtro, termo),
+        "projecao": _projecao(colunas),
+        "ordenacao": [(ordenar_por or colunas[0], -1 if decrescente else 1), ("_id", 1)],
+        "pular": max(0, pagina) * tamanho,
+        "limite": tamanho,
+    }
+
+
+def carregar_pagina_tabela(db, colecao, **parametros):
+    consulta = consulta_pagina_tabela(colecao, **parametros)
+    cursor = (
+        db[colecao].find(consulta["filtro"], consulta["projecao"])
+        .sort(consulta["ordenacao"])
+        .skip(consulta["pular"])
+        .limit(consulta["limite"])
+    )
+    df = pd.DataFrame(list(cursor), columns=COLUNAS_TABELA[colecao])
+
+    if consulta["filtro"]:
+        total = db[colecao].count_documents(consulta["filtro"])
+    else:
+        total = db[colecao].estimated_document_count()
+    return df, total
+
+
+async def carregar_pagina_tabela_async(db, colecao, parametros):
+    # Mesma página do carregar_pagina_tabela, pelo cliente assíncrono: a busca e a contagem
+    # saem juntas, e o Admin pode pedir as páginas de todas as coleções de uma vez.
+    from db_async import buscar, contar
+
+    consulta = consulta_pagina_tabela(colecao, **parametros)
+    documentos, total = await asyncio.gather(
+        buscar(db, colecao, **consulta),
+        contar(db, colecao, consulta["filtro"]),
+    )
+    return pd.DataFrame(documentos, columns=COLUNAS_TABELA[colecao]), total
+
+
+def iterar_lotes(db, colecao, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    # Percorre a coleção inteira em lotes de tamanho fixo; só um lote fica em memória por vez.
+    cursor = db[colecao].find({}, _projecao(COLUNAS_EXPORTACAO[colecao])).sort("_id", 1).batch_size(tamanho_lote)
+    lote = []
+    for documento in cursor:
+        lote.append(documento)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def exportar_csv(db, colecao, destino, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    colunas = COLUNAS_EXPORTACAO[colecao]
+    total = 0
+    with open(destino, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=colunas, extrasaction="ignore")
+        escritor.writeheader()
+        for lote in iterar_lotes(db, colecao, tamanho_lote):
+            escritor.writerows(lote)
+            total += len(lote)
+    return total
+
+
+def _schema_parquet(colunas):
+    return pa.schema([
+        (coluna, pa.timestamp("ms") if coluna.startswith("data_") else pa.string())
+        for coluna in colunas
+    ])
+
+
+def _linha_parquet(documento, colunas):
+    linha = {}
+    for coluna in colunas:
+        valor = documento.get(coluna)
+        if coluna.startswith("data_"):
+            linha[coluna] = valor if isinstance(valor, datetime) else None
+        else:
+            linha[coluna] = None if valor is None else str(valor)
+    return linha
+
+
+def exportar_parquet(db, colecao, destino, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    colunas = COLUNAS_EXPORTACAO[colecao]
+    schema = _schema_parquet(colunas)
+    total = 0
+    with pq.ParquetWriter(destino, schema) as escritor:
+        for lote in iterar_lotes(db, colecao, tamanho_lote):
+            linhas = [_linha_parquet(documento, colunas) for documento in lote]
+            escritor.write_table(pa.Table.from_pylist(linhas, schema=schema))
+            total += len(lote)
+    return total
+
+
+EXPORTADORES = {
+    "csv": exportar_csv,
+    "parquet": exportar_parquet,
+}
+
+
+if __name__ == "__main__":
+    from db import get_database
+
+    parser = argparse.ArgumentParser(description="Exporta uma coleção inteira em lotes, sem carregá-la toda na memória.")
+    parser.add_argument("colecao", choices=sorted(COLUNAS_EXPORTACAO))
+    parser.add_argument("destino")
+    parser.add_argument("--formato", choices=sorted(EXPORTADORES), default="csv")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_EXPORTACAO)
+    args = parser.parse_args()
+
+    db = get_database()
+    if db is None:
+        print("Erro de conexão. Verifique o secrets.toml")
+    else:
+        total = EXPORTADORES[args.formato](db, args.colecao, args.destino, args.lote)
+        print(f"✅ {total} documento(s) de {args.colecao} exportado(s) para {args.destino}.")
@@ -0,0 +1,40 @@
+import re
+import unicodedata
+
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dem do dos e ela elas ele eles em entre era essa esse esta este eu
+foi ha isso isto ja mais mas me mesmo na nao nas nem no nos o os ou para pela pelas pelo pelos por
+qual quando que se sem ser seu seus sua suas tambem te tem um uma umas uns voce voces
+""".split())
+
+# Mantém tokens técnicos como "c++", "c#" e "node.js" inteiros.
+_REGEX_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+# Plurais mais comuns do português, do sufixo mais longo para o mais curto.
+_PLURAIS = (
+    ("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+    ("res", "r"), ("zes", "z"), ("ns", "m"), ("s", ""),
+)
+
+
+def normalizar_texto(texto):
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    return "".join(ch for ch in texto if not unicodedata.combining(ch))
+
+
+def radical(token):
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    for sufixo, troca in _PLURAIS:
+        if token.endswith(sufixo):
+            return token[: -len(sufixo)] + troca
+    return token
+
+
+def tokenizar(texto):
+    tokens = []
+    for token in _REGEX_TOKEN.findall(normalizar_texto(texto)):
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            tokens.append(radical(token))
+    return tokens
@@ -0,0 +1,107 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from pymongo import InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+# O mongomock 4.3 ainda não acompanha o pymongo 4.x em alguns pontos usados pelo app: o
+# bulk_write (quebra com o parâmetro "sort" das operações), o $substrCP nas projeções e a
+# construção de índices únicos parciais (confere a coleção inteira, não só o filtro).
+def _bulk_write(self, operacoes, ordered=True, **kwargs):
+    inseridos = modificados = 0
+    upserts = {}
+    erros = []
+    for i, operacao in enumerate(operacoes):
+        try:
+            if isinstance(operacao, InsertOne):
+                self.insert_one(operacao._doc)
+                inseridos += 1
+                continue
+            if isinstance(operacao, ReplaceOne):
+                resultado = self.replace_one(operacao._filter, operacao._doc, upsert=operacao._upsert)
+            elif isinstance(operacao, UpdateOne):
+                resultado = self.update_one(operacao._filter, operacao._doc, upsert=operacao._upsert)
+            elif isinstance(operacao, UpdateMany):
+                resultado = self.update_many(operacao._filter, operacao._doc, upsert=operacao._upsert)
+            else:
+                raise NotImplementedError(type(operacao))
+        except DuplicateKeyError:
+            erros.append({"index": i, "code": 11000, "errmsg": "E11000 Duplicate Key Error"})
+            if ordered:
+                break
+            continue
+        modificados += resultado.modified_count
+        if resultado.upserted_id is not None:
+            upserts[i] = resultado.upserted_id
+    if erros:
+        raise BulkWriteError({
+            "writeErrors": erros, "nInserted": inseridos, "nModified": modificados,
+            "nUpserted": len(upserts), "upserted": [{"index": i, "_id": id_} for i, id_ in upserts.items()],
+        })
+    return SimpleNamespace(
+        inserted_count=inseridos, modified_count=modificados, matched_count=modificados,
+        upserted_count=len(upserts), upserted_ids=upserts,
+    )
+
+
+_find_original = mongomock.Collection.find
+
+
+def _find(self, filter=None, projection=None, *args, **kwargs):
+    if isinstance(projection, dict):
+        projection = {
+            campo: 1 if isinstance(valor, dict) and "$substrCP" in valor else valor
+            for campo, valor in projection.items()
+        }
+    return _find_original(self, filter, projection, *args, **kwargs)
+
+
+_create_index_original = mongomock.Collection.create_index
+
+
+def _create_index(self, chaves, *args, **kwargs):
+    filtro = kwargs.get("partialFilterExpression")
+    if not (kwargs.get("unique") and filtro):
+        return _create_index_original(self, chaves, *args, **kwargs)
+    campos = [campo for campo, _ in mongomock.helpers.create_index_list(chaves)]
+    vistos = set()
+    for documento in self.find(filtro):
+        valor = repr([documento.get(campo) for campo in campos])
+        if valor in vistos:
+            raise DuplicateKeyError("E11000 Duplicate Key Error", 11000)
+        vistos.add(valor)
+    nome = _create_index_original(self, chaves, *args, **{**kwargs, "unique": False})
+    self._store.indexes[nome]["unique"] = True
+    return nome
+
+
+mongomock.Collection.bulk_write = _bulk_write
+mongomock.Collection.create_index = _create_index
+mongomock.Collection.find = _find
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().portal_vagas
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    # O cache de consultas e os índices em memória são globais do processo.
+    import autocompletar
+    import busca_local
+    import cache
+
+    cache.limpar_cache()
+    busca_local._indices.clear()
+    busca_local._versoes_indices.clear()
+    autocompletar._indices.clear()
+    autocompletar._versoes_indices.clear()
+    yield
+    cache.limpar_cache()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+import pytest
+from bson import ObjectId
+from streamlit.testing.v1 import AppTest
+
+import db as modulo_db
+from auth import emitir_token
+
+PAGINA = os.path.join(os.path.dirname(__file__), "..", "src", "pages", "3_⚙️_Admin.py")
+
+
+@pytest.fixture
+def pagina(db, monkeypatch, tmp_path):
+    db.usuarios.insert_many([{"username": f"u{i}", "nome": f"Usuário {i}", "role": "candidato"} for i in range(3)])
+    monkeypatch.setattr(modulo_db, "get_database", lambda somente_leitura=False: db)
+    # Isola o diretório temporário para conferir que a exportação não deixa nada nele.
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    app = AppTest.from_file(PAGINA, default_timeout=60)
+    usuario = {"_id": ObjectId(), "username": "admin", "nome": "Admin", "role": "admin"}
+    app.session_state["logged_in"] = True
+    app.session_state["user_role"] = "admin"
+    app.session_state["user_name"] = "Admin"
+    app.session_state["token"] = emitir_token(usuario)
+    app.diretorio_temporario = tmp_path
+    return app
+
+
+def test_exportacao_nao_deixa_arquivo_no_disco(pagina):
+    pagina.run()
+    pagina.button(key="usuarios_exportar").click().run()
+    assert not pagina.exception
+    nome_arquivo, dados = pagina.session_state["usuarios_arquivo_exportado"]
+    assert nome_arquivo == "usuarios.csv"
+    assert dados.count(b"\n") == 4
+    assert list(pagina.diretorio_temporario.iterdir()) == []
@@ -0,0 +1,211 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import ao_vivo
+from ao_vivo import MonitorAoVivo
+from cache import escrita_local, registrar_escrita
+
+INICIO = datetime(2026, 1, 1)
+
+
+class StreamFalso:
+    # Entrega os lotes de eventos separados por "None" (stream momentaneamente vazio) e para o
+    # monitor quando acaba.
+    def __init__(self, monitor, eventos):
+        self.monitor = monitor
+        self.eventos = list(eventos)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def try_next(self):
+        if not self.eventos:
+            self.monitor.parar()
+            return None
+        return self.eventos.pop(0)
+
+
+class BancoComStream:
+    def __init__(self, db):
+        self._db = db
+        self.eventos = []
+        self.monitor = None
+
+    def __getattr__(self, nome):
+        return getattr(self._db, nome)
+
+    def __getitem__(self, nome):
+        return self._db[nome]
+
+    def watch(self, *args, **kwargs):
+        return StreamFalso(self.monitor, self.eventos)
+
+
+@pytest.fixture
+def invalidacoes(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(ao_vivo, "invalidar_colecao", lambda colecao, **opcoes: chamadas.append(colecao))
+    return chamadas
+
+
+def _vaga(i):
+    return {"_id": ObjectId(), "titulo": f"Vaga {i}", "descricao": "x", "data_criacao": INICIO + timedelta(hours=i)}
+
+
+def _evento_aplicacao(id_vaga):
+    return {"ns": {"coll": "aplicacoes"}, "operationType": "insert", "fullDocument": {"vaga_id": id_vaga}}
+
+
+def _evento_vaga(vaga):
+    return {"ns": {"coll": "vagas"}, "operationType": "insert", "documentKey": {"_id": vaga["_id"]}, "fullDocument": vaga}
+
+
+def _monitor(db, eventos, capacidade=10):
+    banco = BancoComStream(db)
+    monitor = MonitorAoVivo(banco, capacidade)
+    banco.monitor = monitor
+    banco.eventos = eventos
+    return monitor
+
+
+def test_rajada_invalida_cada_colecao_uma_vez(db, invalidacoes):
+    id_vaga = db.vagas.insert_one(_vaga(0)).inserted_id
+    eventos = [_evento_aplicacao(id_vaga) for _ in range(50)] + [_evento_vaga(_vaga(i)) for i in range(1, 20)]
+    _monitor(db, eventos)._acompanhar_stream()
+    assert sorted(invalidacoes) == ["aplicacoes", "vagas"]
+
+
+def test_escrita_deste_processo_nao_invalida_de_novo(db, invalidacoes):
+    vaga = _vaga(1)
+    db.vagas.insert_one(vaga)
+    registrar_escrita("vagas", vaga)
+    _monitor(db, [_evento_vaga(vaga), None, _evento_vaga(_vaga(2))])._acompanhar_stream()
+    # Só a vaga de outro processo invalida; o evento da escrita local é reconhecido uma vez.
+    assert invalidacoes == ["vagas"]
+    assert not escrita_local("vagas", vaga["_id"])
+
+
+def test_candidaturas_somam_na_contagem_ja_carregada(db):
+    id_vaga = db.vagas.insert_one(_vaga(0)).inserted_id
+    db.aplicacoes.insert_many([{"vaga_id": id_vaga} for _ in range(2)])
+    monitor = MonitorAoVivo(db)
+    assert monitor.contagens([id_vaga]) == {id_vaga: 2}
+    for _ in range(3):
+        monitor._processar(_evento_aplicacao(id_vaga))
+    assert monitor.contagens([id_vaga]) == {id_vaga: 5}
+
+
+def test_rajadas_separadas_invalidam_separadamente(db, invalidacoes):
+    eventos = [_evento_vaga(_vaga(1)), _evento_vaga(_vaga(2)), None, _evento_vaga(_vaga(3))]
+    _monitor(db, eventos)._acompanhar_stream()
+    assert invalidacoes == ["vagas", "vagas"]
+
+
+def test_fluxo_continuo_invalida_a_cada_janela(db, invalidacoes, monkeypatch):
+    relogio = [0.0]
+
+    def monotonic():
+        relogio[0] += 0.1
+        return relogio[0]
+
+    monkeypatch.setattr(ao_vivo.time, "monotonic", monotonic)
+    _monitor(db, [_evento_vaga(_vaga(i)) for i in range(40)], capacidade=50)._acompanhar_stream()
+    assert 1 < len(invalidacoes) < 40
+
+
+def test_snapshot_pagina_como_o_feed(db):
+    db.vagas.insert_many([_vaga(i) for i in range(5)])
+    monitor = MonitorAoVivo(db, capacidade=10)
+    monitor._recarregar()
+    vagas, cursor = monitor.pagina(limite=3)
+    assert [v["titulo"] for v in vagas] == ["Vaga 4", "Vaga 3", "Vaga 2"]
+    vagas, cursor = monitor.pagina(cursor, limite=3)
+    assert [v["titulo"] for v in vagas] == ["Vaga 1", "Vaga 0"]
+    assert cursor is None
+
+
+def test_snapshot_incompleto_nao_responde_alem_da_capacidade(db):
+    db.vagas.insert_many([_vaga(i) for i in range(5)])
+    monitor = MonitorAoVivo(db, capacidade=3)
+    monitor._recarregar()
+    assert monitor.pagina(limite=3) is None
+    assert monitor.pagina(limite=2) is not None
+
+
+def test_vaga_nova_entra_no_topo_e_remocao_sai(db):
+    db.vagas.insert_many([_vaga(i) for i in range(3)])
+    monitor = MonitorAoVivo(db, capacidade=10)
+    monitor._recarregar()
+    primeira = monitor.pagina(limite=1)[0][0]
+
+    nova = _vaga(10)
+    monitor._processar(_evento_vaga(nova))
+    assert [v["_id"] for v in monitor.novas_desde(primeira)] == [nova["_id"]]
+    monitor._processar({"ns": {"coll": "vagas"}, "operationType": "delete", "documentKey": {"_id": nova["_id"]}})
+    assert monitor.novas_desde(primeira) == []
+
+
+class ParadaRoteirizada:
+    # Substitui o Event de parada: cada espera do polling executa o próximo passo (uma escrita
+    # "de outra réplica") e o monitor para quando os passos acabam.
+    def __init__(self, passos):
+        self.passos = list(passos)
+
+    def is_set(self):
+        return not self.passos
+
+    def wait(self, timeout=None):
+        if not self.passos:
+            return True
+        self.passos.pop(0)()
+        return False
+
+
+def _polling(db, passos, capacidade=10):
+    monitor = MonitorAoVivo(db, capacidade)
+    monitor._parar = ParadaRoteirizada(passos)
+    monitor._acompanhar_polling()
+    return monitor
+
+
+def test_polling_enxerga_vaga_editada(db, invalidacoes):
+    vagas = [_vaga(i) for i in range(3)]
+    db.vagas.insert_many(vagas)
+    editar = lambda: db.vagas.update_one(
+        {"_id": vagas[0]["_id"]}, {"$set": {"titulo": "Editada", "data_atualizacao": datetime.now()}}
+    )
+    monitor = _polling(db, [editar])
+    titulos = {v["_id"]: v["titulo"] for v in monitor.pagina(limite=10)[0]}
+    assert titulos[vagas[0]["_id"]] == "Editada"
+    assert invalidacoes == ["vagas"]
+
+
+def test_polling_enxerga_vaga_removida(db, invalidacoes):
+    vagas = [_vaga(i) for i in range(3)]
+    db.vagas.insert_many(vagas)
+    # Depois da remoção o polling recarrega o snapshot e segue; o passo vazio só o deixa parar.
+    monitor = _polling(db, [lambda: db.vagas.delete_one({"_id": vagas[2]["_id"]}), lambda: None])
+    assert [v["_id"] for v in monitor.pagina(limite=10)[0]] == [vagas[1]["_id"], vagas[0]["_id"]]
+    assert invalidacoes == ["vagas"]
+
+
+def test_polling_enxerga_candidatura_removida(db, invalidacoes):
+    vaga = _vaga(0)
+    db.vagas.insert_one(vaga)
+    db.aplicacoes.insert_many([{"vaga_id": vaga["_id"], "data_aplicacao": INICIO} for _ in range(2)])
+    monitor = MonitorAoVivo(db, capacidade=10)
+    contagens = []
+    passos = [
+        lambda: contagens.append(monitor.contagens([vaga["_id"]])),
+        lambda: db.aplicacoes.delete_one({"vaga_id": vaga["_id"]}),
+    ]
+    monitor._parar = ParadaRoteirizada(passos)
+    monitor._acompanhar_polling()
+    assert contagens == [{vaga["_id"]: 2}]
+    assert monitor.contagens([vaga["_id"]]) == {vaga["_id"]: 1}
+    assert invalidacoes == ["aplicacoes"]
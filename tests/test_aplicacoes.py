@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import backfill
+import criar_indices
+from aplicacoes import aplicar_em_lote, salvar_aplicacao
+from backfill import backfill_aplicacoes, backfill_perfis
+
+
+def _migrar(db):
+    plano = criar_indices.planejar(db)
+    return criar_indices.aplicar(db, plano)
+
+
+def _indice_aplicacoes(db):
+    return next(info for info in db.aplicacoes.list_indexes() if info["name"].startswith("aplicacoes_vaga_candidato"))
+
+
+@pytest.fixture
+def ana(db):
+    return db.usuarios.insert_one({"username": "ana", "nome": "Ana", "role": "candidato"}).inserted_id
+
+
+@pytest.fixture
+def vagas(db):
+    ids = db.vagas.insert_many([
+        {"titulo": "Dev Python", "empresa": "Acme", "data_criacao": datetime(2026, 1, 1)},
+        {"titulo": "Designer", "empresa": "Beta", "data_criacao": datetime(2026, 1, 2)},
+    ]).inserted_ids
+    return [db.vagas.find_one({"_id": i}) for i in ids]
+
+
+def test_migracao_com_varias_candidaturas_sem_vaga_por_usuario(db, vagas, ana):
+    # Formato antigo: só título/empresa, sem vaga_id. Vagas que não existem mais não são ligadas.
+    db.aplicacoes.insert_many([
+        {"vaga_titulo": titulo, "empresa_vaga": empresa, "candidato_username": usuario}
+        for usuario in ("Ana", "Bia")
+        for titulo, empresa in [("Removida 1", "X"), ("Removida 2", "Y"), ("Removida 3", "Z"), ("Dev Python", "Acme")]
+    ])
+    assert backfill_aplicacoes(db) == 2
+    assert db.aplicacoes.count_documents({"vaga_id": {"$exists": False}}) == 6
+    # "Bia" não tem login: a candidatura dela fica sem candidato_id, fora da unicidade.
+    assert backfill_perfis(db) == 4
+
+    assert _migrar(db) == 0
+    indice = _indice_aplicacoes(db)
+    assert indice["unique"]
+    assert indice["key"] == {"vaga_id": 1, "candidato_id": 1}
+    assert indice["partialFilterExpression"] == {"vaga_id": {"$exists": True}, "candidato_id": {"$exists": True}}
+
+    # Depois da migração, a unicidade vale para as candidaturas ligadas a uma vaga e a um login.
+    assert salvar_aplicacao(db, vagas[0], "Ana", ana) == "duplicado"
+    assert salvar_aplicacao(db, vagas[1], "Ana", ana) == "sucesso"
+    db.aplicacoes.insert_one({"vaga_titulo": "Removida 1", "empresa_vaga": "X", "candidato_username": "Ana"})
+
+
+def test_migracao_ja_aplicada_fica_em_dia(db):
+    _migrar(db)
+    acoes = {passo["nome"]: passo["acao"] for passo in criar_indices.planejar(db) if "nome" in passo}
+    assert acoes["aplicacoes_vaga_candidato"] == "manter"
+
+
+def test_candidatura_guarda_o_login_e_o_nome_exibido(db, vagas, ana):
+    _migrar(db)
+    assert salvar_aplicacao(db, vagas[0], "Ana", ana) == "sucesso"
+    aplicacao = db.aplicacoes.find_one({"vaga_id": vagas[0]["_id"]})
+    assert (aplicacao["candidato_id"], aplicacao["candidato_username"]) == (ana, "Ana")
+
+
+def test_candidatos_com_o_mesmo_nome_aplicam_cada_um(db, vagas):
+    _migrar(db)
+    assert salvar_aplicacao(db, vagas[0], "Ana", ObjectId()) == "sucesso"
+    assert salvar_aplicacao(db, vagas[0], "Ana", ObjectId()) == "sucesso"
+    assert db.aplicacoes.count_documents({"vaga_id": vagas[0]["_id"]}) == 2
+
+
+def test_backfill_nao_duplica_candidatura_ja_ligada(db, vagas, ana):
+    _migrar(db)
+    assert salvar_aplicacao(db, vagas[0], "Ana", ana) == "sucesso"
+    db.aplicacoes.insert_one({"vaga_titulo": "Dev Python", "empresa_vaga": "Acme", "candidato_username": "Ana"})
+    assert backfill_perfis(db) == 1
+    assert backfill_aplicacoes(db) == 0
+    assert db.aplicacoes.count_documents({"vaga_id": vagas[0]["_id"]}) == 1
+
+
+def test_candidatura_em_lote_devolve_so_as_novas(db, vagas, ana):
+    _migrar(db)
+    salvar_aplicacao(db, vagas[0], "Ana", ana)
+    novas = aplicar_em_lote(db, vagas, "Ana", ana)
+    assert [vaga["_id"] for vaga in novas] == [vagas[1]["_id"]]
+    assert aplicar_em_lote(db, vagas, "Ana", ana) == []
+    assert aplicar_em_lote(db, [], "Ana", ana) == []
+
+
+def test_candidatura_antiga_liga_pelo_nome_exibido_e_nao_pelo_login(db, ana):
+    # O nome exibido de um usuário é o login de outro: a candidatura é de quem tem o nome.
+    carla = db.usuarios.insert_one({"username": "carla.s", "nome": "ana", "role": "candidato"}).inserted_id
+    db.usuarios.insert_many([{"username": f"joao{i}", "nome": "João", "role": "candidato"} for i in range(2)])
+    ids = db.aplicacoes.insert_many([
+        {"vaga_titulo": "Dev Python", "empresa_vaga": "Acme", "candidato_username": nome}
+        for nome in ("ana", "Ana", "João")
+    ]).inserted_ids
+    assert backfill_perfis(db) == 2
+    ligados = [db.aplicacoes.find_one({"_id": i}).get("candidato_id") for i in ids]
+    assert ligados == [carla, ana, None]
+
+
+def test_perfil_antigo_liga_primeiro_pelo_login(db, ana):
+    db.usuarios.insert_one({"username": "outra", "nome": "ana", "role": "candidato"})
+    id_perfil = db.candidatos.insert_one({"nome": "Ana Souza", "username_vinculo": "ana"}).inserted_id
+    backfill_perfis(db)
+    assert db.candidatos.find_one({"_id": id_perfil})["usuario_id"] == ana
+
+
+def test_backfill_sobe_a_versao_so_das_colecoes_alteradas(db, vagas, ana, monkeypatch):
+    invalidadas = []
+    monkeypatch.setattr(backfill, "invalidar_colecao", invalidadas.append)
+    db.aplicacoes.insert_one({"vaga_titulo": "Dev Python", "empresa_vaga": "Acme", "candidato_username": "Ana"})
+    assert backfill_aplicacoes(db) == 1
+    assert backfill_aplicacoes(db) == 0
+    assert invalidadas == ["aplicacoes"]
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import db as modulo_db
+from consultas import CAMPOS_RESULTADO_BUSCA, buscar_por_texto, carregar_resumos
+
+PAGINA = os.path.join(os.path.dirname(__file__), "..", "src", "pages", "4_🤖_Assistente_IA.py")
+
+
+class ColecaoGravadora:
+    name = "vagas"
+
+    def __init__(self):
+        self.chamadas = []
+
+    def find(self, filtro, projecao):
+        self.chamadas.append(("find", filtro, projecao))
+        return self
+
+    def sort(self, ordenacao):
+        self.chamadas.append(("sort", ordenacao))
+        return self
+
+    def limit(self, limite):
+        self.chamadas.append(("limit", limite))
+        return []
+
+
+def test_busca_textual_limita_e_projeta_no_servidor():
+    colecao = ColecaoGravadora()
+    buscar_por_texto(colecao, "python", limite=7)
+    (_, filtro, projecao), ordenacao, limite = colecao.chamadas
+    assert filtro == {"$text": {"$search": "python"}}
+    assert set(projecao) == {*CAMPOS_RESULTADO_BUSCA["vagas"], "score"}
+    assert ordenacao == ("sort", [("score", {"$meta": "textScore"})])
+    assert limite == ("limit", 7)
+
+
+def test_resumos_trazem_so_os_campos_de_exibicao(db):
+    ids = db.vagas.insert_many([{"titulo": "Dev", "empresa": "Acme", "descricao": "x" * 1000}] * 1).inserted_ids
+    resumos = carregar_resumos.__wrapped__(db, "vagas", tuple(ids))
+    assert set(resumos[ids[0]]) == {"_id", "titulo", "empresa"}
+
+
+@pytest.fixture
+def pagina(db, monkeypatch):
+    monkeypatch.setattr(modulo_db, "get_database", lambda somente_leitura=False: db)
+    db.vagas.insert_many([
+        {"titulo": f"Dev Python {i}", "empresa": "Acme", "requisitos": "python " * (1 + i % 3), "descricao": "x",
+         "salario": f"R$ {1000 * (i + 1)}", "salario_max": 1000.0 * (i + 1), "salario_moeda": "BRL"}
+        for i in range(25)
+    ])
+    app = AppTest.from_file(PAGINA, default_timeout=30)
+    app.secrets["busca"] = {"backend": "bm25", "relevancia_minima": 0.0}
+    return app
+
+
+def test_resultados_aparecem_dez_por_vez(pagina):
+    pagina.run()
+    pagina.chat_input[0].set_value("python").run()
+    mensagem = pagina.session_state["messages"][-1]
+    assert len(mensagem["resultados"]) == 25
+    # O histórico guarda só referências (_id, score), não os documentos.
+    assert all(len(ref) == 2 for ref in mensagem["resultados"])
+    assert "Exibindo 10 de 25" in pagina.markdown[-1].value
+
+    pagina.button(key="mais_2").click().run()
+    assert "Exibindo 20 de 25" in pagina.markdown[-1].value
+
+
+def test_salario_minimo_e_ordem_por_salario(pagina):
+    pagina.run()
+    pagina.number_input[0].set_value(20000)
+    pagina.toggle[0].set_value(True)
+    pagina.chat_input[0].set_value("python").run()
+    mensagem = pagina.session_state["messages"][-1]
+    assert len(mensagem["resultados"]) == 6
+    assert mensagem["por_salario"]
+    assert "ordenados por salário" in pagina.markdown[-1].value
+    assert "Dev Python 24" in pagina.markdown[-1].value.split("###")[1]
+
+
+def test_historico_tem_tamanho_limitado(pagina):
+    pagina.run()
+    for i in range(25):
+        pagina.chat_input[0].set_value(f"termo{i}").run()
+    mensagens = pagina.session_state["messages"]
+    assert len(mensagens) == 41
+    assert mensagens[0]["role"] == "assistant"
+    assert mensagens[-2]["content"] == "termo24"
+
+
+def test_relevancia_minima_e_relativa_ao_melhor(pagina):
+    pagina.run()
+    pagina.slider[0].set_value(100)
+    pagina.chat_input[0].set_value("python").run()
+    resultados = pagina.session_state["messages"][-1]["resultados"]
+    melhor = resultados[0][1]
+    assert 0 < len(resultados) < 25
+    assert all(score == melhor for _, score in resultados)
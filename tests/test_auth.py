@@ -0,0 +1,136 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import auth
+
+
+@pytest.fixture(autouse=True)
+def custo_baixo(monkeypatch):
+    monkeypatch.setattr(auth, "_config", {"scrypt_n": 2 ** 10})
+    auth._tokens_validos.clear()
+    auth._revogados.clear()
+
+
+@pytest.fixture
+def usuarios(db):
+    db.usuarios.create_index("username", unique=True)
+    return db
+
+
+def test_hash_confere_so_a_senha_certa():
+    hash_senha = auth.gerar_hash_senha("s3nha")
+    assert hash_senha.startswith("scrypt$1024,8,1$")
+    assert auth.conferir_senha("s3nha", hash_senha)
+    assert not auth.conferir_senha("outra", hash_senha)
+    assert auth.gerar_hash_senha("s3nha") != hash_senha
+
+
+def test_parametros_ficam_no_hash(monkeypatch):
+    monkeypatch.setattr(auth, "_config", {"kdf": "pbkdf2", "pbkdf2_iteracoes": 1000})
+    hash_senha = auth.gerar_hash_senha("s3nha")
+    assert hash_senha.startswith("pbkdf2$1000$")
+    # Mudar o custo depois não invalida as senhas já gravadas.
+    monkeypatch.setattr(auth, "_config", {"kdf": "pbkdf2", "pbkdf2_iteracoes": 2000})
+    assert auth.conferir_senha("s3nha", hash_senha)
+
+
+@pytest.mark.parametrize("hash_invalido", ["", "texto-puro", "scrypt$x$y$z", "pbkdf2$10$!!$!!"])
+def test_hash_malformado_nao_autentica(hash_invalido):
+    assert auth.conferir_senha("s3nha", hash_invalido) is False
+
+
+def test_cadastro_duplicado_devolve_none(usuarios):
+    assert auth.cadastrar_usuario(usuarios, "Ana", "ana", "s3nha", "candidato") is not None
+    assert auth.cadastrar_usuario(usuarios, "Outra Ana", "ana", "x", "empresa") is None
+    assert usuarios.usuarios.count_documents({}) == 1
+    assert "senha" not in usuarios.usuarios.find_one()
+
+
+def test_login_confere_o_hash(usuarios):
+    auth.cadastrar_usuario(usuarios, "Ana", "ana", "s3nha", "candidato")
+    assert auth.verificar_login(usuarios, "ana", "s3nha")["nome"] == "Ana"
+    assert auth.verificar_login(usuarios, "ana", "errada") is None
+    assert auth.verificar_login(usuarios, "bia", "s3nha") is None
+
+
+def test_senha_antiga_em_texto_puro_migra_no_login(usuarios):
+    usuarios.usuarios.insert_one({"nome": "Bia", "username": "bia", "senha": "antiga", "role": "empresa"})
+    assert auth.verificar_login(usuarios, "bia", "errada") is None
+    assert "senha" in usuarios.usuarios.find_one({"username": "bia"})
+
+    assert auth.verificar_login(usuarios, "bia", "antiga") is not None
+    migrado = usuarios.usuarios.find_one({"username": "bia"})
+    assert "senha" not in migrado
+    assert auth.verificar_login(usuarios, "bia", "antiga") is not None
+
+
+def _usuario():
+    return {"_id": ObjectId(), "username": "ana", "nome": "Ana", "role": "candidato"}
+
+
+def test_token_valido_traz_o_usuario():
+    usuario = _usuario()
+    dados = auth.validar_token(auth.emitir_token(usuario))
+    assert dados["username"] == "ana"
+    assert auth.id_usuario(dados) == usuario["_id"]
+
+
+def test_token_adulterado_e_rejeitado():
+    corpo, assinatura = auth.emitir_token(_usuario()).split(".")
+    outro_corpo = auth.emitir_token({**_usuario(), "role": "admin"}).split(".")[0]
+    assert auth.validar_token(f"{outro_corpo}.{assinatura}") is None
+    assert auth.validar_token(corpo) is None
+    assert auth.validar_token("") is None
+
+
+def test_token_expirado_encerra_a_sessao(monkeypatch):
+    token = auth.emitir_token(_usuario(), validade=60)
+    sessao = {"token": token, "logged_in": True, "user_role": "candidato", "user_name": "Ana"}
+    assert auth.sessao_atual(sessao)["nome"] == "Ana"
+
+    agora = auth.time.time()
+    monkeypatch.setattr(auth.time, "time", lambda: agora + 120)
+    assert auth.sessao_atual(sessao) is None
+    assert sessao == {"token": None, "logged_in": False, "user_role": None, "user_name": None}
+    assert token not in auth._tokens_validos
+
+
+def test_cache_de_tokens_tem_capacidade_limitada(monkeypatch):
+    monkeypatch.setattr(auth, "CAPACIDADE_CACHE_TOKENS", 3)
+    tokens = [auth.emitir_token({**_usuario(), "username": f"u{i}"}) for i in range(5)]
+    for token in tokens:
+        assert auth.validar_token(token) is not None
+    assert list(auth._tokens_validos) == tokens[2:]
+
+
+def test_token_revogado_nao_vale_mais_nem_depois_de_sair_do_cache(db):
+    token = auth.emitir_token(_usuario())
+    assert auth.validar_token(token, db) is not None
+    auth.revogar_token(token, db)
+    assert auth.validar_token(token, db) is None
+    # Outra réplica (sem o token no cache nem na lista local) consulta o banco.
+    auth._tokens_validos.clear()
+    auth._revogados.clear()
+    assert auth.validar_token(token, db) is None
+    revogado = db.tokens_revogados.find_one()
+    assert revogado["expira_em"] > datetime.now()
+
+
+def test_revogacao_em_outra_replica_vale_na_proxima_conferencia(db, monkeypatch):
+    token = auth.emitir_token(_usuario())
+    assert auth.validar_token(token, db) is not None
+    db.tokens_revogados.insert_one({"_id": auth._chave_revogacao(token), "expira_em": datetime.now()})
+    # Dentro do intervalo o rerun não vai ao banco; depois dele, o token cai.
+    assert auth.validar_token(token, db) is not None
+    monkeypatch.setattr(auth, "INTERVALO_REVOGACAO", -1)
+    assert auth.validar_token(token, db) is None
+
+
+def test_sessao_revogada_e_encerrada(db):
+    token = auth.emitir_token(_usuario())
+    auth.revogar_token(token, db)
+    sessao = {"logged_in": True, "token": token, "user_name": "Ana", "user_role": "candidato"}
+    assert auth.sessao_atual(sessao, db) is None
+    assert sessao["logged_in"] is False
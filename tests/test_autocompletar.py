@@ -0,0 +1,71 @@
+import pickle
+
+import autocompletar
+from autocompletar import IndicePrefixos, extrair_termos, normalizar_termo, sugerir, sugerir_termos
+from cache import registrar_escrita
+
+
+def test_normalizar_ignora_acento_caixa_e_espacos():
+    assert normalizar_termo("  Gestão   de Projetos. ") == "gestao de projetos"
+
+
+def test_extrair_termos_separa_listas_e_descarta_prosa():
+    assert extrair_termos("requisitos", "Python, Django; SQL\n• Docker") == ["Python", "Django", "SQL", "Docker"]
+    assert extrair_termos("requisitos", "Experiência comprovada com sistemas distribuídos em produção") == []
+    assert extrair_termos("titulo", "Dev Python, Django") == ["Dev Python, Django"]
+    assert extrair_termos("skills", None) == []
+
+
+def test_completar_ordena_por_frequencia_e_usa_a_grafia_mais_comum():
+    indice = IndicePrefixos()
+    indice.adicionar(1, ["Python", "PostgreSQL"])
+    indice.adicionar(2, ["python", "PostgreSQL"])
+    indice.adicionar(3, ["Python", "Pandas"])
+    # Empates saem na ordem alfabética dos termos normalizados.
+    assert indice.completar("p", k=2) == ["Python", "PostgreSQL"]
+    assert indice.completar("pa") == ["Pandas"]
+    assert indice.completar("PÓS") == ["PostgreSQL"]
+    assert indice.completar("x") == []
+
+
+def test_remover_e_readicionar_atualizam_o_resultado_memorizado():
+    indice = IndicePrefixos()
+    indice.adicionar(1, ["Java"])
+    indice.adicionar(2, ["JavaScript"])
+    assert indice.completar("jav") == ["Java", "JavaScript"]
+    indice.adicionar(1, ["Go"])
+    assert indice.completar("jav") == ["JavaScript"]
+    indice.remover(2)
+    assert indice.completar("jav") == []
+    assert len(indice) == 1
+
+
+def test_indice_sobrevive_ao_pickle_do_cache_compartilhado():
+    indice = IndicePrefixos()
+    indice.adicionar(1, ["Kotlin"])
+    copia = pickle.loads(pickle.dumps(indice))
+    assert copia.completar("ko") == ["Kotlin"]
+    copia.adicionar(2, ["Kubernetes"])
+    assert copia.completar("k") == ["Kotlin", "Kubernetes"]
+
+
+def test_sugerir_junta_as_colecoes_da_categoria(db):
+    db.vagas.insert_many([{"requisitos": "Python, SQL"}, {"requisitos": "Python"}])
+    db.candidatos.insert_one({"skills": "Scrum, Python"})
+    assert sugerir(db, "skills", "s") == ["Scrum", "SQL"]
+    assert sugerir(db, "skills", "py") == ["Python"]
+
+
+def test_escrita_do_app_entra_no_indice_ja_construido(db):
+    sugerir(db, "titulos", "ger")
+    vaga = {"titulo": "Gerente de Projetos"}
+    vaga["_id"] = db.vagas.insert_one(vaga).inserted_id
+    registrar_escrita("vagas", vaga)
+    assert sugerir(db, "titulos", "gerente de proj") == ["Gerente de Projetos"]
+    assert "titulos" in autocompletar._indices
+
+
+def test_sugerir_termos_completa_a_ultima_palavra(db):
+    db.vagas.insert_one({"titulo": "Desenvolvedor"})
+    assert sugerir_termos(db, "titulos", "vaga de desenv") == ["Desenvolvedor"]
+    assert sugerir_termos(db, "titulos", "   ") == []
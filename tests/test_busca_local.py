@@ -0,0 +1,69 @@
+from busca_local import IndiceBM25, buscar, construir_indice
+
+PESOS = {"titulo": 3.0, "descricao": 1.0}
+
+
+def _indice(*documentos):
+    indice = IndiceBM25(PESOS, ["titulo"])
+    for doc_id, documento in enumerate(documentos):
+        indice.adicionar(doc_id, documento)
+    return indice
+
+
+def test_consulta_vazia_ou_sem_documentos():
+    assert _indice().buscar("python") == []
+    assert _indice({"titulo": "Dev Python"}).buscar("de para") == []
+
+
+def test_termo_raro_pesa_mais_que_termo_comum():
+    indice = _indice(
+        {"titulo": "Dev", "descricao": "python"},
+        {"titulo": "Dev", "descricao": "python rust"},
+        {"titulo": "Dev", "descricao": "python"},
+    )
+    resultado = indice.buscar("python rust")
+    assert resultado[0]["_id"] == 1
+
+
+def test_peso_do_campo_vale_mais_que_a_descricao():
+    indice = _indice(
+        {"titulo": "Analista", "descricao": "experiencia com python"},
+        {"titulo": "Dev Python", "descricao": "experiencia com backend"},
+    )
+    assert [r["_id"] for r in indice.buscar("python")] == [1, 0]
+
+
+def test_documento_curto_ganha_de_documento_longo():
+    indice = _indice(
+        {"titulo": "", "descricao": "python " + "outro texto qualquer " * 20},
+        {"titulo": "", "descricao": "python"},
+    )
+    assert indice.buscar("python")[0]["_id"] == 1
+
+
+def test_resultado_traz_campos_de_exibicao_e_respeita_k():
+    indice = _indice(*({"titulo": f"Dev Python {i}", "descricao": "x"} for i in range(5)))
+    resultado = indice.buscar("python", k=2)
+    assert len(resultado) == 2
+    assert set(resultado[0]) == {"_id", "titulo", "score"}
+
+
+def test_remover_e_readicionar_mantem_o_indice_consistente():
+    indice = _indice({"titulo": "Dev Python"}, {"titulo": "Dev Java"})
+    indice.remover(0)
+    assert len(indice) == 1
+    assert indice.buscar("python") == []
+    assert "python" not in indice._postings
+    indice.adicionar(1, {"titulo": "Dev Go"})
+    assert indice.buscar("java") == []
+    assert indice._soma_comprimentos == sum(indice._comprimentos.values())
+
+
+def test_construir_e_buscar_no_banco(db):
+    db.vagas.insert_many([
+        {"titulo": "Engenheiro de Dados", "empresa": "Acme", "requisitos": "spark", "descricao": "pipelines"},
+        {"titulo": "Designer", "empresa": "Beta", "requisitos": "figma", "descricao": "interfaces"},
+    ])
+    assert len(construir_indice(db, "vagas")) == 2
+    resultado = buscar(db, "vagas", "spark")
+    assert [r["empresa"] for r in resultado] == ["Acme"]
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+import busca_semantica
+from busca_semantica import (
+    BuscaSemantica,
+    IndiceIVF,
+    IndiceSemanticoAusente,
+    VetorizadorHashing,
+    fundir_rrf,
+    obter_busca,
+)
+
+TITULOS = ["Dev Python", "Designer UX", "Engenheiro de Dados Spark", "Analista Financeiro", "Dev Java"]
+
+
+@pytest.fixture
+def diretorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(busca_semantica, "_configuracao", lambda: {"diretorio_indices": str(tmp_path)})
+    monkeypatch.setattr(busca_semantica, "_buscas", {})
+    return str(tmp_path)
+
+
+def _semear(db, titulos=TITULOS):
+    db.vagas.insert_many([{"titulo": titulo, "requisitos": titulo.lower()} for titulo in titulos])
+
+
+def test_rrf_soma_as_posicoes_dos_rankings():
+    textual = [{"_id": "a"}, {"_id": "b"}, {"_id": "c"}]
+    semantico = [{"_id": "b"}, {"_id": "d"}]
+    fundido = fundir_rrf(textual, semantico, k=60)
+    assert [item["_id"] for item in fundido] == ["b", "a", "d", "c"]
+    assert fundido[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_rrf_respeita_o_limite_e_mantem_o_primeiro_documento():
+    fundido = fundir_rrf([{"_id": "a", "origem": "texto"}], [{"_id": "a", "origem": "vetor"}], limite=1)
+    assert fundido == [{"_id": "a", "origem": "texto", "score": pytest.approx(2 / 61)}]
+
+
+def test_vetorizador_e_deterministico_e_normalizado():
+    vetorizador = VetorizadorHashing(64)
+    a, b = vetorizador.vetorizar(["Dev Python", "Dev Python"])
+    assert np.array_equal(a, b)
+    assert np.linalg.norm(a) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_construcao_vai_ate_o_fim_do_cursor(db, diretorio, monkeypatch):
+    _semear(db)
+    # Contagem estimada defasada (menor que a coleção): não pode cortar documentos.
+    monkeypatch.setattr(type(db.vagas), "estimated_document_count", lambda self, **kw: 2)
+    indice = IndiceIVF(diretorio, "vagas").construir(db, VetorizadorHashing(64), tamanho_lote=2)
+    assert indice.meta["documentos"] == len(TITULOS)
+    assert len(indice.vetores) == len(TITULOS)
+    assert not [nome for nome in os.listdir(diretorio) if ".tmp" in nome]
+
+
+def test_busca_encontra_o_documento_mais_parecido(db, diretorio):
+    _semear(db)
+    IndiceIVF(diretorio, "vagas").construir(db, VetorizadorHashing(128))
+    resultados = busca_semantica.buscar(db, "vagas", "engenheiro de dados", k=3)
+    assert resultados[0]["titulo"] == "Engenheiro de Dados Spark"
+
+
+def test_colecao_vazia_gera_indice_vazio(db, diretorio):
+    IndiceIVF(diretorio, "vagas").construir(db, VetorizadorHashing(64))
+    assert busca_semantica.buscar(db, "vagas", "python") == []
+
+
+def test_sem_indice_construido_avisa_em_vez_de_devolver_so_o_delta(db, diretorio):
+    busca = obter_busca("vagas")
+    busca.adicionar({"_id": ObjectId(), "titulo": "Dev Python"})
+    with pytest.raises(IndiceSemanticoAusente, match="python busca_semantica.py vagas"):
+        busca_semantica.buscar(db, "vagas", "python")
+
+
+def test_reconstrucao_e_carregada_na_consulta_seguinte(db, diretorio):
+    _semear(db, TITULOS[:2])
+    IndiceIVF(diretorio, "vagas").construir(db, VetorizadorHashing(64))
+    antiga = obter_busca("vagas")
+    assert antiga.indice.meta["documentos"] == 2
+    assert obter_busca("vagas") is antiga
+
+    _semear(db, TITULOS[2:])
+    IndiceIVF(diretorio, "vagas").construir(db, VetorizadorHashing(64))
+    # Garante uma data diferente mesmo em sistemas de arquivos com resolução grossa.
+    meta = os.path.join(diretorio, "vagas_meta.json")
+    os.utime(meta, ns=(antiga.versao + 10**9, antiga.versao + 10**9))
+    nova = obter_busca("vagas")
+    assert nova is not antiga
+    assert nova.indice.meta["documentos"] == len(TITULOS)
+
+
+def test_reconstrucao_herda_so_as_escritas_recentes(diretorio):
+    antiga = BuscaSemantica("vagas", diretorio)
+    antiga._delta = {"velha": (100.0, np.zeros(1)), "recente": (300.0, np.zeros(1))}
+    nova = BuscaSemantica("vagas", diretorio)
+    nova.indice.meta = {"inicio_construcao": 200.0}
+    nova.herdar_delta(antiga)
+    assert set(nova._delta) == {"recente"}
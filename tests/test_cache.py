@@ -0,0 +1,83 @@
+import mongomock
+
+import cache
+from cache import CacheConsultas, cache_consulta, ouvir_escritas, registrar_escrita
+
+
+def _contador():
+    chamadas = []
+
+    @cache_consulta("vagas", ttl=60)
+    def consulta(db, *args, **kwargs):
+        chamadas.append((args, kwargs))
+        return len(chamadas)
+
+    return consulta, chamadas
+
+
+def test_repete_o_resultado_para_os_mesmos_argumentos(db):
+    consulta, chamadas = _contador()
+    assert consulta(db, 1) == consulta(db, 1) == 1
+    assert consulta(db, 2) == 2
+    assert consulta(db, 1, ordem="x") == 3
+    assert len(chamadas) == 3
+
+
+def test_escrita_na_colecao_invalida(db):
+    consulta, chamadas = _contador()
+    consulta(db)
+    registrar_escrita("candidatos")
+    consulta(db)
+    assert len(chamadas) == 1
+    registrar_escrita("vagas")
+    consulta(db)
+    assert len(chamadas) == 2
+
+
+def test_bancos_diferentes_nao_compartilham_entradas(db):
+    consulta, chamadas = _contador()
+    consulta(db)
+    consulta(mongomock.MongoClient().outro_banco)
+    assert len(chamadas) == 2
+
+
+def test_argumentos_sem_hash_passam_direto(db):
+    consulta, chamadas = _contador()
+    consulta(db, [1, 2])
+    consulta(db, [1, 2])
+    assert len(chamadas) == 2
+
+
+def test_ttl_expira(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: agora[0])
+    interno = CacheConsultas()
+    interno.guardar("vagas", "k", "v", ttl=10)
+    assert interno.obter("vagas", "k") == (True, "v")
+    agora[0] += 11
+    assert interno.obter("vagas", "k") == (False, None)
+    assert interno.estatisticas()["por_colecao"]["vagas"]["expirados"] == 1
+
+
+def test_lru_remove_o_menos_usado():
+    interno = CacheConsultas(capacidade=2)
+    interno.guardar("vagas", "a", 1, ttl=60)
+    interno.guardar("vagas", "b", 2, ttl=60)
+    interno.obter("vagas", "a")
+    interno.guardar("vagas", "c", 3, ttl=60)
+    assert interno.obter("vagas", "b") == (False, None)
+    assert interno.obter("vagas", "a") == (True, 1)
+
+
+def test_ouvintes_recebem_as_escritas():
+    recebidas = []
+
+    def ouvinte(colecao, documento):
+        recebidas.append((colecao, documento))
+
+    ouvir_escritas(ouvinte)
+    try:
+        registrar_escrita("vagas", {"_id": 1})
+    finally:
+        cache._ouvintes.remove(ouvinte)
+    assert recebidas == [("vagas", {"_id": 1})]
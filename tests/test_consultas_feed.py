@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from consultas import ORDENS_FEED, carregar_facetas, carregar_pagina_vagas, filtro_facetas, filtro_salario
+
+INICIO = datetime(2026, 1, 1)
+TIPOS = ["Remoto", "Híbrido", "Presencial"]
+
+
+@pytest.fixture
+def vagas(db):
+    documentos = []
+    for i in range(12):
+        documentos.append({
+            "titulo": f"Vaga {i}",
+            "empresa": "Acme" if i % 2 else "Beta",
+            "tipo": TIPOS[i % 3],
+            "senioridade": "Pleno",
+            "geo": {"cidade": "curitiba" if i < 4 else "recife"},
+            "salario_max": 1000.0 * i if i % 4 else None,
+            "salario_moeda": "BRL" if i % 4 else None,
+            "descricao": "x",
+            "data_criacao": INICIO + timedelta(days=i),
+        })
+    db.vagas.insert_many(documentos)
+    return documentos
+
+
+def _titulos(vagas):
+    return [vaga["titulo"] for vaga in vagas]
+
+
+def test_filtros_viram_campos_da_vaga():
+    assert filtro_facetas([("cidade", "recife"), ("tipo", "Remoto"), ("empresa", "")]) == {
+        "geo.cidade": "recife", "tipo": "Remoto"}
+    assert filtro_salario(3000) == {"salario_moeda": "BRL", "salario_max": {"$gte": 3000.0}}
+    assert filtro_salario() == {"salario_moeda": "BRL", "salario_max": {"$gte": 0.0}}
+
+
+def test_paginas_com_faceta_seguem_pelo_cursor(db, vagas):
+    facetas = (("cidade", "recife"), ("empresa", "Acme"))
+    primeira, cursor = carregar_pagina_vagas.__wrapped__(db, limite=2, facetas=facetas)
+    segunda, fim = carregar_pagina_vagas.__wrapped__(db, cursor, limite=2, facetas=facetas)
+    assert _titulos(primeira) == ["Vaga 11", "Vaga 9"]
+    assert _titulos(segunda) == ["Vaga 7", "Vaga 5"]
+    assert fim is None
+
+
+def test_ordem_por_salario_deixa_de_fora_quem_nao_informou(db, vagas):
+    pagina, cursor = carregar_pagina_vagas.__wrapped__(db, limite=3, ordem="salario")
+    assert _titulos(pagina) == ["Vaga 11", "Vaga 10", "Vaga 9"]
+    assert cursor == (9000.0, pagina[-1]["_id"])
+    resto, _ = carregar_pagina_vagas.__wrapped__(db, cursor, limite=20, ordem="salario")
+    assert "Vaga 8" not in _titulos(resto) and len(resto) == 6
+    assert set(ORDENS_FEED) == {"recentes", "salario"}
+
+
+def test_salario_minimo_combina_com_as_facetas(db, vagas):
+    pagina, _ = carregar_pagina_vagas.__wrapped__(db, salario_minimo=5000, facetas=(("tipo", "Remoto"),))
+    assert _titulos(pagina) == ["Vaga 9", "Vaga 6"]
+
+
+def test_faceta_conta_sem_o_proprio_filtro(db, vagas):
+    opcoes = carregar_facetas.__wrapped__(db, facetas=(("tipo", "Remoto"), ("cidade", "curitiba")))
+    # Tipo conta só com a cidade escolhida; cidade conta só com o tipo escolhido.
+    assert dict(opcoes["tipo"]) == {"Remoto": 2, "Híbrido": 1, "Presencial": 1}
+    assert dict(opcoes["cidade"]) == {"recife": 2, "curitiba": 2}
+    assert dict(opcoes["empresa"]) == {"Beta": 1, "Acme": 1}
+
+
+def test_facetas_respeitam_o_salario_e_ordenam_pelo_total(db, vagas):
+    opcoes = carregar_facetas.__wrapped__(db, salario_minimo=1)
+    assert opcoes["cidade"] == [("recife", 6), ("curitiba", 3)]
+    assert opcoes["senioridade"] == [("Pleno", 9)]
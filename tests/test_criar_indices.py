@@ -0,0 +1,176 @@
+import pytest
+
+import criar_indices
+from criar_indices import _assinatura, _assinatura_existente, aplicar, planejar
+
+MANIFESTO = [
+    ("vagas", "busca", [("titulo", "text"), ("descricao", "text")], {}),
+    ("vagas", "feed", [("data_criacao", -1), ("_id", -1)], {}),
+    ("usuarios", "login", [("username", 1)], {"unique": True}),
+]
+
+
+class ColecaoFalsa:
+    def __init__(self, nome, indices, chamadas):
+        self.name = nome
+        self.indices = indices
+        self.chamadas = chamadas
+
+    def list_indexes(self):
+        return [{"name": "_id_", "key": {"_id": 1}}, *self.indices]
+
+    def create_index(self, chaves, name, **opcoes):
+        self.chamadas.append(("criar", self.name, name))
+        if name == "falha":
+            raise RuntimeError("build interrompido")
+
+    def drop_index(self, nome):
+        self.chamadas.append(("remover", self.name, nome))
+
+
+class BancoFalso(dict):
+    def __init__(self, **indices):
+        super().__init__()
+        self.chamadas = []
+        for colecao in ("vagas", "usuarios"):
+            self[colecao] = ColecaoFalsa(colecao, indices.get(colecao, []), self.chamadas)
+
+
+def _texto(nome, *campos):
+    # Formato em que o servidor lista um índice de texto.
+    return {"name": nome, "key": {"_fts": "text", "_ftsx": 1}, "weights": {c: 1 for c in campos},
+            "default_language": "english"}
+
+
+EM_DIA = {
+    "vagas": [_texto("busca", "titulo", "descricao"), {"name": "feed", "key": {"data_criacao": -1, "_id": -1}}],
+    "usuarios": [{"name": "login", "key": {"username": 1}, "unique": True}],
+}
+
+
+@pytest.fixture(autouse=True)
+def manifesto(monkeypatch):
+    monkeypatch.setattr(criar_indices, "MANIFESTO", MANIFESTO)
+
+
+def _por_nome(plano):
+    return {passo["nome"]: passo for passo in plano if "nome" in passo}
+
+
+def test_assinatura_do_manifesto_bate_com_a_do_servidor():
+    assert _assinatura(MANIFESTO[0][2], {}) == _assinatura_existente(EM_DIA["vagas"][0])
+    assert _assinatura([("x", 1)], {}) == _assinatura_existente({"key": {"x": 1.0}})
+    assert _assinatura([("x", 1)], {"unique": True}) != _assinatura_existente({"key": {"x": 1}})
+
+
+def test_banco_vazio_cria_tudo_com_o_nome_do_manifesto():
+    plano = _por_nome(planejar(BancoFalso()))
+    assert {passo["acao"] for passo in plano.values()} == {"criar"}
+    assert all(passo["nome_novo"] == nome and not passo["conflitos"] for nome, passo in plano.items())
+
+
+def test_banco_em_dia_nao_muda_nada():
+    plano = planejar(BancoFalso(**EM_DIA))
+    assert {passo["acao"] for passo in plano} == {"manter"}
+    assert not any(passo["remover"] for passo in plano)
+
+
+def test_indice_equivalente_com_outro_nome_e_mantido():
+    banco = BancoFalso(vagas=[EM_DIA["vagas"][0], {"name": "antigo_feed", "key": {"data_criacao": -1, "_id": -1}}])
+    passo = _por_nome(planejar(banco))["feed"]
+    assert (passo["acao"], passo["atual"]) == ("manter", "antigo_feed")
+
+
+def test_chaves_novas_constroem_ao_lado_e_removem_o_antigo_depois():
+    banco = BancoFalso(vagas=[EM_DIA["vagas"][0], {"name": "feed", "key": {"data_criacao": -1}}])
+    passo = _por_nome(planejar(banco))["feed"]
+    assert passo["acao"] == "criar"
+    assert passo["nome_novo"].startswith("feed__")
+    assert passo["conflitos"] == []
+    assert passo["remover"] == ["feed"]
+
+
+def test_mesmas_chaves_com_outras_opcoes_passam_por_uma_ponte():
+    banco = BancoFalso(usuarios=[{"name": "login", "key": {"username": 1}}])
+    passo = _por_nome(planejar(banco))["login"]
+    assert (passo["nome_novo"], passo["conflitos"], passo["remover"]) == ("login", ["login"], ["login__ponte"])
+    assert passo["pontes"] == [{"nome": "login__ponte", "chaves": [("username", 1), ("_id", 1)], "opcoes": {}}]
+
+
+def test_filtro_parcial_diferente_constroi_ao_lado(monkeypatch):
+    monkeypatch.setattr(criar_indices, "MANIFESTO", [
+        ("usuarios", "login", [("username", 1)], {"unique": True, "partialFilterExpression": {"ativo": True}}),
+    ])
+    banco = BancoFalso(usuarios=EM_DIA["usuarios"])
+    passo = _por_nome(planejar(banco))["login"]
+    assert passo["conflitos"] == [] and passo["pontes"] == []
+    assert passo["nome_novo"].startswith("login__")
+    assert passo["remover"] == ["login"]
+
+
+def test_ponte_fica_pronta_antes_de_o_antigo_sair():
+    banco = BancoFalso(vagas=EM_DIA["vagas"], usuarios=[{"name": "login", "key": {"username": 1}}])
+    assert aplicar(banco, planejar(banco)) == 0
+    assert banco.chamadas == [
+        ("criar", "usuarios", "login__ponte"),
+        ("remover", "usuarios", "login"),
+        ("criar", "usuarios", "login"),
+        ("remover", "usuarios", "login__ponte"),
+    ]
+
+
+def test_so_um_indice_de_texto_por_colecao():
+    banco = BancoFalso(vagas=[_texto("busca_antiga", "titulo")])
+    passo = _por_nome(planejar(banco))["busca"]
+    assert passo["conflitos"] == ["busca_antiga"]
+    assert passo["pontes"] == []
+
+
+def test_extras_so_saem_com_a_opcao():
+    indices = {**EM_DIA, "usuarios": EM_DIA["usuarios"] + [{"name": "sobrando", "key": {"nome": 1}}]}
+    extras = [passo for passo in planejar(BancoFalso(**indices)) if passo["acao"] == "extras"]
+    assert extras == [{"colecao": "usuarios", "acao": "extras", "remover": [], "nomes": ["sobrando"]}]
+    extras = [passo for passo in planejar(BancoFalso(**indices), remover_extras=True) if passo["acao"] == "extras"]
+    assert extras[0]["remover"] == ["sobrando"]
+
+
+def test_aplicar_remove_o_antigo_so_depois_do_novo():
+    banco = BancoFalso(vagas=[EM_DIA["vagas"][0], {"name": "feed", "key": {"data_criacao": -1}}], usuarios=EM_DIA["usuarios"])
+    assert aplicar(banco, planejar(banco)) == 0
+    criacao = next(i for i, c in enumerate(banco.chamadas) if c[0] == "criar")
+    assert banco.chamadas[criacao + 1:] == [("remover", "vagas", "feed")]
+
+
+def test_falha_no_build_mantem_o_indice_antigo():
+    banco = BancoFalso()
+    plano = [{"colecao": "vagas", "nome": "feed", "acao": "criar", "chaves": [("x", 1)], "opcoes": {},
+              "nome_novo": "falha", "conflitos": [], "pontes": [], "remover": ["feed_antigo"]}]
+    assert aplicar(banco, plano) == 1
+    assert banco.chamadas == [("criar", "vagas", "falha")]
+
+
+def test_manifesto_do_app_nao_repete_nomes():
+    from indices import MANIFESTO as manifesto_app
+
+    nomes = [(colecao, nome) for colecao, nome, *_ in manifesto_app]
+    assert len(nomes) == len(set(nomes))
+    assert sum(1 for _, _, chaves, _ in manifesto_app if any(t == "text" for _, t in chaves)) == 2
+
+
+def test_toda_consulta_do_app_tem_indice_no_manifesto(monkeypatch):
+    from indices import CONSULTAS
+    from indices import MANIFESTO as manifesto_app
+
+    monkeypatch.setattr(criar_indices, "MANIFESTO", manifesto_app)
+    sem_indice = [descricao for descricao, colecao, filtro, ordenacao in CONSULTAS
+                  if not criar_indices.indices_elegiveis(colecao, filtro, ordenacao)]
+    assert sem_indice == []
+
+
+def test_indice_parcial_nao_serve_a_consulta_sem_o_campo_do_filtro(monkeypatch):
+    parcial = {"unique": True, "partialFilterExpression": {"vaga_id": {"$exists": True}, "candidato_id": {"$exists": True}}}
+    monkeypatch.setattr(criar_indices, "MANIFESTO", [
+        ("aplicacoes", "aplicacoes_vaga_candidato", [("vaga_id", 1), ("candidato_id", 1)], parcial),
+    ])
+    assert criar_indices.indices_elegiveis("aplicacoes", {"vaga_id": 1}) == []
+    assert criar_indices.indices_elegiveis("aplicacoes", {"vaga_id": 1, "candidato_id": 2}) == ["aplicacoes_vaga_candidato"]
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from pymongo import ReadPreference
+from pymongo.errors import ServerSelectionTimeoutError
+
+import db as modulo_db
+
+
+@pytest.fixture
+def st_falso(monkeypatch):
+    erros = []
+    falso = SimpleNamespace(
+        secrets={"mongo": {"uri": "mongodb://exemplo", "maxPoolSize": 5, "read_preference_leitura": "nearest"}},
+        error=erros.append,
+        erros=erros,
+    )
+    monkeypatch.setattr(modulo_db, "st", falso)
+    monkeypatch.setattr(modulo_db, "_falha", {"quando": None, "erro": None})
+    return falso
+
+
+def test_configuracao_completa_os_padroes(st_falso):
+    uri, opcoes, preferencia = modulo_db._configuracao_mongo()
+    assert uri == "mongodb://exemplo"
+    assert opcoes["maxPoolSize"] == 5
+    assert opcoes["serverSelectionTimeoutMS"] == modulo_db.OPCOES_PADRAO["serverSelectionTimeoutMS"]
+    assert "read_preference_leitura" not in opcoes
+    assert preferencia == "nearest"
+
+
+def test_leitura_usa_a_preferencia_configurada(st_falso, monkeypatch):
+    monkeypatch.setattr(modulo_db, "_conectar", lambda: mongomock.MongoClient())
+    assert modulo_db.get_database().name == modulo_db.NOME_BANCO
+    assert modulo_db.get_database(somente_leitura=True).read_preference == ReadPreference.NEAREST
+
+
+def test_falha_nao_fica_em_cache_e_espera_o_intervalo(st_falso, monkeypatch):
+    chamadas = []
+
+    def conectar():
+        chamadas.append(1)
+        if len(chamadas) == 1:
+            raise ServerSelectionTimeoutError("fora do ar")
+        return mongomock.MongoClient()
+
+    agora = [1000.0]
+    monkeypatch.setattr(modulo_db, "_conectar", conectar)
+    monkeypatch.setattr(modulo_db.time, "monotonic", lambda: agora[0])
+
+    assert modulo_db.get_database() is None
+    # Dentro do intervalo, o mesmo rerun não tenta conectar de novo.
+    assert modulo_db.get_database() is None
+    assert len(chamadas) == 1
+    assert len(st_falso.erros) == 2
+
+    agora[0] += modulo_db.INTERVALO_RECONEXAO + 1
+    assert modulo_db.get_database() is not None
+    assert len(chamadas) == 2
+    assert modulo_db._falha["quando"] is None
+
+
+def test_monitor_pool_conta_conexoes_por_servidor():
+    monitor = modulo_db.MonitorPool()
+    evento = SimpleNamespace(address=("db1", 27017))
+    monitor.pool_created(evento)
+    monitor.connection_created(evento)
+    monitor.connection_created(evento)
+    monitor.connection_checked_out(evento)
+    monitor.connection_checked_in(evento)
+    monitor.connection_checked_out(evento)
+    monitor.connection_closed(evento)
+    monitor.connection_check_out_failed(evento)
+    assert monitor.estatisticas() == {"db1:27017": {
+        "abertas": 1, "em_uso": 1, "checkouts": 2, "falhas_checkout": 1, "pool_limpo": 0,
+    }}
@@ -0,0 +1,80 @@
+import os
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from streamlit.testing.v1 import AppTest
+
+import ao_vivo
+import consultas
+import db as modulo_db
+from auth import emitir_token
+
+PAGINA = os.path.join(os.path.dirname(__file__), "..", "src", "pages", "2_🏢_Empregador.py")
+ID_VAGA = ObjectId()
+
+
+def _vaga(candidatos):
+    candidaturas = [{"candidato_username": f"Candidato {i}", "data_aplicacao": datetime(2026, 1, 1)} for i in range(candidatos)]
+    return {"_id": ID_VAGA, "titulo": "Dev Python", "local": "Remoto", "salario": "A combinar", "descricao": "x",
+            "requisitos": "Python", "data_criacao": datetime(2026, 1, 1), "candidaturas": candidaturas,
+            "qtd_candidatos": candidatos}
+
+
+class MonitorFalso:
+    def __init__(self, total):
+        self.total = total
+
+    def contagens(self, ids_vagas):
+        return {i: self.total for i in ids_vagas}
+
+
+@pytest.fixture
+def pagina(db, monkeypatch):
+    # O painel cacheado ainda tem 1 candidatura; o monitor já contou 3 e o banco também tem 3.
+    leituras = {"cache": 0, "banco": 0}
+
+    def painel_cacheado(db, usuario):
+        leituras["cache"] += 1
+        return [_vaga(1)]
+
+    def vaga_cacheada(db, usuario, id_vaga):
+        leituras["cache"] += 1
+        return _vaga(1)
+
+    def vaga_do_banco(db, usuario, id_vaga):
+        leituras["banco"] += 1
+        return _vaga(3)
+
+    vaga_cacheada.__wrapped__ = vaga_do_banco
+    monkeypatch.setattr(modulo_db, "get_database", lambda somente_leitura=False: db)
+    monkeypatch.setattr(consultas, "carregar_painel_empregador", painel_cacheado)
+    monkeypatch.setattr(consultas, "carregar_vaga_empregador", vaga_cacheada)
+    monkeypatch.setattr(consultas, "carregar_recomendacoes", lambda db, tipo, ids: {})
+    monkeypatch.setattr(ao_vivo, "obter_monitor", lambda db: MonitorFalso(3))
+
+    app = AppTest.from_file(PAGINA, default_timeout=30)
+    usuario = {"_id": ObjectId(), "username": "acme", "nome": "Acme", "role": "empregador"}
+    app.session_state["logged_in"] = True
+    app.session_state["user_role"] = "empregador"
+    app.session_state["user_name"] = "Acme"
+    app.session_state["token"] = emitir_token(usuario)
+    app.leituras = leituras
+    return app
+
+
+def test_contagem_e_lista_saem_da_mesma_leitura(pagina):
+    pagina.run()
+    metrica = pagina.metric[0]
+    assert metrica.value == "1"
+    assert metrica.delta == "+2 nova(s)"
+    assert pagina.expander[0].label.startswith("👥 Ver 1 Currículo")
+
+
+def test_atualizar_le_a_vaga_sem_o_cache(pagina):
+    pagina.run()
+    pagina.button(key=f"btn_atualizar_{ID_VAGA}").click().run()
+    assert pagina.leituras["banco"] == 1
+    metrica = pagina.metric[0]
+    assert (metrica.value, metrica.delta) == ("3", "")
+    assert pagina.expander[0].label.startswith("👥 Ver 3 Currículo")
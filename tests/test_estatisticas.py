@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from estatisticas import (
+    ID_DASHBOARD, carregar_mais_procuradas, recalcular_aplicacoes_por_vaga, registrar_aplicacao,
+    registrar_vaga,
+)
+
+
+def _aplicar(db, vaga, n):
+    for i in range(n):
+        db.aplicacoes.insert_one({
+            "vaga_id": vaga["_id"], "vaga_titulo": vaga["titulo"], "empresa_vaga": vaga["empresa"],
+            "candidato_id": ObjectId(),
+        })
+
+
+def test_recalculo_conta_por_vaga_id_em_colecao_propria(db):
+    a = {"_id": ObjectId(), "titulo": "Dev", "empresa": "Acme"}
+    b = {"_id": ObjectId(), "titulo": "Dev", "empresa": "Acme"}
+    _aplicar(db, a, 3)
+    _aplicar(db, b, 1)
+    # Candidatura antiga sem vínculo com vaga não entra na contagem por vaga.
+    db.aplicacoes.insert_one({"vaga_titulo": "Dev", "empresa_vaga": "Acme"})
+
+    recalcular_aplicacoes_por_vaga(db, datetime.now())
+
+    # Mesmo título e empresa, vagas diferentes: contagens separadas.
+    assert {doc["_id"]: doc["total"] for doc in db.stats_vagas.find()} == {a["_id"]: 3, b["_id"]: 1}
+    assert [vaga["_id"] for vaga in carregar_mais_procuradas(db, limite=1)] == [a["_id"]]
+
+
+def test_recalculo_remove_vagas_sem_candidaturas(db):
+    vaga = {"_id": ObjectId(), "titulo": "Dev", "empresa": "Acme"}
+    db.stats_vagas.insert_one({"_id": ObjectId(), "total": 5})
+    _aplicar(db, vaga, 2)
+    recalcular_aplicacoes_por_vaga(db, datetime.now())
+    assert [doc["_id"] for doc in db.stats_vagas.find()] == [vaga["_id"]]
+
+
+def test_candidatura_incrementa_total_e_contagem_da_vaga(db):
+    db.stats.insert_one({"_id": ID_DASHBOARD, "aplicacoes": {"total": 0}})
+    vaga = {"_id": ObjectId(), "titulo": "Dev", "empresa": "Acme"}
+    registrar_aplicacao(db, vaga)
+    registrar_aplicacao(db, vaga)
+    assert db.stats.find_one()["aplicacoes"] == {"total": 2}
+    assert db.stats_vagas.find_one({"_id": vaga["_id"]})["total"] == 2
+
+
+def test_documento_do_dashboard_nao_cresce_com_as_vagas(db):
+    db.stats.insert_one({"_id": ID_DASHBOARD, "aplicacoes": {"total": 0}})
+    for i in range(50):
+        registrar_aplicacao(db, {"_id": ObjectId(), "titulo": f"Vaga {i}", "empresa": "Acme"})
+    assert db.stats.find_one()["aplicacoes"] == {"total": 50}
+
+
+def test_nova_vaga_soma_nos_grupos(db):
+    db.stats.insert_one({"_id": ID_DASHBOARD, "vagas": {"total": 0}})
+    registrar_vaga(db, {"tipo": "Remoto", "senioridade": "Pleno", "geo": None, "data_criacao": datetime(2026, 3, 1)})
+    vagas = db.stats.find_one()["vagas"]
+    assert vagas["total"] == 1
+    assert vagas["por_tipo"] == {"Remoto": 1}
+    assert vagas["por_local"] == {"outros": 1}
+    assert vagas["por_mes"] == {"2026-03": 1}
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from consultas import carregar_pagina_vagas, filtro_apos_cursor
+
+INICIO = datetime(2026, 1, 1)
+
+
+def _semear(db, n, mesma_data_a_cada=1):
+    for i in range(n):
+        db.vagas.insert_one({
+            "titulo": f"Vaga {i}",
+            "descricao": "x" * 500,
+            "data_criacao": INICIO + timedelta(hours=i // mesma_data_a_cada),
+        })
+
+
+def _todas_as_paginas(db, limite):
+    vistas, cursor = [], None
+    while True:
+        vagas, cursor = carregar_pagina_vagas.__wrapped__(db, cursor, limite)
+        vistas.extend(vagas)
+        if cursor is None:
+            return vistas
+
+
+def test_sem_cursor_nao_filtra():
+    assert filtro_apos_cursor(None) == {}
+
+
+def test_cursor_desempata_pelo_id():
+    id_vaga = ObjectId()
+    filtro = filtro_apos_cursor((INICIO, id_vaga))
+    assert filtro == {"$or": [
+        {"data_criacao": {"$lt": INICIO}},
+        {"data_criacao": INICIO, "_id": {"$lt": id_vaga}},
+    ]}
+
+
+def test_paginas_cobrem_o_feed_sem_repetir(db):
+    _semear(db, 23)
+    vistas = _todas_as_paginas(db, 5)
+    titulos = [vaga["titulo"] for vaga in vistas]
+    assert titulos == [f"Vaga {i}" for i in reversed(range(23))]
+
+
+def test_datas_repetidas_nao_perdem_vagas_entre_paginas(db):
+    _semear(db, 12, mesma_data_a_cada=4)
+    vistas = _todas_as_paginas(db, 3)
+    assert len({vaga["_id"] for vaga in vistas}) == 12
+
+
+def test_ultima_pagina_nao_devolve_cursor(db):
+    _semear(db, 4)
+    vagas, cursor = carregar_pagina_vagas.__wrapped__(db, None, 4)
+    assert len(vagas) == 4
+    assert cursor is None
+
+
+def test_limite_e_restrito(db):
+    _semear(db, 3)
+    vagas, _ = carregar_pagina_vagas.__wrapped__(db, None, 0)
+    assert len(vagas) == 1
+
+
+def test_projecao_so_leva_campos_do_cartao(db):
+    db.vagas.insert_one({"titulo": "A", "descricao": "x" * 500, "requisitos": "SQL", "interno": 1, "data_criacao": INICIO})
+    (vaga,), _ = carregar_pagina_vagas.__wrapped__(db)
+    assert "interno" not in vaga
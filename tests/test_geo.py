@@ -0,0 +1,31 @@
+import pytest
+
+from consultas import carregar_pontos_mapa
+from geo import COORDENADAS_CIDADES, resolver_local
+
+
+@pytest.mark.parametrize("local, cidade", [
+    ("São Paulo - SP", "sao paulo"),
+    ("SP - Campinas", "campinas"),
+    ("Vitória/ES", "vitoria"),
+    ("São José dos Campos", "sao jose dos campos"),
+    ("RIO DE JANEIRO", "rio de janeiro"),
+])
+def test_resolve_a_cidade_de_nome_mais_longo(local, cidade):
+    geo = resolver_local(local)
+    assert geo["cidade"] == cidade
+    assert [geo["lat"], geo["lon"]] == COORDENADAS_CIDADES[cidade]
+
+
+@pytest.mark.parametrize("local", ["Remoto", "", None, "Espanha", "Santoshi"])
+def test_local_desconhecido_fica_sem_geo(local):
+    assert resolver_local(local) is None
+
+
+def test_mapa_agrupa_um_ponto_por_cidade(db):
+    for local in ["São Paulo", "SP", "Campinas", "Remoto"]:
+        db.vagas.insert_one({"local": local, "geo": resolver_local(local)})
+    pontos = {ponto["cidade"]: ponto["total"] for ponto in carregar_pontos_mapa.__wrapped__(db)}
+    # "SP" e "São Paulo" caem nas mesmas coordenadas; vagas remotas ficam fora do mapa.
+    assert sum(pontos.values()) == 3
+    assert pontos["campinas"] == 1
@@ -0,0 +1,54 @@
+from benchmark.cenarios import _percentil, medir
+from benchmark.gerador import (PROPORCOES, gerar_aplicacoes, gerar_candidatos, gerar_usuarios, gerar_vagas,
+                               nomes_empresas)
+
+
+def test_mesma_semente_gera_os_mesmos_dados():
+    assert list(gerar_vagas(50)) == list(gerar_vagas(50))
+    assert list(gerar_candidatos(50)) == list(gerar_candidatos(50))
+    assert list(gerar_vagas(50)) != list(gerar_vagas(50, semente=7))
+
+
+def test_proporcoes_por_colecao():
+    escala = 200
+    assert len(list(gerar_vagas(escala))) == escala
+    assert len(list(gerar_candidatos(escala))) == escala * PROPORCOES["candidatos"]
+    usuarios = list(gerar_usuarios(escala, "hash"))
+    assert sum(u["role"] == "empregador" for u in usuarios) == len(nomes_empresas(escala)) == 10
+    assert {u["senha_hash"] for u in usuarios} == {"hash"}
+
+
+def test_vagas_tem_o_esquema_do_formulario():
+    empresas = set(nomes_empresas(100))
+    for vaga in gerar_vagas(100):
+        assert vaga["empresa"] in empresas and vaga["criado_por"] == vaga["empresa"]
+        assert vaga["local"] == "Remoto" or " - " in vaga["local"]
+        assert "salario_min" in vaga
+        if vaga["salario"] != "A combinar":
+            assert vaga["salario_min"] <= vaga["salario_max"]
+
+
+def test_candidatos_ligados_aos_usuarios():
+    usuarios = {u["username"]: u["_id"] for u in gerar_usuarios(30, "hash") if u["role"] == "candidato"}
+    assert {c["username_vinculo"]: c["usuario_id"] for c in gerar_candidatos(30)} == usuarios
+    vagas = [(i, f"Vaga {i}", "Acme 1") for i in range(5)]
+    assert {a["candidato_id"] for a in gerar_aplicacoes(vagas, 30)} <= set(usuarios.values())
+
+
+def test_aplicacoes_nao_repetem_o_par_vaga_candidato():
+    vagas = [(i, f"Vaga {i}", "Acme 1") for i in range(10)]
+    aplicacoes = list(gerar_aplicacoes(vagas, 300))
+    pares = [(a["vaga_id"], a["candidato_id"]) for a in aplicacoes]
+    assert len(pares) == len(set(pares))
+    assert abs(len(aplicacoes) / 300 - PROPORCOES["aplicacoes"]) < 0.5
+
+
+def test_medir_resume_os_tempos_e_reporta_erro():
+    resultado = medir(lambda db, contexto, rng: 3, None, {}, repeticoes=5)
+    assert resultado["repeticoes"] == 5
+    assert _percentil([1, 2, 3, 4, 5], 50) == 3
+
+    def falha(db, contexto, rng):
+        raise NotImplementedError("$text")
+
+    assert medir(falha, None, {}, repeticoes=1) == {"erro": "NotImplementedError: $text"}
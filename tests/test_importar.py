@@ -0,0 +1,102 @@
+import csv
+import json
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import importar as modulo_importar
+from importar import _formato, em_lotes, importar, normalizar
+
+VAGA = {"titulo": " Dev Python ", "empresa": "Acme", "descricao": "APIs", "local": "São Paulo - SP",
+        "salario": "R$ 5.000", "data_criacao": "2026-02-03T10:00:00"}
+
+
+def _vagas(n, invalidas=()):
+    return [{**VAGA, "titulo": "" if i in invalidas else f"Vaga {i}"} for i in range(n)]
+
+
+def test_normalizar_valida_e_completa_os_campos():
+    documento = normalizar("vagas", VAGA)
+    assert documento["titulo"] == "Dev Python"
+    assert documento["tipo"] == ""
+    assert "criado_por" not in documento
+    assert documento["data_criacao"] == datetime(2026, 2, 3, 10)
+    assert documento["geo"]["cidade"]
+    assert documento["salario_min"] == 5000
+
+
+def test_normalizar_rejeita_registro_incompleto_ou_invalido():
+    assert normalizar("vagas", {**VAGA, "empresa": "  "}) is None
+    assert normalizar("candidatos", {"nome": "Ana", "resumo": "x"}) is None
+    assert normalizar("vagas", None) is None
+
+
+def test_data_invalida_vira_a_data_da_importacao():
+    documento = normalizar("candidatos", {"nome": "Ana", "resumo": "x", "skills": "y", "data_atualizacao": "ontem"})
+    assert (datetime.now() - documento["data_atualizacao"]).total_seconds() < 60
+    assert "username_vinculo" not in documento
+
+
+def test_lotes_cobrem_os_offsets_dos_rejeitados():
+    itens = [(offset, None if offset % 2 else {"x": offset}) for offset in range(10, 15)]
+    assert [(inicio, fim, len(lote)) for inicio, fim, lote in em_lotes(itens, 2)] == [(10, 12, 2), (12, 14, 2), (14, 15, 1)]
+
+
+def test_formato_pela_extensao():
+    assert _formato("dados/vagas.ndjson") == "jsonl"
+    assert _formato("vagas.CSV") == "csv"
+    assert _formato("vagas.parq") == "parquet"
+
+
+def test_importar_csv_conta_rejeitados_e_grava_checkpoint(db, tmp_path):
+    caminho = tmp_path / "vagas.csv"
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=list(VAGA))
+        escritor.writeheader()
+        escritor.writerows(_vagas(7, invalidas={3}))
+
+    totais = importar(db, "vagas", str(caminho), "csv", tamanho_lote=2, workers=2)
+    assert (totais["lidos"], totais["inseridos"], totais["rejeitados"], totais["offset"]) == (7, 6, 1, 7)
+    assert db.vagas.count_documents({}) == 6
+    assert db.importacoes.find_one({"_id": "vagas:vagas.csv"})["offset"] == 7
+
+
+def test_retomada_nao_duplica_e_recomecar_reprocessa(db, tmp_path):
+    caminho = tmp_path / "vagas.jsonl"
+    caminho.write_text("\n".join(json.dumps(vaga) for vaga in _vagas(5)) + "\n{quebrado\n", encoding="utf-8")
+
+    importar(db, "vagas", str(caminho), "jsonl", tamanho_lote=2)
+    # Simula uma queda depois do primeiro lote: o checkpoint volta e o arquivo é lido de novo.
+    db.importacoes.update_one({"_id": "vagas:vagas.jsonl"}, {"$set": {"offset": 2}})
+    totais = importar(db, "vagas", str(caminho), "jsonl", tamanho_lote=2)
+    assert totais["lidos"] == 4
+    assert totais["inseridos"] == 0
+    assert db.vagas.count_documents({}) == 5
+
+    totais = importar(db, "vagas", str(caminho), "jsonl", recomecar=True)
+    assert (totais["lidos"], totais["rejeitados"]) == (6, 1)
+    assert db.vagas.count_documents({}) == 5
+
+
+def test_importar_parquet_retoma_no_meio_do_arquivo(db, tmp_path):
+    caminho = tmp_path / "vagas.parquet"
+    pq.write_table(pa.Table.from_pylist(_vagas(6)), caminho)
+    db.importacoes.insert_one({"_id": "vagas:vagas.parquet", "offset": 4})
+
+    totais = importar(db, "vagas", str(caminho), "parquet")
+    assert totais["inseridos"] == 2
+    assert sorted(v["titulo"] for v in db.vagas.find()) == ["Vaga 4", "Vaga 5"]
+
+
+def test_importacao_sobe_a_versao_compartilhada(db, tmp_path, monkeypatch):
+    invalidadas = []
+    monkeypatch.setattr(modulo_importar, "invalidar_colecao", invalidadas.append)
+    caminho = tmp_path / "vagas.jsonl"
+    caminho.write_text("\n".join(json.dumps(vaga) for vaga in _vagas(3)), encoding="utf-8")
+
+    importar(db, "vagas", str(caminho), "jsonl", tamanho_lote=2)
+    assert invalidadas == ["vagas"]
+    # Nada inserido na retomada: nada a invalidar.
+    importar(db, "vagas", str(caminho), "jsonl", recomecar=True)
+    assert invalidadas == ["vagas"]
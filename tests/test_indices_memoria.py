@@ -0,0 +1,137 @@
+import pickle
+
+import pytest
+
+import autocompletar
+import busca_local
+import cache
+from cache import CacheCompartilhado, invalidar_colecao, registrar_escrita
+from cache_compartilhado import BackendSQLite
+
+
+@pytest.fixture
+def compartilhado(monkeypatch, tmp_path):
+    # Um backend SQLite como o das réplicas na mesma máquina.
+    monkeypatch.setattr(cache, "_compartilhado", CacheCompartilhado(BackendSQLite(str(tmp_path / "cache.db")), "segredo"))
+    return cache._compartilhado
+
+
+@pytest.fixture
+def construcoes(monkeypatch):
+    contagem = {"bm25": 0, "prefixos": 0}
+    originais = {"bm25": busca_local.construir_indice, "prefixos": autocompletar.construir_indice}
+
+    def contar(tipo):
+        def construir(*args):
+            contagem[tipo] += 1
+            return originais[tipo](*args)
+        return construir
+
+    monkeypatch.setattr(busca_local, "construir_indice", contar("bm25"))
+    monkeypatch.setattr(autocompletar, "construir_indice", contar("prefixos"))
+    return contagem
+
+
+def _titulos(db, consulta):
+    return [r["titulo"] for r in busca_local.buscar(db, "vagas", consulta)]
+
+
+def test_escrita_de_outra_replica_recarrega_o_indice(db, compartilhado, construcoes):
+    db.vagas.insert_one({"titulo": "Dev Python"})
+    assert _titulos(db, "rust") == []
+    # Outra réplica grava e sobe a versão compartilhada; este processo não recebe o documento.
+    db.vagas.insert_one({"titulo": "Dev Rust"})
+    compartilhado.incrementar_versao("vagas")
+    assert _titulos(db, "rust") == ["Dev Rust"]
+    assert construcoes["bm25"] == 2
+
+
+def test_escrita_deste_processo_nao_reconstroi(db, compartilhado, construcoes):
+    _titulos(db, "python")
+    vaga = {"titulo": "Dev Python"}
+    vaga["_id"] = db.vagas.insert_one(vaga).inserted_id
+    registrar_escrita("vagas", vaga)
+    assert _titulos(db, "python") == ["Dev Python"]
+    assert construcoes["bm25"] == 1
+
+
+def test_evento_da_propria_escrita_nao_reconstroi(db, compartilhado, construcoes):
+    from ao_vivo import MonitorAoVivo
+
+    _titulos(db, "python")
+    vaga = {"titulo": "Dev Python"}
+    vaga["_id"] = db.vagas.insert_one(vaga).inserted_id
+    registrar_escrita("vagas", vaga)
+    monitor = MonitorAoVivo(db)
+    if colecao := monitor._processar({"ns": {"coll": "vagas"}, "operationType": "insert",
+                                      "documentKey": {"_id": vaga["_id"]}, "fullDocument": vaga}):
+        monitor._invalidar([colecao])
+    assert _titulos(db, "python") == ["Dev Python"]
+    assert construcoes["bm25"] == 1
+
+
+def test_monitor_de_outra_replica_nao_sobe_a_versao_compartilhada(compartilhado):
+    antes = compartilhado.versoes(("vagas",))
+    invalidar_colecao("vagas", compartilhada=False)
+    assert compartilhado.versoes(("vagas",)) == antes
+    invalidar_colecao("vagas")
+    assert compartilhado.versoes(("vagas",)) == (antes[0] + 1,)
+
+
+def test_escrita_sem_documento_recarrega_no_proximo_uso(db, construcoes):
+    id_vaga = db.vagas.insert_one({"titulo": "Dev Python"}).inserted_id
+    assert _titulos(db, "python") == ["Dev Python"]
+    db.vagas.delete_one({"_id": id_vaga})
+    registrar_escrita("vagas")
+    assert _titulos(db, "python") == []
+
+
+def test_sem_cache_compartilhado_vale_a_invalidacao_do_monitor(db, construcoes):
+    _titulos(db, "rust")
+    db.vagas.insert_one({"titulo": "Dev Rust"})
+    invalidar_colecao("vagas")
+    assert _titulos(db, "rust") == ["Dev Rust"]
+
+
+def test_replica_nova_carrega_a_copia_publicada(db, compartilhado, construcoes):
+    db.vagas.insert_one({"titulo": "Dev Python"})
+    _titulos(db, "python")
+    busca_local._indices.clear()
+    busca_local._versoes_indices.clear()
+    assert _titulos(db, "python") == ["Dev Python"]
+    assert construcoes["bm25"] == 1
+
+
+def test_sugestoes_acompanham_as_outras_replicas(db, compartilhado, construcoes):
+    db.vagas.insert_one({"requisitos": "Python"})
+    assert autocompletar.sugerir(db, "skills", "k") == []
+    db.candidatos.insert_one({"skills": "Kotlin"})
+    compartilhado.incrementar_versao("candidatos")
+    assert autocompletar.sugerir(db, "skills", "k") == ["Kotlin"]
+
+    # Escrita local em uma coleção de origem só avança a versão que o índice reflete.
+    candidato = {"skills": "Kubernetes"}
+    candidato["_id"] = db.candidatos.insert_one(candidato).inserted_id
+    registrar_escrita("candidatos", candidato)
+    assert autocompletar.sugerir(db, "skills", "ku") == ["Kubernetes"]
+    assert construcoes["prefixos"] == 2
+
+
+def test_valor_adulterado_no_backend_nao_e_desserializado(compartilhado):
+    compartilhado.guardar("chave", {"ok": 1}, 60)
+    assert compartilhado.obter("chave") == (True, {"ok": 1})
+
+    class Explosivo:
+        def __reduce__(self):
+            return (exec, ("raise SystemExit('executado')",))
+
+    compartilhado.backend.guardar("chave", b"\0" * 32 + pickle.dumps(Explosivo()), 60)
+    assert compartilhado.obter("chave") == (False, None)
+    outra_replica = CacheCompartilhado(compartilhado.backend, "outro segredo")
+    compartilhado.guardar("chave", {"ok": 1}, 60)
+    assert outra_replica.obter("chave") == (False, None)
+
+
+def test_backend_sem_segredo_nao_liga(tmp_path):
+    with pytest.raises(ValueError):
+        CacheCompartilhado(BackendSQLite(str(tmp_path / "cache.db")))
@@ -0,0 +1,112 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import instrumentacao
+from instrumentacao import MonitorComandos, medir_rerun, rerun_completo
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = MonitorComandos(limite_lento_ms=100)
+    monkeypatch.setattr(instrumentacao, "monitor_comandos", monitor)
+    instrumentacao._rerun_atual.set(None)
+    yield monitor
+    instrumentacao._rerun_atual.set(None)
+
+
+def test_fragmento_sabe_se_roda_dentro_do_rerun_completo(monitor):
+    vistos = []
+
+    @medir_rerun("Página › aba")
+    def fragmento():
+        vistos.append(rerun_completo())
+
+    monitor.iniciar_rerun("Página")
+    assert rerun_completo()
+    fragmento()
+    monitor.finalizar_rerun()
+
+    # Depois do fim do script, só o fragmento roda de novo.
+    assert not rerun_completo()
+    fragmento()
+    assert vistos == [True, False]
+
+
+def _evento(nome, colecao="vagas", id_pedido=1, micros=5000, resposta=None, **extras):
+    return SimpleNamespace(
+        command_name=nome, command={nome: colecao, **extras}, request_id=id_pedido, connection_id=("db", 27017),
+        duration_micros=micros, reply=resposta if resposta is not None else {"ok": 1},
+    )
+
+
+def _comando(monitor, nome="find", id_pedido=1, micros=5000, resposta=None, falha=False, **extras):
+    evento = _evento(nome, id_pedido=id_pedido, micros=micros, resposta=resposta, **extras)
+    monitor.started(evento)
+    (monitor.failed if falha else monitor.succeeded)(evento)
+
+
+# Chamado "de dentro" de um arquivo do app, para a origem ser atribuída a ele.
+_codigo_pagina = compile(
+    "def carregar(monitor, evento):\n    monitor.started(evento)\n",
+    os.path.join(instrumentacao.DIRETORIO_APP, "pages", "9_Teste.py"), "exec",
+)
+_escopo = {}
+exec(_codigo_pagina, _escopo)
+
+
+def test_comandos_agrupados_com_percentis_e_documentos(monitor):
+    monitor.iniciar_rerun("Feed")
+    for i, micros in enumerate([1000, 2000, 3000, 4000]):
+        _comando(monitor, id_pedido=i, micros=micros, resposta={"cursor": {"firstBatch": [{}, {}]}, "ok": 1})
+    _comando(monitor, "ping", id_pedido=99)
+    _comando(monitor, "count", id_pedido=100, falha=True)
+    linhas = {linha["comando"]: linha for linha in monitor.consultas()}
+    assert set(linhas) == {"find", "count"}
+    find = linhas["find"]
+    assert (find["pagina"], find["colecao"], find["chamadas"], find["documentos"]) == ("Feed", "vagas", 4, 8)
+    assert find["tempo_total_ms"] == 10.0
+    assert (find["p50_ms"], find["p99_ms"]) == (3.0, 4.0)
+    assert find["bytes"] > 0
+    assert linhas["count"]["falhas"] == 1
+
+
+def test_origem_e_o_primeiro_quadro_do_app(monitor):
+    evento = _evento("find")
+    _escopo["carregar"](monitor, evento)
+    monitor.succeeded(evento)
+    assert monitor.consultas()[0]["origem"] == os.path.join("pages", "9_Teste.py") + ":carregar"
+    assert monitor.consultas()[0]["pagina"] == "(segundo plano)"
+
+
+def test_consulta_lenta_fica_registrada_com_resumo(monitor):
+    _comando(monitor, micros=250000, filter={"titulo": "x" * 1000})
+    _comando(monitor, id_pedido=2, micros=1000)
+    lentas = monitor.lentas()
+    assert len(lentas) == 1
+    assert lentas[0]["duracao_ms"] == 250.0
+    assert lentas[0]["resumo"].endswith("…")
+
+
+def test_custo_do_rerun_soma_os_fragmentos_desenhados_nele(monitor):
+    @medir_rerun("Página › aba")
+    def fragmento(id_pedido):
+        _comando(monitor, id_pedido=id_pedido)
+
+    monitor.iniciar_rerun("Página")
+    _comando(monitor, id_pedido=1)
+    fragmento(2)
+    monitor.finalizar_rerun()
+    fragmento(3)
+
+    reruns = {linha["pagina"]: linha for linha in monitor.reruns()}
+    assert reruns["Página"]["comandos_por_rerun"] == 2
+    assert reruns["Página › aba"]["comandos_por_rerun"] == 1
+    assert reruns["Página"]["reruns"] == reruns["Página › aba"]["reruns"] == 1
+
+
+def test_limpar_zera_as_medicoes(monitor):
+    _comando(monitor, micros=500000)
+    monitor.limpar()
+    assert monitor.exportar()["consultas"] == monitor.exportar()["lentas"] == []
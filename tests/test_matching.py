@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import numpy as np
+
+from matching import calcular_matches, construir_matrizes, top_k_em_blocos
+
+VAGAS = [
+    {"_id": "v1", "titulo": "Dev Python", "empresa": "Acme", "requisitos": "python django", "descricao": "api"},
+    {"_id": "v2", "titulo": "Designer", "empresa": "Beta", "requisitos": "figma ux", "descricao": "interfaces"},
+    {"_id": "v3", "titulo": "Dados", "empresa": "Gama", "requisitos": "python spark", "descricao": "pipelines"},
+]
+CANDIDATOS = [
+    {"_id": "c1", "nome": "Ana", "skills": "python, django", "resumo": "backend api"},
+    {"_id": "c2", "nome": "Bia", "skills": "figma", "resumo": "ux interfaces"},
+    {"_id": "c3", "nome": "Caio", "skills": "spark", "resumo": "pipelines de dados"},
+]
+
+
+def test_linhas_normalizadas_e_vocabulario_so_com_termos_em_comum():
+    m_vagas, m_candidatos = construir_matrizes(VAGAS, CANDIDATOS + [{"skills": "cobol"}])
+    assert m_vagas.shape[1] == m_candidatos.shape[1]
+    normas = np.sqrt(np.asarray(m_vagas.multiply(m_vagas).sum(axis=1)).ravel())
+    assert np.allclose(normas, 1.0, atol=1e-5)
+    assert m_candidatos[3].nnz == 0
+
+
+def test_blocos_dao_o_mesmo_resultado_que_o_produto_inteiro():
+    m_vagas, m_candidatos = construir_matrizes(VAGAS, CANDIDATOS)
+    inteiro = dict(top_k_em_blocos(m_vagas, m_candidatos, k=2, tamanho_bloco=1024))
+    em_blocos = dict(top_k_em_blocos(m_vagas, m_candidatos, k=2, tamanho_bloco=1))
+    assert inteiro.keys() == em_blocos.keys() == {0, 1, 2}
+    for linha, melhores in inteiro.items():
+        assert [c for c, _ in melhores] == [c for c, _ in em_blocos[linha]]
+        assert len(melhores) <= 2
+        scores = [s for _, s in melhores]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_cada_vaga_encontra_o_candidato_certo():
+    m_vagas, m_candidatos = construir_matrizes(VAGAS, CANDIDATOS)
+    melhores = {linha: resultado[0][0] for linha, resultado in top_k_em_blocos(m_vagas, m_candidatos)}
+    assert melhores == {0: 0, 1: 1, 2: 2}
+
+
+def test_calcular_matches_grava_e_remove_rankings_antigos(db):
+    db.vagas.insert_many([dict(v) for v in VAGAS])
+    db.candidatos.insert_many([dict(c) for c in CANDIDATOS])
+    db.matches.insert_one({"origem": "vaga", "origem_id": "removida", "resultados": [], "atualizado_em": datetime(2020, 1, 1)})
+
+    assert calcular_matches(db, k=1) == {"vagas": 3, "candidatos": 3}
+    ranking = db.matches.find_one({"origem": "vaga", "origem_id": "v1"})
+    assert ranking["resultados"][0]["id"] == "c1"
+    assert ranking["resultados"][0]["nome"] == "Ana"
+    assert db.matches.count_documents({"origem": "candidato"}) == 3
+    assert db.matches.find_one({"origem_id": "removida"}) is None
+
+    db.vagas.delete_one({"_id": "v3"})
+    calcular_matches(db, k=1)
+    assert db.matches.count_documents({"origem": "vaga"}) == 2
@@ -0,0 +1,43 @@
+from bson import ObjectId
+
+from consultas import _pipeline_painel, carregar_painel_empregador, carregar_vaga_empregador
+
+
+class _BancoGravador:
+    # O mongomock não implementa $lookup com pipeline: aqui só interessa quantas agregações
+    # o painel dispara e com qual filtro.
+    name = "gravador"
+
+    def __init__(self):
+        self.agregacoes = []
+        self.vagas = self
+
+    def aggregate(self, pipeline):
+        self.agregacoes.append(pipeline)
+        return iter([{"_id": ObjectId(), "qtd_candidatos": 0, "candidaturas": []}])
+
+
+def test_painel_inteiro_em_uma_agregacao():
+    banco = _BancoGravador()
+    vagas = carregar_painel_empregador.__wrapped__(banco, "acme")
+    assert len(vagas) == 1
+    assert len(banco.agregacoes) == 1
+    assert banco.agregacoes[0][0] == {"$match": {"$or": [{"criado_por": "acme"}, {"empresa": "acme"}]}}
+
+
+def test_vaga_avulsa_confere_o_dono():
+    banco = _BancoGravador()
+    id_vaga = ObjectId()
+    carregar_vaga_empregador.__wrapped__(banco, "acme", id_vaga)
+    filtro = banco.agregacoes[0][0]["$match"]
+    assert {"_id": id_vaga} in filtro["$and"]
+    assert {"$or": [{"criado_por": "acme"}, {"empresa": "acme"}]} in filtro["$and"]
+
+
+def test_perfis_vem_pelo_id_do_login_e_contagem_no_servidor():
+    pipeline = _pipeline_painel({})
+    candidaturas = next(etapa["$lookup"] for etapa in pipeline if "$lookup" in etapa)
+    assert (candidaturas["from"], candidaturas["localField"], candidaturas["foreignField"]) == ("aplicacoes", "_id", "vaga_id")
+    perfil = candidaturas["pipeline"][0]["$lookup"]
+    assert (perfil["from"], perfil["localField"], perfil["foreignField"]) == ("candidatos", "candidato_id", "usuario_id")
+    assert {"$addFields": {"qtd_candidatos": {"$size": "$candidaturas"}}} in pipeline
@@ -0,0 +1,48 @@
+import pytest
+
+from salario import interpretar_salario
+
+CASOS = [
+    # texto, mínimo, máximo, moeda
+    ("R$ 5.000 - R$ 7.000", 5000, 7000, "BRL"),
+    ("De R$ 5.000 até R$ 7.000", 5000, 7000, "BRL"),
+    ("5.000 - 7.000", 5000, 7000, "BRL"),
+    ("5000", 5000, 5000, "BRL"),
+    ("R$ 5.000,50", 5000.5, 5000.5, "BRL"),
+    ("US$ 4,000.00", 4000, 4000, "USD"),
+    ("€ 3.000", 3000, 3000, "EUR"),
+    ("10 mil dólares", 10000, 10000, "USD"),
+    ("5k", 5000, 5000, "BRL"),
+    ("5k+", 5000, 5000, "BRL"),
+    ("até R$ 7.000", None, 7000, "BRL"),
+    ("a partir de R$ 3.000", 3000, 3000, "BRL"),
+    # O multiplicador da segunda ponta vale para as duas.
+    ("entre 3 e 5 mil", 3000, 5000, "BRL"),
+    ("R$ 3 a 5 mil", 3000, 5000, "BRL"),
+    ("3-5k", 3000, 5000, "BRL"),
+    ("R$ 800 a 5 mil", 800, 5000, "BRL"),
+    # Período só quando está junto do valor.
+    ("R$ 120.000 por ano", 10000, 10000, "BRL"),
+    ("Salário anual: R$ 120.000", 10000, 10000, "BRL"),
+    ("R$ 50/hora", 11000, 11000, "BRL"),
+    ("R$ 5.000 mensais + PLR anual", 5000, 5000, "BRL"),
+    ("R$ 30 por hora, 40 horas semanais", 6600, 6600, "BRL"),
+    # Números sem moeda nem multiplicador não são salário quando há um valor em dinheiro.
+    ("2 vagas, R$ 4.000", 4000, 4000, "BRL"),
+    ("R$ 2.000 por mês, 40 horas semanais", 2000, 2000, "BRL"),
+    ("R$ 5.000 + R$ 1.000 de bônus", 5000, 5000, "BRL"),
+]
+
+
+@pytest.mark.parametrize("texto, minimo, maximo, moeda", CASOS)
+def test_interpretar_salario(texto, minimo, maximo, moeda):
+    resultado = interpretar_salario(texto)
+    assert (resultado["salario_min"], resultado["salario_max"], resultado["salario_moeda"]) == (minimo, maximo, moeda)
+    assert not resultado["salario_a_combinar"]
+
+
+@pytest.mark.parametrize("texto", ["", None, "A combinar", "Salário compatível com o mercado", "2 vagas", "40 horas semanais"])
+def test_sem_valor_fica_a_combinar(texto):
+    resultado = interpretar_salario(texto)
+    assert resultado["salario_a_combinar"]
+    assert resultado["salario_min"] is resultado["salario_max"] is None
@@ -0,0 +1,84 @@
+import csv
+from datetime import datetime
+
+import pyarrow.parquet as pq
+
+from tabelas import (
+    COLUNAS_TABELA,
+    carregar_pagina_tabela,
+    consulta_pagina_tabela,
+    exportar_csv,
+    exportar_parquet,
+    iterar_lotes,
+)
+
+
+def _semear_usuarios(db, n):
+    db.usuarios.insert_many([
+        {"nome": f"Pessoa {i:02d}", "username": f"user{i:02d}", "senha": "hash", "role": "candidato",
+         "data_criacao": datetime(2026, 1, 1 + i % 28)}
+        for i in range(n)
+    ])
+
+
+def test_consulta_ordena_com_desempate_e_pula_paginas():
+    consulta = consulta_pagina_tabela("vagas", pagina=2, tamanho=10, ordenar_por="empresa", decrescente=True)
+    assert consulta["ordenacao"] == [("empresa", -1), ("_id", 1)]
+    assert consulta["pular"] == 20
+    assert consulta["limite"] == 10
+    assert consulta["projecao"]["_id"] == 0
+    assert "descricao" not in consulta["projecao"]
+
+
+def test_filtro_escapa_o_termo():
+    consulta = consulta_pagina_tabela("vagas", coluna_filtro="titulo", termo="C++")
+    assert consulta["filtro"] == {"titulo": {"$regex": r"C\+\+", "$options": "i"}}
+    assert consulta_pagina_tabela("vagas", coluna_filtro="titulo", termo="")["filtro"] == {}
+
+
+def test_paginas_percorrem_a_colecao_sem_repetir(db):
+    _semear_usuarios(db, 23)
+    vistos = []
+    for pagina in range(3):
+        df, total = carregar_pagina_tabela(db, "usuarios", pagina=pagina, tamanho=10)
+        assert total == 23
+        vistos.extend(df["username"])
+    assert vistos == [f"user{i:02d}" for i in range(23)]
+
+
+def test_pagina_filtrada_conta_so_os_filtrados(db):
+    _semear_usuarios(db, 23)
+    df, total = carregar_pagina_tabela(db, "usuarios", coluna_filtro="nome", termo="pessoa 1")
+    assert total == 10
+    assert list(df.columns) == COLUNAS_TABELA["usuarios"]
+
+
+def test_lotes_tem_tamanho_fixo(db):
+    _semear_usuarios(db, 12)
+    assert [len(lote) for lote in iterar_lotes(db, "usuarios", tamanho_lote=5)] == [5, 5, 2]
+
+
+def test_exportar_csv_nao_leva_a_senha(db, tmp_path):
+    _semear_usuarios(db, 7)
+    destino = tmp_path / "usuarios.csv"
+    assert exportar_csv(db, "usuarios", destino, tamanho_lote=3) == 7
+    with open(destino, encoding="utf-8") as arquivo:
+        linhas = list(csv.DictReader(arquivo))
+    assert len(linhas) == 7
+    assert "senha" not in linhas[0]
+    assert linhas[0]["username"] == "user00"
+
+
+def test_exportar_parquet_tipa_datas_e_textos(db, tmp_path):
+    db.vagas.insert_many([
+        {"titulo": "Dev", "empresa": "Acme", "salario": 5000, "data_criacao": datetime(2026, 3, 1)},
+        {"titulo": "QA", "empresa": "Beta", "data_criacao": "data inválida"},
+    ])
+    destino = tmp_path / "vagas.parquet"
+    assert exportar_parquet(db, "vagas", destino, tamanho_lote=1) == 2
+    tabela = pq.read_table(destino)
+    linhas = tabela.to_pylist()
+    assert str(tabela.schema.field("data_criacao").type) == "timestamp[ms]"
+    assert linhas[0]["salario"] == "5000"
+    assert linhas[0]["data_criacao"] == datetime(2026, 3, 1)
+    assert linhas[1]["data_criacao"] is None